@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""
+Detection Benchmark Module
+Compares full-frame dlib detection against downscaled detection with tracker hand-off
+"""
+
+import argparse
+import sys
+import time
+import cv2
+
+from face_detector import FaceDetector
+
+def read_frames(source, max_frames, width=1280, height=720):
+    """
+    Read frames from a camera or video file into memory
+    
+    Args:
+        source (str): Camera ID or path to a video file
+        max_frames (int): Maximum number of frames to read
+        width (int): Requested camera frame width
+        height (int): Requested camera frame height
+    
+    Returns:
+        list: Frames as BGR images
+    """
+    capture = cv2.VideoCapture(int(source) if source.isdigit() else source)
+    if source.isdigit():
+        capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = capture.read()
+        if not ret:
+            break
+        frames.append(frame)
+    capture.release()
+    return frames
+
+def run_detector(frames, detection_scale, redetect_interval):
+    """
+    Run FaceDetector over the frames, as the processing worker does
+    
+    Args:
+        frames (list): Frames as BGR images
+        detection_scale (float): Scale of the frame copy the detector runs on
+        redetect_interval (int): Run the detector every Nth frame and track in between
+    
+    Returns:
+        dict: Processing FPS, detector runs, tracked frames and frames with a face
+    """
+    detector = FaceDetector(method='dlib', use_gpu=False,
+                            detection_scale=detection_scale, redetect_interval=redetect_interval)
+    
+    frames_with_face = 0
+    start_time = time.perf_counter()
+    for frame in frames:
+        if len(detector.detect(frame)) > 0:
+            frames_with_face += 1
+    elapsed = time.perf_counter() - start_time
+    
+    return {
+        'fps': len(frames) / elapsed if elapsed > 0 else 0,
+        'detections': detector.detection_count,
+        'tracked': detector.tracked_count,
+        'frames_with_face': frames_with_face
+    }
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Benchmark downscaled dlib detection with tracking')
+    parser.add_argument('--source', type=str, default='0',
+                      help='Camera ID or path to a video file')
+    parser.add_argument('--frames', type=int, default=300,
+                      help='Number of frames to benchmark')
+    parser.add_argument('--detect-scale', type=float, default=0.5,
+                      help='Scale of the frame copy the detector runs on')
+    parser.add_argument('--redetect-interval', type=int, default=5,
+                      help='Run the detector every Nth frame and track in between')
+    args = parser.parse_args()
+    
+    frames = read_frames(args.source, args.frames)
+    if not frames:
+        print(f"Error: Could not read frames from {args.source}")
+        return 1
+    height, width = frames[0].shape[:2]
+    print(f"Benchmarking {len(frames)} frames of {width}x{height}")
+    
+    modes = [
+        ('full frame, every frame', 1.0, 1),
+        (f'scale {args.detect_scale}, every frame', args.detect_scale, 1),
+        (f'scale {args.detect_scale}, re-detect every {args.redetect_interval}', args.detect_scale, args.redetect_interval)
+    ]
+    baseline_fps = None
+    print(f"{'mode':<36} {'FPS':>7} {'speedup':>8} {'detector runs':>14} {'tracked':>8} {'with face':>10}")
+    for name, scale, interval in modes:
+        result = run_detector(frames, scale, interval)
+        if baseline_fps is None:
+            baseline_fps = result['fps']
+        speedup = result['fps'] / baseline_fps if baseline_fps > 0 else 0
+        print(f"{name:<36} {result['fps']:>7.1f} {speedup:>7.1f}x {result['detections']:>14} "
+              f"{result['tracked']:>8} {result['frames_with_face']:>10}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+"""
+Frame Context Benchmark Module
+Counts and times the per-frame color conversions and resizes with and without a shared FrameContext
+"""
+
+import argparse
+import sys
+import time
+import cv2
+import numpy as np
+
+from frame_context import FrameContext
+
+def conversions_without_context(frame, face_bbox, detection_scale, with_landmarks):
+    """
+    Make the conversions each stage used to make on its own frame copy
+    
+    Args:
+        frame (numpy.ndarray): BGR frame
+        face_bbox (tuple): Face region as (x, y, w, h)
+        detection_scale (float): Scale of the frame copy the detector runs on
+        with_landmarks (bool): Include FaceDetector.get_landmarks
+    
+    Returns:
+        int: Number of conversions and resizes made
+    """
+    # Stages hold their images while they work on them, so keep them until the frame is done
+    images = []
+    
+    # FaceDetector._detect_dlib
+    small = frame
+    if detection_scale != 1.0:
+        small = cv2.resize(frame, None, fx=detection_scale, fy=detection_scale, interpolation=cv2.INTER_AREA)
+        images.append(small)
+    images.append(cv2.cvtColor(small, cv2.COLOR_BGR2RGB))
+    
+    # FeatureExtractor.extract_features_from_frame
+    images.append(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+    
+    # FeatureExtractor._analyze_skin
+    x, y, w, h = face_bbox
+    face_roi = frame[y:y+h, x:x+w]
+    images.append(cv2.cvtColor(face_roi, cv2.COLOR_BGR2HSV))
+    images.append(cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY))
+    images.append(cv2.resize(images[-1], (0, 0), fx=0.5, fy=0.5))
+    
+    # FaceDetector.get_landmarks
+    if with_landmarks:
+        images.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    
+    return len(images)
+
+def conversions_with_context(frame, face_bbox, detection_scale, with_landmarks):
+    """
+    Request the same images from one FrameContext, as the stages now do
+    
+    Args:
+        frame (numpy.ndarray): BGR frame
+        face_bbox (tuple): Face region as (x, y, w, h)
+        detection_scale (float): Scale of the frame copy the detector runs on
+        with_landmarks (bool): Include FaceDetector.get_landmarks
+    
+    Returns:
+        int: Number of conversions and resizes made
+    """
+    context = FrameContext(frame)
+    context.scaled(detection_scale, 'RGB')
+    context.gray
+    context.roi(face_bbox, 'HSV')
+    context.roi(face_bbox, 'GRAY', scale=0.5)
+    if with_landmarks:
+        context.rgb
+    return context.conversions
+
+def time_per_frame(function, frame, iterations, *args):
+    """
+    Run function on the frame repeatedly
+    
+    Returns:
+        tuple: (conversions per frame, milliseconds per frame)
+    """
+    count = function(frame, *args)
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        function(frame, *args)
+    return count, (time.perf_counter() - start_time) * 1000 / iterations
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Benchmark per-frame conversions with and without FrameContext')
+    parser.add_argument('--image', type=str, default=None,
+                      help='Image to use instead of a random 1280x720 frame')
+    parser.add_argument('--iterations', type=int, default=200,
+                      help='Frames to time per mode')
+    parser.add_argument('--detect-scale', type=float, default=0.5,
+                      help='Scale of the frame copy the detector runs on')
+    parser.add_argument('--with-landmarks', action='store_true',
+                      help='Also include the RGB conversion of FaceDetector.get_landmarks')
+    args = parser.parse_args()
+    
+    if args.image:
+        frame = cv2.imread(args.image)
+        if frame is None:
+            print(f"Error: Failed to load image: {args.image}")
+            return 1
+    else:
+        frame = np.random.default_rng(0).integers(0, 256, (720, 1280, 3), dtype=np.uint8)
+    
+    # A face of typical webcam size in the middle of the frame
+    height, width = frame.shape[:2]
+    face_bbox = (width // 2 - height // 6, height // 3, height // 3, height // 3)
+    options = (face_bbox, args.detect_scale, args.with_landmarks)
+    print(f"{width}x{height} frame, face {face_bbox[2]}x{face_bbox[3]}, detection scale {args.detect_scale}")
+    
+    print(f"{'mode':<16} {'conversions/frame':>18} {'ms/frame':>9}")
+    for name, function in (('per stage', conversions_without_context), ('FrameContext', conversions_with_context)):
+        count, ms = time_per_frame(function, frame, args.iterations, *options)
+        print(f"{name:<16} {count:>18} {ms:>9.3f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,6 +10,8 @@ import math
 from datetime import datetime
 import os
 
+from model_registry import get_pose_net
+
 class BodyAnalyzer:
     """Analyzes body posture, proportions, and health indicators"""
     
@@ -70,12 +72,8 @@ class BodyAnalyzer:
             
             # Try to load the model if it exists
             try:
-                self.pose_net = cv2.dnn.readNetFromTensorflow(model_path, config_path)
-                
-                # Use GPU if available
-                if self.use_gpu:
-                    self.pose_net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
-                    self.pose_net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
+                # Shared through the registry; GPU backend is applied when requested and available
+                self.pose_net = get_pose_net(self.use_gpu)
                 
                 self.initialized = True
                 print("Body pose estimation model loaded successfully")
@@ -12,6 +12,7 @@ from datetime import datetime
 
 from face_detector import FaceDetector
 from feature_extractor import FeatureExtractor
+from model_registry import registry
 from health_analyzer import HealthAnalyzer
 from body_analyzer import BodyAnalyzer
 from data_storage import DataStorage
@@ -40,6 +41,7 @@ class CompleteHealthAnalyzer:
         self.health_analyzer = HealthAnalyzer()
         self.body_analyzer = BodyAnalyzer(use_gpu=use_gpu)
         self.storage = DataStorage()
+        print(f"Models ready: {registry.summary()}")
         
         # For video processing
         self.video_capture = None
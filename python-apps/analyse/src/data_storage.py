@@ -6,12 +6,18 @@ Handles saving facial analysis results in different formats with real-time capab
 import os
 import json
 import csv
+import importlib.util
+import numpy as np
 import pandas as pd
 import threading
 import queue
 import time
 from datetime import datetime
 
+# Formats save_columns writes, and whether pandas has an engine for parquet
+COLUMNAR_FORMATS = ('npz', 'parquet', 'csv')
+PARQUET_AVAILABLE = any(importlib.util.find_spec(engine) is not None for engine in ('pyarrow', 'fastparquet'))
+
 class DataStorage:
     """A class to store facial analysis results in various formats with real-time support"""
     
@@ -87,6 +93,62 @@ class DataStorage:
         
         return output_file
     
+    def check_columnar_format(self, format):
+        """
+        Check that save_columns can write a format, before any results exist
+        
+        Args:
+            format (str): Output format ('npz', 'parquet', or 'csv')
+        
+        Raises:
+            ValueError: If the format is unknown or its writer is not installed
+        """
+        if format.lower() not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unsupported columnar format: {format}")
+        if format.lower() == 'parquet' and not PARQUET_AVAILABLE:
+            raise ValueError("Parquet output needs pyarrow or fastparquet: pip install pyarrow")
+    
+    def save_columns(self, results, output_path, format='npz'):
+        """
+        Save analysis results as one table with a column per field
+        
+        Args:
+            results (list): List of analysis result dictionaries
+            output_path (str): Base path for output file (without extension)
+            format (str): Output format ('npz', 'parquet', or 'csv')
+            
+        Returns:
+            str: Path to the saved file
+        """
+        self.check_columnar_format(format)
+        
+        # Nested values (e.g. biomarker estimates) are stored as JSON strings
+        df = pd.DataFrame([
+            {key: json.dumps(self._process_for_serialization(value)) if isinstance(value, (dict, list)) else value
+             for key, value in row.items()}
+            for row in self._flatten_data(results)
+        ])
+        
+        if format.lower() == 'npz':
+            # Text columns become fixed-width strings so the file loads without pickle
+            columns = {}
+            for column in df.columns:
+                values = df[column]
+                if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+                    columns[column] = values.to_numpy()
+                else:
+                    columns[column] = np.array(['' if pd.isna(v) else str(v) for v in values])
+            output_file = f"{output_path}.npz"
+            np.savez_compressed(output_file, **columns)
+        elif format.lower() == 'parquet':
+            output_file = f"{output_path}.parquet"
+            df.to_parquet(output_file, index=False)
+        elif format.lower() == 'csv':
+            output_file = f"{output_path}.csv"
+            df.to_csv(output_file, index=False)
+        
+        return output_file
+    
     def _process_for_serialization(self, data):
         """Process data structure to make it JSON serializable"""
         if isinstance(data, dict):
@@ -243,6 +305,11 @@ class DataStorage:
             return pd.read_csv(file_path).to_dict('records')
         elif ext == '.xlsx':
             return pd.read_excel(file_path).to_dict('records')
+        elif ext == '.parquet':
+            return pd.read_parquet(file_path).to_dict('records')
+        elif ext == '.npz':
+            with np.load(file_path) as columns:
+                return pd.DataFrame({name: columns[name] for name in columns.files}).to_dict('records')
         else:
             raise ValueError(f"Unsupported file format: {ext}")
     
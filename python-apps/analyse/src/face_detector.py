@@ -3,7 +3,6 @@ Face Detector Module
 Provides detection of faces in images using various methods (opencv, dlib, or torch).
 """
 
-import os
 import cv2
 import numpy as np
 
@@ -23,10 +22,15 @@ except ImportError:
     print("dlib not available. Using OpenCV for detection.")
     DLIB_AVAILABLE = False
 
+from frame_context import FrameContext
+from model_registry import (CAFFE_DETECTOR_MODEL_PATH, LANDMARK_MODEL_PATH, get_caffe_face_detector,
+                            get_dlib_face_detector, get_haar_face_detector, get_landmark_predictor)
+
 class FaceDetector:
     """Face detection using various methods with GPU support where available"""
     
-    def __init__(self, method='dlib', use_gpu=True, confidence_threshold=0.5):
+    def __init__(self, method='dlib', use_gpu=True, confidence_threshold=0.5,
+                 detection_scale=1.0, redetect_interval=1, tracker_threshold=7.0):
         """
         Initialize the face detector
         
@@ -34,45 +38,46 @@ class FaceDetector:
             method (str): Detection method ('opencv', 'dlib', or 'torch')
             use_gpu (bool): Whether to use GPU acceleration (if available)
             confidence_threshold (float): Confidence threshold for detections (0.0-1.0)
+            detection_scale (float): Scale of the frame copy the dlib detector runs on (e.g. 0.5 for half size)
+            redetect_interval (int): Run the dlib detector every Nth frame and track faces in between (1 = every frame)
+            tracker_threshold (float): Tracker confidence (peak-to-sidelobe ratio) below which faces are re-detected
         """
+        if detection_scale <= 0:
+            raise ValueError(f"detection_scale must be positive, got {detection_scale}")
+        
         self.method = method
         self.use_gpu = use_gpu and (TORCH_AVAILABLE or method != 'torch')
         self.confidence_threshold = confidence_threshold
+        self.detection_scale = detection_scale
+        self.redetect_interval = max(1, int(redetect_interval))
+        self.tracker_threshold = tracker_threshold
         
-        # Absolute path to models directory
-        models_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'models'))
+        # Correlation trackers following the last dlib detections, one per face
+        self.trackers = []
+        self.frames_since_detection = 0
+        self.detection_count = 0
+        self.tracked_count = 0
         
-        # Initialize the face detector based on the method
+        # Models come from the shared registry, so other components reuse the same instances
         if method == 'opencv':
             # Use OpenCV DNN face detector
-            model_file = os.path.join(models_dir, 'opencv_face_detector.caffemodel')
-            config_file = os.path.join(models_dir, 'opencv_face_detector.prototxt')
-            
-            if os.path.exists(model_file) and os.path.exists(config_file):
-                self.detector = cv2.dnn.readNetFromCaffe(config_file, model_file)
-                if use_gpu and cv2.cuda.getCudaEnabledDeviceCount() > 0:
-                    self.detector.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
-                    self.detector.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
-            else:
-                print(f"OpenCV face detector model not found at {model_file}")
+            self.detector = get_caffe_face_detector(use_gpu)
+            if self.detector is None:
+                print(f"OpenCV face detector model not found at {CAFFE_DETECTOR_MODEL_PATH}")
                 print("Using OpenCV's built-in face detector instead")
-                self.detector = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+                self.detector = get_haar_face_detector()
         
         elif method == 'dlib' and DLIB_AVAILABLE:
             # Use dlib's face detector
             print("Using dlib face detector")
-            self.detector = dlib.get_frontal_face_detector()
+            self.detector = get_dlib_face_detector()
             
             # Load landmark predictor if available
-            landmark_model = os.path.join(models_dir, 'shape_predictor_68_face_landmarks.dat')
-            if os.path.exists(landmark_model):
-                self.landmark_predictor = dlib.shape_predictor(landmark_model)
-                print(f"Loaded landmark model from: {landmark_model}")
-            else:
-                print(f"Dlib face landmark model not found at {landmark_model}")
+            self.landmark_predictor = get_landmark_predictor()
+            if self.landmark_predictor is None:
+                print(f"Dlib face landmark model not found at {LANDMARK_MODEL_PATH}")
                 print("Please download it from: http://dlib.net/files/shape_predictor_68_face_landmarks.dat.bz2")
                 print("Extract and place it in the 'models' directory")
-                self.landmark_predictor = None
         
         elif method == 'torch' and TORCH_AVAILABLE:
             # Use PyTorch model (RetinaFace) for face detection
@@ -86,28 +91,31 @@ class FaceDetector:
             except ImportError:
                 print("facenet_pytorch not available. Falling back to OpenCV.")
                 self.method = 'opencv'
-                self.detector = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+                self.detector = get_haar_face_detector()
         
         else:
             # Fallback to OpenCV's built-in face detector
             print(f"Method {method} not available. Using OpenCV's built-in face detector.")
             self.method = 'opencv'
-            self.detector = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+            self.detector = get_haar_face_detector()
     
     def detect(self, image):
         """
         Detect faces in the image
         
         Args:
-            image (numpy.ndarray): Input image
+            image: Input image, or a FrameContext to share its conversions with later stages
             
         Returns:
             list: List of face bounding boxes as (x, y, w, h)
         """
+        image = FrameContext.of(image)
         if self.method == 'opencv' and isinstance(self.detector, cv2.dnn.Net):
             return self._detect_opencv_dnn(image)
         elif self.method == 'opencv':
             return self._detect_opencv_cascade(image)
+        elif self.method == 'dlib' and DLIB_AVAILABLE and self.redetect_interval > 1:
+            return self._detect_dlib_tracked(image)
         elif self.method == 'dlib' and DLIB_AVAILABLE:
             return self._detect_dlib(image)
         elif self.method == 'torch' and TORCH_AVAILABLE:
@@ -115,10 +123,15 @@ class FaceDetector:
         else:
             return self._detect_opencv_cascade(image)
     
+    def reset_tracking(self):
+        """Drop the tracked faces so the next frame runs the detector (e.g. after switching source)"""
+        self.trackers = []
+        self.frames_since_detection = 0
+    
     def _detect_opencv_dnn(self, image):
         """Detect faces using OpenCV DNN"""
         height, width = image.shape[:2]
-        blob = cv2.dnn.blobFromImage(image, 1.0, (300, 300), [104, 117, 123], False, False)
+        blob = cv2.dnn.blobFromImage(image.frame, 1.0, (300, 300), [104, 117, 123], False, False)
         self.detector.setInput(blob)
         detections = self.detector.forward()
         
@@ -141,33 +154,60 @@ class FaceDetector:
     
     def _detect_opencv_cascade(self, image):
         """Detect faces using OpenCV Cascade Classifier"""
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         faces = self.detector.detectMultiScale(
-            gray, 
+            image.gray, 
             scaleFactor=1.1, 
             minNeighbors=5,
             minSize=(30, 30)
         )
         return faces
     
+    def _dlib_input(self, image):
+        """The frame resized by detection_scale, in RGB for dlib"""
+        return image.scaled(self.detection_scale, 'RGB')
+    
+    def _to_frame_box(self, rect):
+        """Convert a dlib rectangle on the scaled frame to (x, y, w, h) on the full frame"""
+        scale = self.detection_scale
+        return (int(round(rect.left() / scale)), int(round(rect.top() / scale)),
+                int(round(rect.width() / scale)), int(round(rect.height() / scale)))
+    
     def _detect_dlib(self, image):
         """Detect faces using dlib"""
-        # Convert to RGB for dlib
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        # HOG runs on the scaled RGB copy; the cost grows with the pixel count
+        dlib_faces = self.detector(self._dlib_input(image))
+        self.detection_count += 1
         
-        # Detect faces
-        dlib_faces = self.detector(rgb_image)
+        # Convert to OpenCV format (x, y, w, h) in full-frame coordinates
+        return [self._to_frame_box(face) for face in dlib_faces]
+    
+    def _detect_dlib_tracked(self, image):
+        """Detect faces using dlib every redetect_interval frames and track them in between"""
+        rgb_image = self._dlib_input(image)
         
-        # Convert to OpenCV format (x, y, w, h)
-        faces = []
+        if self.trackers and self.frames_since_detection < self.redetect_interval:
+            faces = []
+            for tracker in self.trackers:
+                # update() returns the peak-to-sidelobe ratio; a low value means the face was lost
+                if tracker.update(rgb_image) < self.tracker_threshold:
+                    break
+                faces.append(self._to_frame_box(tracker.get_position()))
+            else:
+                self.frames_since_detection += 1
+                self.tracked_count += 1
+                return faces
+        
+        # Detect, then start a fresh tracker on every face found
+        dlib_faces = self.detector(rgb_image)
+        self.detection_count += 1
+        self.trackers = []
         for face in dlib_faces:
-            x = face.left()
-            y = face.top()
-            w = face.width()
-            h = face.height()
-            faces.append((x, y, w, h))
+            tracker = dlib.correlation_tracker()
+            tracker.start_track(rgb_image, face)
+            self.trackers.append(tracker)
+        self.frames_since_detection = 1
         
-        return faces
+        return [self._to_frame_box(face) for face in dlib_faces]
     
     def _detect_torch(self, image):
         """Detect faces using PyTorch model"""
@@ -175,7 +215,7 @@ class FaceDetector:
             return self._detect_opencv_cascade(image)
         
         # Detect faces
-        boxes, _ = self.detector.detect(image)
+        boxes, _ = self.detector.detect(image.frame)
         
         # If no faces detected, return empty list
         if boxes is None:
@@ -194,7 +234,7 @@ class FaceDetector:
         Get facial landmarks for a detected face
         
         Args:
-            image (numpy.ndarray): Input image
+            image: Input image, or the FrameContext it was detected in
             face (tuple): Face bounding box as (x, y, w, h)
             
         Returns:
@@ -206,8 +246,7 @@ class FaceDetector:
             dlib_rect = dlib.rectangle(x, y, x+w, y+h)
             
             # Get landmarks
-            rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            shape = self.landmark_predictor(rgb_image, dlib_rect)
+            shape = self.landmark_predictor(FrameContext.of(image).rgb, dlib_rect)
             
             # Convert to list of (x, y) tuples
             landmarks = [(shape.part(i).x, shape.part(i).y) for i in range(shape.num_parts)]
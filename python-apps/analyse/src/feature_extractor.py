@@ -9,6 +9,10 @@ import os
 import time
 import dlib
 
+from frame_context import FrameContext
+from landmark_geometry import landmark_geometry
+from model_registry import LANDMARK_MODEL_PATH, get_landmark_predictor
+
 # Make torch optional
 try:
     import torch
@@ -40,18 +44,12 @@ class FeatureExtractor:
                 self.use_gpu = False
         
         # Initialize dlib's face landmark predictor
-        # Use absolute path based on the file's location
-        models_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'models'))
-        predictor_path = os.path.join(models_dir, 'shape_predictor_68_face_landmarks.dat')
-        
-        if os.path.exists(predictor_path):
-            self.landmark_predictor = dlib.shape_predictor(predictor_path)
-            self.has_landmark_detector = True
-            print(f"Loaded landmark model from: {predictor_path}")
-        else:
-            print(f"Dlib face landmark model not found at {predictor_path}")
+        # The registry shares one instance with FaceDetector instead of parsing the ~100 MB model twice
+        self.landmark_predictor = get_landmark_predictor()
+        self.has_landmark_detector = self.landmark_predictor is not None
+        if not self.has_landmark_detector:
+            print(f"Dlib face landmark model not found at {LANDMARK_MODEL_PATH}")
             print("Please ensure it is in the models directory")
-            self.has_landmark_detector = False
         
         # Define regions of interest for health analysis (using dlib's 68 point model indices)
         self.regions = {
@@ -80,13 +78,14 @@ class FeatureExtractor:
         Extract facial features from a video frame for real-time analysis
         
         Args:
-            frame: Video frame as numpy array
+            frame: Video frame as numpy array, or the FrameContext the face was detected in
             face_bbox: Face bounding box [x, y, width, height]
             
         Returns:
             dict: Extracted facial features
         """
         start_time = time.time()
+        frame = FrameContext.of(frame)
         
         # Initialize features dictionary
         features = {
@@ -109,8 +108,8 @@ class FeatureExtractor:
             
             return features
         
-        # Convert to grayscale for dlib
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        # Grayscale for dlib, converted once per frame
+        gray = frame.gray
         
         # Extract face ROI
         x, y, w, h = face_bbox
@@ -125,20 +124,14 @@ class FeatureExtractor:
             
             features['landmarks'] = landmarks
             
-            # Calculate facial metrics - use GPU if available
-            if self.has_cuda:
-                features['metrics'] = self._calculate_metrics_gpu(landmarks)
-            else:
-                features['metrics'] = self._calculate_metrics(landmarks)
-            
-            # Calculate facial symmetry
-            features['symmetry'] = self._calculate_symmetry(landmarks)
+            # Calculate facial metrics, symmetry and ratios (golden ratio analysis) in one pass
+            geometry = landmark_geometry(landmarks)
+            features['metrics'] = geometry['metrics']
+            features['symmetry'] = geometry['symmetry']
+            features['facial_ratios'] = geometry['facial_ratios']
             
             # Extract skin features
             features['skin'] = self._analyze_skin(frame, face_bbox)
-            
-            # Calculate facial ratios (golden ratio analysis)
-            features['facial_ratios'] = self._calculate_facial_ratios(landmarks)
         except Exception as e:
             print(f"Error extracting facial features: {e}")
         
@@ -168,161 +161,19 @@ class FeatureExtractor:
         # Use the frame processing function for consistency
         return self.extract_features_from_frame(image, face_bbox)
     
-    def _calculate_metrics_gpu(self, landmarks):
-        """Calculate facial metrics using GPU acceleration"""
-        metrics = {}
-        
-        if len(landmarks) < 10 or not TORCH_AVAILABLE:
-            # Fall back to CPU implementation if torch is not available
-            return self._calculate_metrics(landmarks)
-        
-        # Convert landmarks to PyTorch tensors
-        landmarks_tensor = torch.tensor(landmarks, dtype=torch.float32, device=self.device)
-        
-        # Eye measurements
-        # Left eye (landmarks 36-41)
-        left_eye_width = torch.norm(
-            landmarks_tensor[36] - landmarks_tensor[39]
-        )
-        
-        # Right eye (landmarks 42-47)
-        right_eye_width = torch.norm(
-            landmarks_tensor[42] - landmarks_tensor[45]
-        )
-        
-        metrics['left_eye_width'] = left_eye_width.item()
-        metrics['right_eye_width'] = right_eye_width.item()
-        metrics['eye_width_ratio'] = (left_eye_width / right_eye_width).item() if right_eye_width > 0 else 0
-        
-        # Face width and height
-        # Face width: distance between temples (landmarks 0 and 16)
-        face_width = torch.norm(
-            landmarks_tensor[16] - landmarks_tensor[0]
-        )
-        
-        # Face height: distance from chin to forehead (landmarks 8 and 27)
-        face_height = torch.norm(
-            landmarks_tensor[8] - landmarks_tensor[27]
-        )
-        
-        metrics['face_width'] = face_width.item()
-        metrics['face_height'] = face_height.item()
-        metrics['face_width_height_ratio'] = (face_width / face_height).item() if face_height > 0 else 0
-        
-        return metrics
-    
-    def _calculate_metrics(self, landmarks):
-        """Calculate key facial metrics from landmarks (CPU version)"""
-        metrics = {}
-        
-        # Organize landmarks by facial regions
-        regions_landmarks = {}
-        for region, indices in self.regions.items():
-            regions_landmarks[region] = [landmarks[i] for i in indices if i < len(landmarks)]
-        
-        # Eye measurements
-        if 'eyes' in regions_landmarks and len(regions_landmarks['eyes']) >= 6:
-            # Left eye width (landmarks 36 and 39)
-            left_eye_width = np.linalg.norm(
-                np.array(landmarks[36]) - np.array(landmarks[39])
-            )
-            
-            # Right eye width (landmarks 42 and 45)
-            right_eye_width = np.linalg.norm(
-                np.array(landmarks[42]) - np.array(landmarks[45])
-            )
-            
-            metrics['left_eye_width'] = float(left_eye_width)
-            metrics['right_eye_width'] = float(right_eye_width)
-            metrics['eye_width_ratio'] = float(left_eye_width / right_eye_width if right_eye_width > 0 else 0)
-        
-        # Face width and height
-        if len(landmarks) >= 17:
-            # Face width: distance between temples (landmarks 0 and 16)
-            face_width = np.linalg.norm(
-                np.array(landmarks[16]) - np.array(landmarks[0])
-            )
-            
-            # Face height: distance from chin to forehead (landmarks 8 and 27)
-            face_height = np.linalg.norm(
-                np.array(landmarks[8]) - np.array(landmarks[27])
-            )
-            
-            metrics['face_width'] = float(face_width)
-            metrics['face_height'] = float(face_height)
-            metrics['face_width_height_ratio'] = float(face_width / face_height if face_height > 0 else 0)
-        
-        return metrics
-    
-    def _calculate_symmetry(self, landmarks):
-        """Calculate facial symmetry metrics"""
-        symmetry = {
-            'eyes_level': 1.0,
-            'overall_symmetry': 1.0
-        }
-        
-        if len(landmarks) >= 68:  # Full set of dlib landmarks
-            # Get vertical positions of the eyes
-            left_eye_y = landmarks[37][1]  # Left eye upper point
-            right_eye_y = landmarks[44][1]  # Right eye upper point
-            
-            # Calculate eye level difference (normalized by face height)
-            face_height = landmarks[8][1] - landmarks[27][1]  # Chin to nose bridge
-            if face_height > 0:
-                eye_level_diff = abs(left_eye_y - right_eye_y) / face_height
-                symmetry['eyes_level'] = 1.0 - min(1.0, eye_level_diff * 10)
-            
-            # Calculate overall symmetry by comparing left and right sides
-            # Define the midpoint of the face (vertical line through nose)
-            nose_tip = landmarks[30]  # Nose tip
-            
-            # Define pairs of landmarks to compare (left and right side of face)
-            # Reduced number of pairs for real-time performance
-            landmark_pairs = [
-                (36, 45),    # Eyes outer corners
-                (48, 54),    # Mouth corners
-                (21, 22),    # Eyebrows
-                (31, 35)     # Nose
-            ]
-            
-            # Calculate asymmetry score
-            asymmetry_score = 0
-            for left_idx, right_idx in landmark_pairs:
-                left_point = landmarks[left_idx]
-                right_point = landmarks[right_idx]
-                
-                # Reflect right point across the vertical line through nose_tip
-                reflected_right = (2 * nose_tip[0] - right_point[0], right_point[1])
-                
-                # Distance between left point and reflected right point
-                distance = np.linalg.norm(np.array(left_point) - np.array(reflected_right))
-                
-                # Normalize by face width
-                face_width = np.linalg.norm(np.array(landmarks[16]) - np.array(landmarks[0]))
-                if face_width > 0:
-                    asymmetry_score += distance / face_width
-            
-            # Average and convert to symmetry value (1.0 = perfect symmetry)
-            if landmark_pairs:
-                asymmetry_score /= len(landmark_pairs)
-                symmetry['overall_symmetry'] = max(0.0, 1.0 - min(1.0, asymmetry_score * 3))
-        
-        return symmetry
-    
     def _analyze_skin(self, image, face_bbox):
         """Analyze skin features in the face region - optimized for real-time"""
-        x, y, w, h = face_bbox
+        image = FrameContext.of(image)
         
         # Extract face ROI
-        face_roi = image[y:y+h, x:x+w]
+        face_roi = image.roi(face_bbox)
         
         # Skip processing for very small regions to prevent errors
         if face_roi.size == 0 or face_roi.shape[0] < 10 or face_roi.shape[1] < 10:
             return {'skin_tone': {'hue': 0, 'saturation': 0, 'value': 0}, 'texture': 0}
         
         # Convert to different color spaces for analysis
-        face_hsv = cv2.cvtColor(face_roi, cv2.COLOR_BGR2HSV)
-        face_gray = cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY)
+        face_hsv = image.roi(face_bbox, 'HSV')
         
         # Extract skin tone (average hue and saturation in HSV)
         h_channel, s_channel, v_channel = cv2.split(face_hsv)
@@ -337,8 +188,8 @@ class FeatureExtractor:
         avg_sat = np.mean(s_sampled)
         avg_val = np.mean(v_sampled)
         
-        # Detect skin texture features - downsample for speed
-        face_gray_small = cv2.resize(face_gray, (0, 0), fx=0.5, fy=0.5)
+        # Detect skin texture features - downsample for speed (cropped from the frame's gray image if converted)
+        face_gray_small = image.roi(face_bbox, 'GRAY', scale=0.5)
         
         # Apply Gaussian blur to reduce noise
         blurred = cv2.GaussianBlur(face_gray_small, (5, 5), 0)
@@ -359,44 +210,6 @@ class FeatureExtractor:
         
         return skin_data
     
-    def _calculate_facial_ratios(self, landmarks):
-        """Calculate golden ratio and other important facial ratios - optimized for real-time"""
-        ratios = {}
-        
-        if len(landmarks) >= 68:  # Full set of dlib landmarks
-            # Calculate key facial distances
-            
-            # Vertical thirds (forehead, nose, lower face)
-            # Note: dlib doesn't detect hairline, use eyebrow top as approximation
-            eyebrow_to_nose = np.linalg.norm(np.array(landmarks[21]) - np.array(landmarks[27]))
-            nose_to_mouth = np.linalg.norm(np.array(landmarks[27]) - np.array(landmarks[51]))
-            mouth_to_chin = np.linalg.norm(np.array(landmarks[51]) - np.array(landmarks[8]))
-            
-            # The golden ratio is approximately 1.618
-            golden_ratio = 1.618
-            
-            # Compare to golden ratio
-            if nose_to_mouth > 0:
-                top_ratio = eyebrow_to_nose / nose_to_mouth
-                ratios['top_third_ratio'] = float(top_ratio)
-                ratios['top_golden_ratio_diff'] = float(abs(top_ratio - golden_ratio))
-            
-            if mouth_to_chin > 0:
-                middle_ratio = nose_to_mouth / mouth_to_chin
-                ratios['middle_third_ratio'] = float(middle_ratio)
-                ratios['middle_golden_ratio_diff'] = float(abs(middle_ratio - golden_ratio))
-            
-            # Eye spacing ratios
-            inner_eye_distance = np.linalg.norm(np.array(landmarks[39]) - np.array(landmarks[42]))
-            eye_width_left = np.linalg.norm(np.array(landmarks[36]) - np.array(landmarks[39]))
-            eye_width_right = np.linalg.norm(np.array(landmarks[42]) - np.array(landmarks[45]))
-            
-            if (eye_width_left + eye_width_right) > 0:
-                eye_spacing_ratio = inner_eye_distance / ((eye_width_left + eye_width_right) / 2)
-                ratios['eye_spacing_ratio'] = float(eye_spacing_ratio)
-        
-        return ratios
-        
     def get_processing_stats(self):
         """Return processing statistics for display"""
         return {
@@ -0,0 +1,133 @@
+"""
+Frame Context Module
+Caches the color conversions, downscaled copies and ROI crops of one frame so every analysis stage shares them.
+"""
+
+import cv2
+
+# cv2 conversion codes from the BGR frames OpenCV captures
+COLOR_CONVERSIONS = {
+    'RGB': cv2.COLOR_BGR2RGB,
+    'GRAY': cv2.COLOR_BGR2GRAY,
+    'HSV': cv2.COLOR_BGR2HSV
+}
+
+class FrameContext:
+    """Lazily computed views of one BGR video frame
+    
+    Each color space, downscaled level and ROI crop is computed the first time
+    a stage asks for it and then reused by every later stage working on the
+    same frame. Create one context per frame and pass it to FaceDetector.detect
+    and FeatureExtractor.extract_features_from_frame instead of the raw frame.
+    
+    The frame must not be modified while the context is in use.
+    """
+    
+    def __init__(self, frame):
+        """
+        Initialize the context for a frame
+        
+        Args:
+            frame (numpy.ndarray): Video frame in BGR order
+        """
+        self.frame = frame
+        self._cache = {}
+        
+        # Number of conversions and resizes actually computed for this frame
+        self.conversions = 0
+    
+    @staticmethod
+    def of(image):
+        """
+        Return image itself if it is already a FrameContext, else a new context for it
+        
+        Args:
+            image: FrameContext or BGR frame as numpy array
+        
+        Returns:
+            FrameContext: Context for the frame
+        """
+        return image if isinstance(image, FrameContext) else FrameContext(image)
+    
+    @property
+    def shape(self):
+        return self.frame.shape
+    
+    @property
+    def rgb(self):
+        return self.color('RGB')
+    
+    @property
+    def gray(self):
+        return self.color('GRAY')
+    
+    @property
+    def hsv(self):
+        return self.color('HSV')
+    
+    def _get(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+            self.conversions += 1
+        return self._cache[key]
+    
+    def color(self, space='BGR'):
+        """
+        Return the full frame in a color space
+        
+        Args:
+            space (str): 'BGR', 'RGB', 'GRAY' or 'HSV'
+        
+        Returns:
+            numpy.ndarray: Converted frame
+        """
+        if space == 'BGR':
+            return self.frame
+        return self._get(('color', space), lambda: cv2.cvtColor(self.frame, COLOR_CONVERSIONS[space]))
+    
+    def scaled(self, scale, space='BGR'):
+        """
+        Return the frame resized by scale, in a color space
+        
+        The BGR frame is resized first, so the color conversion only runs on
+        the smaller image.
+        
+        Args:
+            scale (float): Resize factor (e.g. 0.5 for half width and height)
+            space (str): 'BGR', 'RGB', 'GRAY' or 'HSV'
+        
+        Returns:
+            numpy.ndarray: Resized frame
+        """
+        if scale == 1.0:
+            return self.color(space)
+        if space != 'BGR':
+            return self._get(('scaled', scale, space),
+                             lambda: cv2.cvtColor(self.scaled(scale), COLOR_CONVERSIONS[space]))
+        interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+        return self._get(('scaled', scale, 'BGR'),
+                         lambda: cv2.resize(self.frame, None, fx=scale, fy=scale, interpolation=interpolation))
+    
+    def roi(self, bbox, space='BGR', scale=1.0):
+        """
+        Return the crop of a bounding box, in a color space and optionally resized
+        
+        Crops of a color space that is already converted for the full frame are
+        views into it; otherwise only the crop is converted.
+        
+        Args:
+            bbox (tuple): Region as (x, y, w, h)
+            space (str): 'BGR', 'RGB', 'GRAY' or 'HSV'
+            scale (float): Resize factor applied to the crop
+        
+        Returns:
+            numpy.ndarray: Cropped region
+        """
+        x, y, w, h = bbox
+        if scale != 1.0:
+            return self._get(('roi', tuple(bbox), space, scale),
+                             lambda: cv2.resize(self.roi(bbox, space), (0, 0), fx=scale, fy=scale))
+        if space == 'BGR' or ('color', space) in self._cache:
+            return self.color(space)[y:y+h, x:x+w]
+        return self._get(('roi', tuple(bbox), space),
+                         lambda: cv2.cvtColor(self.frame[y:y+h, x:x+w], COLOR_CONVERSIONS[space]))
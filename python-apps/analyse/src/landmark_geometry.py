@@ -0,0 +1,114 @@
+"""
+Landmark Geometry Module
+Computes facial metrics, symmetry and ratios from dlib's 68 landmarks for one face or a batch of faces in one vectorized pass.
+"""
+
+import numpy as np
+
+# Point pairs whose distances the measurements use (dlib 68-point indices)
+PAIRS = np.array([
+    (36, 39),   # 0: left eye width
+    (42, 45),   # 1: right eye width
+    (16, 0),    # 2: face width (temples)
+    (8, 27),    # 3: face height (chin to nose bridge)
+    (21, 27),   # 4: eyebrow to nose bridge
+    (27, 51),   # 5: nose bridge to upper lip
+    (51, 8),    # 6: upper lip to chin
+    (39, 42),   # 7: inner eye corners
+    (36, 45),   # 8-11: left point against the right point reflected across the
+    (48, 54),   #       vertical line through the nose tip (eye outer corners,
+    (21, 22),   #       mouth corners, eyebrows, nose)
+    (31, 35),
+    (37, 44),   # 12: eye level difference (vertical only)
+    (8, 27)     # 13: chin to nose bridge (vertical only)
+])
+NOSE_TIP = 30
+
+# Per-pair factors: the second point of a reflected pair has its x mirrored
+# around the nose tip, and vertical-only pairs drop the x difference
+SIGN = np.ones((len(PAIRS), 2))
+SIGN[8:12, 0] = -1
+OFFSET = np.zeros((len(PAIRS), 2))
+OFFSET[8:12, 0] = 2
+KEEP = np.ones((len(PAIRS), 2))
+KEEP[12:, 0] = 0
+
+# Numerator and denominator of every ratio as weights on the distance columns:
+# eye width ratio, face width/height ratio, eye level difference, asymmetry
+# (mean reflected distance over face width), top third ratio, middle third
+# ratio and eye spacing ratio
+NUMERATORS = [{0: 1}, {2: 1}, {12: 1}, {8: 0.25, 9: 0.25, 10: 0.25, 11: 0.25}, {4: 1}, {5: 1}, {7: 1}]
+DENOMINATORS = [{1: 1}, {3: 1}, {13: 1}, {2: 1}, {5: 1}, {6: 1}, {0: 0.5, 1: 0.5}]
+RATIO_TERMS = np.zeros((len(PAIRS), len(NUMERATORS) + len(DENOMINATORS)))
+for column, weights in enumerate(NUMERATORS + DENOMINATORS):
+    for row, weight in weights.items():
+        RATIO_TERMS[row, column] = weight
+
+# The golden ratio the facial thirds are compared to
+GOLDEN_RATIO = 1.618
+
+# Output columns: 4 distances, 7 ratios, 2 symmetry scores and 2 golden ratio differences
+METRIC_COLUMNS = {'left_eye_width': 0, 'right_eye_width': 1, 'eye_width_ratio': 4,
+                  'face_width': 2, 'face_height': 3, 'face_width_height_ratio': 5}
+SYMMETRY_COLUMNS = {'eyes_level': 11, 'overall_symmetry': 12}
+RATIO_COLUMNS = {'top_third_ratio': 8, 'top_golden_ratio_diff': 13, 'middle_third_ratio': 9,
+                 'middle_golden_ratio_diff': 14, 'eye_spacing_ratio': 10}
+# Ratio each facial ratio depends on; it is only defined when that ratio's denominator is positive
+RATIO_SOURCES = {'top_third_ratio': 4, 'top_golden_ratio_diff': 4, 'middle_third_ratio': 5,
+                 'middle_golden_ratio_diff': 5, 'eye_spacing_ratio': 6}
+
+def landmark_geometry(landmarks):
+    """
+    Calculate facial metrics, symmetry and ratios from 68-point landmarks
+    
+    Args:
+        landmarks: Landmarks of one face as a (68, 2) array or list of (x, y)
+            tuples, or of N faces as an (N, 68, 2) array
+    
+    Returns:
+        dict: 'metrics', 'symmetry' and 'facial_ratios' dictionaries. For one
+            face the values are floats and ratios with a zero denominator are
+            left out; for a batch each value is an (N,) array and such ratios
+            are NaN.
+    """
+    points = np.asarray(landmarks, dtype=np.float64)
+    single = points.ndim == 2
+    if single:
+        points = points[np.newaxis]
+    if points.shape[1:] != (68, 2):
+        raise ValueError(f"Expected (68, 2) or (N, 68, 2) landmarks, got {points.shape[-2:]}")
+    
+    # All pair distances in one pass, as an (N, 14) array
+    pairs = points[:, PAIRS]
+    nose_x = points[:, NOSE_TIP, np.newaxis, np.newaxis, 0]
+    differences = (pairs[:, :, 0] - pairs[:, :, 1] * SIGN - OFFSET * nose_x) * KEEP
+    distances = np.hypot(differences[..., 0], differences[..., 1])
+    
+    # Every ratio in one division; a ratio whose denominator is not positive is 0
+    terms = distances @ RATIO_TERMS
+    numerators, denominators = terms[:, :len(NUMERATORS)], terms[:, len(NUMERATORS):]
+    valid = denominators > 0
+    # The eye level difference is normalized by the signed chin to nose bridge height
+    valid[:, 2] = differences[:, 13, 1] > 0
+    ratios = np.divide(numerators, denominators, out=np.zeros_like(numerators), where=valid)
+    
+    # Symmetry is 1.0 for a perfectly symmetric face (or when it cannot be measured)
+    symmetry = np.maximum(0.0, 1.0 - np.minimum(1.0, ratios[:, 2:4] * (10, 3)))
+    golden_diffs = np.abs(ratios[:, 4:6] - GOLDEN_RATIO)
+    values = np.concatenate([distances[:, :4], ratios, symmetry, golden_diffs], axis=1)
+    
+    if single:
+        row = values[0].tolist()
+        return {
+            'metrics': {key: row[column] for key, column in METRIC_COLUMNS.items()},
+            'symmetry': {key: row[column] for key, column in SYMMETRY_COLUMNS.items()},
+            'facial_ratios': {key: row[column] for key, column in RATIO_COLUMNS.items()
+                              if valid[0, RATIO_SOURCES[key]]}
+        }
+    
+    return {
+        'metrics': {key: values[:, column] for key, column in METRIC_COLUMNS.items()},
+        'symmetry': {key: values[:, column] for key, column in SYMMETRY_COLUMNS.items()},
+        'facial_ratios': {key: np.where(valid[:, RATIO_SOURCES[key]], values[:, column], np.nan)
+                          for key, column in RATIO_COLUMNS.items()}
+    }
@@ -12,6 +12,7 @@ from datetime import datetime
 
 from realtime_analysis import RealtimeFacialAnalyzer
 from complete_health_analyzer import CompleteHealthAnalyzer
+from offline_analysis import OfflineAnalyzer
 
 def parse_arguments():
     """Parse command-line arguments"""
@@ -32,6 +33,8 @@ def parse_arguments():
                       default='json', help='Output format for storage')
     parser.add_argument('--camera', '-c', type=int, default=0,
                       help='Camera ID (usually 0 for built-in webcam)')
+    parser.add_argument('--input', type=str, default=None,
+                      help='Video file or image directory to analyze offline instead of the camera (facial analysis)')
     parser.add_argument('--cpu', action='store_true',
                       help='Force CPU usage instead of GPU')
     
@@ -43,6 +46,16 @@ def parse_arguments():
                       help='Save interval in seconds (facial analysis only)')
     parser.add_argument('--no-landmarks', action='store_true',
                       help='Do not display facial landmarks (facial analysis only)')
+    parser.add_argument('--detect-scale', type=float, default=0.5,
+                      help='Scale of the frame copy the dlib detector runs on (facial analysis only)')
+    parser.add_argument('--redetect-interval', type=int, default=5,
+                      help='Run the dlib detector every Nth frame and track in between (facial analysis only)')
+    
+    # Offline (--input) parameters
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                      help='Worker processes for offline analysis (default: one per CPU core)')
+    parser.add_argument('--table-format', type=str, choices=['npz', 'parquet', 'csv'],
+                      default='npz', help='Columnar output format for offline analysis')
     
     return parser.parse_args()
 
@@ -61,7 +74,28 @@ def main():
     use_gpu = not args.cpu
     
     # Run the selected analysis mode
-    if args.mode == 'face':
+    if args.input:
+        print("Starting Offline Facial Analysis")
+        analyzer = OfflineAnalyzer(
+            detection_method=args.method,
+            workers=args.workers,
+            detection_scale=args.detect_scale,
+            redetect_interval=args.redetect_interval
+        )
+        
+        try:
+            analyzer.run(args.input, args.output, args.table_format)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        except KeyboardInterrupt:
+            print("\nStopped by user")
+            return
+        
+        print("Offline facial analysis complete.")
+        return
+    
+    elif args.mode == 'face':
         print("Starting Facial Analysis Mode")
         analyzer = RealtimeFacialAnalyzer(
             detection_method=args.method,
@@ -70,7 +104,9 @@ def main():
             use_gpu=use_gpu,
             camera_id=args.camera,
             save_interval=args.interval,
-            display_landmarks=not args.no_landmarks
+            display_landmarks=not args.no_landmarks,
+            detection_scale=args.detect_scale,
+            redetect_interval=args.redetect_interval
         )
         
         try:
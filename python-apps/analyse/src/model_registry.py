@@ -0,0 +1,169 @@
+"""
+Model Registry Module
+Loads each model once per process and hands the same instance to every component that needs it.
+"""
+
+import os
+import sys
+import threading
+import time
+import cv2
+
+# Import dlib for face detection and landmarks
+try:
+    import dlib
+    DLIB_AVAILABLE = True
+except ImportError:
+    DLIB_AVAILABLE = False
+
+# Absolute path to models directory
+MODELS_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'models'))
+
+LANDMARK_MODEL_PATH = os.path.join(MODELS_DIR, 'shape_predictor_68_face_landmarks.dat')
+CAFFE_DETECTOR_MODEL_PATH = os.path.join(MODELS_DIR, 'opencv_face_detector.caffemodel')
+CAFFE_DETECTOR_CONFIG_PATH = os.path.join(MODELS_DIR, 'opencv_face_detector.prototxt')
+POSE_MODEL_PATH = os.path.join(MODELS_DIR, 'pose_model.pb')
+POSE_CONFIG_PATH = os.path.join(MODELS_DIR, 'pose_model.pbtxt')
+
+
+def current_rss_mb():
+    """Return the resident set size of this process in MB, or None if it cannot be read"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+
+    # Linux: resident pages are the second field of /proc/self/statm
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    # Otherwise fall back to the peak RSS (bytes on macOS, kilobytes elsewhere)
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        return None
+
+
+class ModelRegistry:
+    """Process-wide cache of loaded models
+
+    Models are loaded lazily, on the first request for them, and every later
+    request gets the same instance. The load time and the change in RSS of
+    each model are logged and kept in load_stats.
+
+    Shared instances are meant for components running on the same thread
+    (as the analysers do); cv2.dnn networks are not safe to run from several
+    threads at once.
+    """
+
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.RLock()
+        self.load_stats = {}
+
+    def get(self, key, loader):
+        """
+        Return the model stored under key, loading it with loader() the first time
+
+        Args:
+            key (str): Name of the model, including any option that changes it
+            loader (callable): Builds the model; called at most once per key
+
+        Returns:
+            The shared model instance
+        """
+        with self._lock:
+            if key in self._models:
+                return self._models[key]
+
+            rss_before = current_rss_mb()
+            start_time = time.perf_counter()
+            model = loader()
+            load_ms = (time.perf_counter() - start_time) * 1000
+            rss_after = current_rss_mb()
+
+            rss_delta = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+            self.load_stats[key] = {'load_ms': load_ms, 'rss_delta_mb': rss_delta}
+            memory = f", +{rss_delta:.1f} MB RSS" if rss_delta is not None else ""
+            print(f"[models] Loaded {key} in {load_ms:.0f} ms{memory}")
+
+            self._models[key] = model
+            return model
+
+    def loaded(self):
+        """Return the keys of the models loaded so far"""
+        with self._lock:
+            return list(self._models)
+
+    def summary(self):
+        """Return a one-line summary of everything loaded so far"""
+        with self._lock:
+            stats = list(self.load_stats.values())
+        total_ms = sum(s['load_ms'] for s in stats)
+        deltas = [s['rss_delta_mb'] for s in stats if s['rss_delta_mb'] is not None]
+        rss = current_rss_mb()
+        text = f"{len(stats)} models loaded in {total_ms:.0f} ms"
+        if deltas:
+            text += f" (+{sum(deltas):.1f} MB)"
+        if rss is not None:
+            text += f", process RSS {rss:.0f} MB"
+        return text
+
+    def clear(self):
+        """Drop all cached models, e.g. before reloading updated model files"""
+        with self._lock:
+            self._models.clear()
+            self.load_stats.clear()
+
+
+# The registry shared by every component in the process
+registry = ModelRegistry()
+
+
+def _enable_cuda(net, use_gpu):
+    if use_gpu and cv2.cuda.getCudaEnabledDeviceCount() > 0:
+        net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
+        net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
+    return net
+
+
+def get_landmark_predictor():
+    """Shared dlib 68-point shape predictor, or None if dlib or the model file is missing"""
+    if not DLIB_AVAILABLE or not os.path.exists(LANDMARK_MODEL_PATH):
+        return None
+    return registry.get('shape_predictor_68', lambda: dlib.shape_predictor(LANDMARK_MODEL_PATH))
+
+
+def get_dlib_face_detector():
+    """Shared dlib HOG frontal face detector, or None if dlib is missing"""
+    if not DLIB_AVAILABLE:
+        return None
+    return registry.get('dlib_hog_detector', dlib.get_frontal_face_detector)
+
+
+def get_haar_face_detector():
+    """Shared OpenCV Haar cascade for frontal faces"""
+    return registry.get('haar_frontalface', lambda: cv2.CascadeClassifier(
+        cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'))
+
+
+def get_caffe_face_detector(use_gpu=True):
+    """Shared OpenCV DNN (Caffe) face detector, or None if the model files are missing"""
+    if not (os.path.exists(CAFFE_DETECTOR_MODEL_PATH) and os.path.exists(CAFFE_DETECTOR_CONFIG_PATH)):
+        return None
+    return registry.get(f'caffe_face_detector{"_gpu" if use_gpu else ""}', lambda: _enable_cuda(
+        cv2.dnn.readNetFromCaffe(CAFFE_DETECTOR_CONFIG_PATH, CAFFE_DETECTOR_MODEL_PATH), use_gpu))
+
+
+def get_pose_net(use_gpu=True):
+    """Shared TensorFlow body pose network, or None if the model files are missing"""
+    if not (os.path.exists(POSE_MODEL_PATH) and os.path.exists(POSE_CONFIG_PATH)):
+        return None
+    return registry.get(f'pose_net{"_gpu" if use_gpu else ""}', lambda: _enable_cuda(
+        cv2.dnn.readNetFromTensorflow(POSE_MODEL_PATH, POSE_CONFIG_PATH), use_gpu))
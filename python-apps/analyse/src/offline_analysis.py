@@ -0,0 +1,334 @@
+#!/usr/bin/env python
+"""
+Offline Analysis Module
+Analyzes a video file or a directory of images as fast as possible on worker processes, without display.
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+import multiprocessing
+from datetime import datetime
+import cv2
+
+from face_detector import FaceDetector
+from feature_extractor import FeatureExtractor
+from frame_context import FrameContext
+from health_analyzer import HealthAnalyzer
+from data_storage import DataStorage
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff', '.webp')
+
+# Frames sent to a worker at a time; detector tracking runs within a chunk
+DEFAULT_CHUNK_SIZE = 16
+
+# Seconds between progress lines on the console
+PROGRESS_INTERVAL = 5.0
+
+# Models of the current worker process, created once by _init_worker
+_detector = None
+_extractor = None
+# Why the worker's models failed to load, reported by _analyze_chunk
+_init_error = None
+
+def iter_frames(input_path):
+    """
+    Decode the frames of a video file or the images of a directory in order
+    
+    Args:
+        input_path (str): Video file or directory of images
+    
+    Yields:
+        tuple: (frame_index, timestamp in seconds or None, image file name or None, BGR frame)
+    """
+    if os.path.isdir(input_path):
+        names = sorted(name for name in os.listdir(input_path) if name.lower().endswith(IMAGE_EXTENSIONS))
+        for index, name in enumerate(names):
+            frame = cv2.imread(os.path.join(input_path, name))
+            if frame is None:
+                print(f"Skipping unreadable image: {name}")
+                continue
+            yield index, None, name, frame
+        return
+    
+    capture = cv2.VideoCapture(input_path)
+    if not capture.isOpened():
+        raise ValueError(f"Could not open video: {input_path}")
+    video_fps = capture.get(cv2.CAP_PROP_FPS)
+    
+    try:
+        index = 0
+        while True:
+            ret, frame = capture.read()
+            if not ret:
+                break
+            yield index, index / video_fps if video_fps > 0 else None, None, frame
+            index += 1
+    finally:
+        capture.release()
+
+def _init_worker(detection_method, detection_scale, redetect_interval):
+    """Load the models once per worker process"""
+    global _detector, _extractor, _init_error
+    
+    # One OpenCV thread per process; the parallelism comes from the processes
+    cv2.setNumThreads(1)
+    # An initializer that raises makes the pool respawn the worker forever,
+    # so the error is kept and raised from the first chunk instead
+    try:
+        _detector = FaceDetector(method=detection_method, use_gpu=False,
+                                 detection_scale=detection_scale, redetect_interval=redetect_interval)
+        _extractor = FeatureExtractor(use_gpu=False)
+    except Exception as e:
+        _init_error = f"Could not load the analysis models: {e}"
+
+def _analyze_chunk(chunk):
+    """
+    Detect the primary face in each frame of a chunk and extract its features
+    
+    Args:
+        chunk (tuple): (chunk number, list of frames as yielded by iter_frames)
+    
+    Returns:
+        tuple: (chunk number, list of (frame_index, timestamp, source, features or None))
+    """
+    if _init_error is not None:
+        raise ValueError(_init_error)
+    chunk_number, frames = chunk
+    
+    # Frames of the previous chunk this worker saw are not the ones before this chunk
+    _detector.reset_tracking()
+    
+    results = []
+    for frame_index, timestamp, source, frame in frames:
+        context = FrameContext(frame)
+        faces = _detector.detect(context)
+        
+        features = None
+        if len(faces) > 0:
+            # The largest face is the subject, as in real-time analysis
+            x, y, w, h = max(faces, key=lambda face: face[2] * face[3])
+            features = _extractor.extract_features_from_frame(context, (int(x), int(y), int(w), int(h)))
+        results.append((frame_index, timestamp, source, features))
+    
+    return chunk_number, results
+
+class OfflineAnalyzer:
+    """Analyzes recorded video or images on several worker processes with results in frame order"""
+    
+    def __init__(self, detection_method='dlib', workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 detection_scale=0.5, redetect_interval=5):
+        """
+        Initialize the offline analyzer
+        
+        Args:
+            detection_method (str): Face detection method ('opencv', 'dlib')
+            workers (int): Number of worker processes (default: one per CPU core)
+            chunk_size (int): Frames sent to a worker at a time
+            detection_scale (float): Scale of the frame copy the dlib detector runs on
+            redetect_interval (int): Run the detector every Nth frame of a chunk and track in between
+        """
+        self.detection_method = detection_method
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self.detection_scale = detection_scale
+        self.redetect_interval = redetect_interval
+        self.frames_per_second = 0
+        
+        # Health analysis keeps a history for trends, so it runs here on frames in order
+        self.health_analyzer = HealthAnalyzer()
+        self.storage = DataStorage()
+    
+    def _chunks(self, input_path, in_flight, stop_event):
+        """Group decoded frames into numbered chunks, holding back while too many are in flight"""
+        chunk = []
+        chunk_number = 0
+        for item in iter_frames(input_path):
+            chunk.append(item)
+            if len(chunk) < self.chunk_size:
+                continue
+            while not in_flight.acquire(timeout=0.1):
+                if stop_event.is_set():
+                    return
+            yield chunk_number, chunk
+            chunk = []
+            chunk_number += 1
+        
+        if chunk:
+            while not in_flight.acquire(timeout=0.1):
+                if stop_event.is_set():
+                    return
+            yield chunk_number, chunk
+    
+    def analyze(self, input_path):
+        """
+        Analyze every frame of a video file or image directory
+        
+        Args:
+            input_path (str): Video file or directory of images
+        
+        Returns:
+            list: Analysis result dictionaries in frame order
+        """
+        if not os.path.exists(input_path):
+            raise ValueError(f"Input not found: {input_path}")
+        if not os.path.isdir(input_path):
+            capture = cv2.VideoCapture(input_path)
+            opened = capture.isOpened()
+            capture.release()
+            if not opened:
+                raise ValueError(f"Could not open video: {input_path}")
+        
+        # Load the models here first, so missing or broken models fail before any worker starts
+        try:
+            FaceDetector(method=self.detection_method, use_gpu=False,
+                         detection_scale=self.detection_scale, redetect_interval=self.redetect_interval)
+            FeatureExtractor(use_gpu=False)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Could not load the analysis models: {e}") from e
+        
+        print(f"Analyzing {input_path} on {self.workers} worker processes")
+        
+        # Pool's task-feeder thread pulls chunks from the generator, so decoding overlaps
+        # with analysis; the semaphore keeps decoding at most two chunks per worker ahead
+        in_flight = threading.BoundedSemaphore(2 * self.workers)
+        stop_event = threading.Event()
+        pending = {}
+        next_chunk = 0
+        results = []
+        frames_done = 0
+        faces_found = 0
+        
+        start_time = time.perf_counter()
+        next_progress = start_time + PROGRESS_INTERVAL
+        pool = multiprocessing.Pool(
+            self.workers, initializer=_init_worker,
+            initargs=(self.detection_method, self.detection_scale, self.redetect_interval))
+        try:
+            for chunk_number, chunk_results in pool.imap_unordered(
+                    _analyze_chunk, self._chunks(input_path, in_flight, stop_event)):
+                in_flight.release()
+                pending[chunk_number] = chunk_results
+                
+                # Hand on the chunks that are now complete in frame order
+                while next_chunk in pending:
+                    for frame_index, timestamp, source, features in pending.pop(next_chunk):
+                        results.append(self._make_result(frame_index, timestamp, source, features))
+                        frames_done += 1
+                        faces_found += features is not None
+                    next_chunk += 1
+                
+                if time.perf_counter() >= next_progress:
+                    next_progress = time.perf_counter() + PROGRESS_INTERVAL
+                    elapsed = time.perf_counter() - start_time
+                    print(f"  {frames_done} frames, {frames_done / elapsed:.1f} frames/s")
+            pool.close()
+        except BaseException:
+            stop_event.set()
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+        
+        elapsed = time.perf_counter() - start_time
+        self.frames_per_second = frames_done / elapsed if elapsed > 0 else 0
+        print(f"Analyzed {frames_done} frames ({faces_found} with a face) in {elapsed:.1f} s: "
+              f"{self.frames_per_second:.1f} frames/s on {self.workers} workers")
+        return results
+    
+    def _make_result(self, frame_index, timestamp, source, features):
+        """Build the stored record of one frame and run the health analysis on its features"""
+        result = {
+            'frame_index': frame_index,
+            'face_found': features is not None
+        }
+        if timestamp is not None:
+            result['timestamp'] = timestamp
+        if source is not None:
+            result['source'] = source
+        if features is None:
+            return result
+        
+        x, y, w, h = features['bbox']
+        result.update({'face_x': x, 'face_y': y, 'face_width': w, 'face_height': h})
+        result['features'] = features
+        result['health_analysis'] = self.health_analyzer.analyze(features)
+        return result
+    
+    def run(self, input_path, output_dir, table_format='npz'):
+        """
+        Analyze the input and save all results as one columnar table
+        
+        Args:
+            input_path (str): Video file or directory of images
+            output_dir (str): Directory to save the table in
+            table_format (str): Output format ('npz', 'parquet', or 'csv')
+        
+        Returns:
+            str: Path to the saved table
+        """
+        # Fail before the analysis, not after it, if the table cannot be written
+        self.storage.check_columnar_format(table_format)
+        results = self.analyze(input_path)
+        
+        os.makedirs(output_dir, exist_ok=True)
+        name = os.path.splitext(os.path.basename(os.path.normpath(input_path)))[0]
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_file = self.storage.save_columns(
+            results, os.path.join(output_dir, f"offline_analysis_{name}_{timestamp}"), table_format)
+        print(f"Saved {len(results)} rows to {output_file}")
+        return output_file
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Offline facial analysis of a video file or image directory')
+    parser.add_argument('input', type=str,
+                      help='Video file or directory of images')
+    default_output_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'output')
+    parser.add_argument('--output', '-o', type=str, default=default_output_dir,
+                      help='Directory to save analysis results')
+    parser.add_argument('--table-format', type=str, default='npz',
+                      choices=['npz', 'parquet', 'csv'],
+                      help='Columnar output format (parquet needs pyarrow or fastparquet)')
+    parser.add_argument('--method', '-m', type=str, default='dlib',
+                      choices=['opencv', 'dlib'],
+                      help='Face detection method')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                      help='Number of worker processes (default: one per CPU core)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                      help='Frames sent to a worker at a time')
+    parser.add_argument('--detect-scale', type=float, default=0.5,
+                      help='Scale of the frame copy the dlib detector runs on (1.0 = full frame)')
+    parser.add_argument('--redetect-interval', type=int, default=5,
+                      help='Run the dlib detector every Nth frame and track the face in between (1 = detect every frame)')
+    
+    return parser.parse_args()
+
+def main():
+    """Main entry point"""
+    args = parse_arguments()
+    
+    analyzer = OfflineAnalyzer(
+        detection_method=args.method,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        detection_scale=args.detect_scale,
+        redetect_interval=args.redetect_interval
+    )
+    
+    try:
+        analyzer.run(args.input, args.output, args.table_format)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    except KeyboardInterrupt:
+        print("\nStopped by user")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -26,6 +26,8 @@ except ImportError:
 
 from face_detector import FaceDetector
 from feature_extractor import FeatureExtractor
+from frame_context import FrameContext
+from model_registry import registry
 from health_analyzer import HealthAnalyzer
 from data_storage import DataStorage
 
@@ -34,7 +36,8 @@ class RealtimeFacialAnalyzer:
     
     def __init__(self, detection_method='dlib', output_dir=None, 
                  save_format='json', use_gpu=True, camera_id=0, 
-                 save_interval=10, display_landmarks=True):
+                 save_interval=10, display_landmarks=True,
+                 detection_scale=0.5, redetect_interval=5):
         """
         Initialize the real-time facial analyzer
         
@@ -46,6 +49,8 @@ class RealtimeFacialAnalyzer:
             camera_id (int): Camera ID for webcam (usually 0 for built-in)
             save_interval (int): Interval in seconds between data saves
             display_landmarks (bool): Whether to display facial landmarks on video
+            detection_scale (float): Scale of the frame copy the dlib detector runs on (1.0 = full frame)
+            redetect_interval (int): Run the detector every Nth processed frame and track the face in between
         """
         # Use absolute path for output directory if one wasn't provided
         if output_dir is None:
@@ -63,16 +68,20 @@ class RealtimeFacialAnalyzer:
         
         # Initialize components with GPU support
         print(f"Initializing with GPU acceleration: {use_gpu}")
-        self.detector = FaceDetector(method=detection_method, use_gpu=use_gpu)
+        self.detector = FaceDetector(method=detection_method, use_gpu=use_gpu,
+                                     detection_scale=detection_scale, redetect_interval=redetect_interval)
         self.feature_extractor = FeatureExtractor(use_gpu=use_gpu)
         self.health_analyzer = HealthAnalyzer()
         self.storage = DataStorage()
+        print(f"Models ready: {registry.summary()}")
         
         # For video processing
         self.video_capture = None
         self.frame_count = 0
         self.skip_frames = 1  # Process every Nth frame (adjust for performance)
         self.processing_fps = 0
+        self.processed_frames = 0
+        self.processing_time = 0.0
         self.display_fps = 0
         self.last_fps_update = time.time()
         self.fps_update_interval = 1.0  # Update FPS display every 1 second
@@ -151,8 +160,21 @@ class RealtimeFacialAnalyzer:
         # Close all OpenCV windows
         cv2.destroyAllWindows()
         
+        self._print_processing_summary()
         print("Real-time facial analysis stopped")
     
+    def _print_processing_summary(self):
+        """Print the average processing FPS of the session and how its frames were detected"""
+        if self.processed_frames == 0:
+            return
+        
+        average_fps = self.processed_frames / self.processing_time if self.processing_time > 0 else 0
+        print(f"Processed {self.processed_frames} frames at {average_fps:.1f} FPS on average "
+              f"(detection scale {self.detector.detection_scale}, re-detect every "
+              f"{self.detector.redetect_interval} frames)")
+        if self.detector.method == 'dlib':
+            print(f"  {self.detector.detection_count} detector runs, {self.detector.tracked_count} tracked frames")
+    
     def _processing_worker(self):
         """Background worker thread for face detection and analysis"""
         frame_times = []
@@ -170,8 +192,11 @@ class RealtimeFacialAnalyzer:
             
             start_time = time.time()
             
+            # Conversions of this frame are computed once and shared by detection and feature extraction
+            context = FrameContext(frame)
+            
             # Detect faces
-            faces = self.detector.detect(frame)
+            faces = self.detector.detect(context)
             
             # Find primary face (largest in the frame, assumed to be the user)
             primary_face = None
@@ -191,7 +216,7 @@ class RealtimeFacialAnalyzer:
                     face_detection_count += 1
                     
                     # Extract features for the primary face
-                    features = self.feature_extractor.extract_features_from_frame(frame, primary_face)
+                    features = self.feature_extractor.extract_features_from_frame(context, primary_face)
                     
                     # Analyze health indicators
                     health_data = self.health_analyzer.analyze(features)
@@ -269,6 +294,9 @@ class RealtimeFacialAnalyzer:
             if len(frame_times) > max_times:
                 frame_times.pop(0)
             
+            self.processed_frames += 1
+            self.processing_time += processing_time
+            
             avg_time = sum(frame_times) / len(frame_times)
             self.processing_fps = 1.0 / avg_time if avg_time > 0 else 0
             
@@ -611,6 +639,10 @@ def parse_arguments():
                       help='Process every Nth frame (1 = process all frames)')
     parser.add_argument('--no-landmarks', action='store_true',
                       help='Do not display facial landmarks')
+    parser.add_argument('--detect-scale', type=float, default=0.5,
+                      help='Scale of the frame copy the dlib detector runs on (1.0 = full frame)')
+    parser.add_argument('--redetect-interval', type=int, default=5,
+                      help='Run the dlib detector every Nth processed frame and track the face in between (1 = detect every frame)')
     
     return parser.parse_args()
 
@@ -640,7 +672,9 @@ def main():
         use_gpu=not args.cpu,
         camera_id=args.camera,
         save_interval=args.interval,
-        display_landmarks=not args.no_landmarks
+        display_landmarks=not args.no_landmarks,
+        detection_scale=args.detect_scale,
+        redetect_interval=args.redetect_interval
     )
     
     analyzer.skip_frames = args.skip_frames
@@ -0,0 +1,220 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+from embedding_cache import IMAGE_EXTENSIONS
+from enrollment import default_workers
+from gallery import FaceGallery, MATCH_THRESHOLD
+from person_profiles import (DATASET_DIR, detect_faces, embed_faces, load_known_faces, load_models,
+                             models_available)
+
+# Frames decoded by one worker task; larger chunks amortize the seek into the video
+VIDEO_CHUNK_FRAMES = 300
+
+# Images handed to one worker task
+IMAGE_CHUNK_SIZE = 64
+
+# Faces smaller than this (in pixels) are reported as Unknown without embedding
+MIN_FACE_SIZE = 20
+
+# Detector, recognizer and gallery loaded once per worker process by _init_worker
+_worker_state = None
+
+
+def _init_worker(embeddings, names, match_threshold, detection_threshold):
+    global _worker_state
+    # stdout may carry the JSONL stream; keep model loading messages off it
+    sys.stdout = sys.stderr
+    # Every worker gets its own core; keep OpenCV from spawning threads on top
+    cv2.setNumThreads(1)
+    face_detector_model, face_recognizer_model = load_models(use_cuda=False)
+    _worker_state = (face_detector_model, face_recognizer_model, FaceGallery(embeddings, names),
+                     match_threshold, detection_threshold)
+
+
+def recognize_faces(frame, face_detector_model, face_recognizer_model, gallery,
+                    match_threshold=MATCH_THRESHOLD, detection_threshold=0.5):
+    """Detect and identify every face in a frame.
+
+    Returns a list of (box, identity, distance); distance is None for faces
+    too small to embed or when the gallery is empty.
+    """
+    boxes = detect_faces(frame, face_detector_model, detection_threshold)
+    faces = [(None, None)] * len(boxes)
+
+    crops = []
+    crop_indices = []
+    for i, (left, top, right, bottom) in enumerate(boxes):
+        if right - left >= MIN_FACE_SIZE and bottom - top >= MIN_FACE_SIZE:
+            crops.append(frame[top:bottom, left:right])
+            crop_indices.append(i)
+
+    if crops and len(gallery):
+        names, distances = gallery.match(embed_faces(crops, face_recognizer_model), k=1)
+        for i, name, distance in zip(crop_indices, names[:, 0], distances[:, 0]):
+            faces[i] = (name, float(distance))
+
+    results = []
+    for box, (name, distance) in zip(boxes, faces):
+        identity = name if distance is not None and distance < match_threshold else "Unknown"
+        results.append(([int(v) for v in box], identity, distance))
+    return results
+
+
+def _frame_records(source, frame_index, frame, extra=None):
+    face_detector_model, face_recognizer_model, gallery, match_threshold, detection_threshold = _worker_state
+    records = []
+    for box, identity, distance in recognize_faces(frame, face_detector_model, face_recognizer_model,
+                                                   gallery, match_threshold, detection_threshold):
+        record = {"source": source, "frame": frame_index}
+        if extra:
+            record.update(extra)
+        record.update({"box": box, "identity": identity,
+                       "distance": None if distance is None else round(distance, 4)})
+        records.append(record)
+    return records
+
+
+def _process_task(task):
+    """Run one chunk of work; returns (source, frames processed, records, error)"""
+    kind, source = task[0], task[1]
+    records = []
+    frames = 0
+    try:
+        if kind == "video":
+            start, count = task[2], task[3]
+            video = cv2.VideoCapture(source)
+            if start:
+                video.set(cv2.CAP_PROP_POS_FRAMES, start)
+            fps = video.get(cv2.CAP_PROP_FPS) or 0
+            while count is None or frames < count:
+                ret, frame = video.read()
+                if not ret:
+                    break
+                frame_index = start + frames
+                extra = {"time": round(frame_index / fps, 3)} if fps > 0 else None
+                records.extend(_frame_records(source, frame_index, frame, extra))
+                frames += 1
+            video.release()
+        else:
+            for frame_index, image_path in task[2]:
+                frame = cv2.imread(image_path)
+                if frame is None:
+                    continue
+                records.extend(_frame_records(source, frame_index, frame,
+                                              {"image": os.path.relpath(image_path, source)}))
+                frames += 1
+    except Exception as e:
+        return source, frames, records, str(e)
+    return source, frames, records, None
+
+
+def build_tasks(inputs, video_chunk_frames=VIDEO_CHUNK_FRAMES, image_chunk_size=IMAGE_CHUNK_SIZE):
+    """Split input videos and image directories into independent chunks of frames"""
+    tasks = []
+    for path in inputs:
+        if os.path.isdir(path):
+            image_paths = []
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                image_paths.extend(os.path.join(root, f) for f in sorted(files)
+                                   if f.lower().endswith(IMAGE_EXTENSIONS))
+            indexed = list(enumerate(image_paths))
+            for i in range(0, len(indexed), image_chunk_size):
+                tasks.append(("images", path, indexed[i:i + image_chunk_size]))
+            continue
+
+        video = cv2.VideoCapture(path)
+        if not video.isOpened():
+            print(f"Skipping {path}: not a directory or readable video", file=sys.stderr)
+            continue
+        frame_count = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+        video.release()
+        if frame_count <= 0:
+            # Unknown length (e.g. some streams); decode it as one task
+            tasks.append(("video", path, 0, None))
+            continue
+        for start in range(0, frame_count, video_chunk_frames):
+            tasks.append(("video", path, start, min(video_chunk_frames, frame_count - start)))
+    return tasks
+
+
+def run(inputs, output, workers, match_threshold, detection_threshold, video_chunk_frames):
+    if not models_available():
+        print("Model files not found. Please run main.py first to download the models.", file=sys.stderr)
+        return 1
+
+    # Enrollment uses the same embedding cache as the live view
+    face_detector_model, face_recognizer_model = load_models(use_cuda=False)
+    known_face_encodings, known_face_names = load_known_faces(DATASET_DIR, face_detector_model,
+                                                              face_recognizer_model)
+    gallery = FaceGallery(known_face_encodings, known_face_names)
+    del known_face_encodings, face_detector_model, face_recognizer_model
+    print(f"Gallery: {len(gallery)} faces for {len(gallery.people())} people", file=sys.stderr)
+
+    tasks = build_tasks(inputs, video_chunk_frames)
+    if not tasks:
+        print("Nothing to process.", file=sys.stderr)
+        return 1
+
+    frames = {}
+    faces = 0
+    start = time.time()
+    # map() yields chunks in submission order, so records stream out in frame order
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(gallery.matrix, list(gallery.names), match_threshold,
+                                       detection_threshold)) as executor:
+        for source, chunk_frames, records, error in executor.map(_process_task, tasks):
+            for record in records:
+                output.write(json.dumps(record) + "\n")
+            output.flush()
+            if error:
+                print(f"\nError in {source}: {error}", file=sys.stderr)
+            frames[source] = frames.get(source, 0) + chunk_frames
+            faces += len(records)
+            total = sum(frames.values())
+            elapsed = time.time() - start
+            print(f"\r  {total} frames, {faces} faces, {total / max(elapsed, 1e-6):.1f} fps",
+                  end="", file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+
+    elapsed = time.time() - start
+    total = sum(frames.values())
+    for source, count in frames.items():
+        print(f"  {source}: {count} frames", file=sys.stderr)
+    print(f"Processed {total} frames ({faces} faces) in {elapsed:.1f} s with {workers} workers: "
+          f"{total / max(elapsed, 1e-6):.1f} fps", file=sys.stderr)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Recognize faces in video files or image folders without a GUI and write JSONL")
+    parser.add_argument("inputs", nargs="+", help="Video files and/or directories of images")
+    parser.add_argument("-o", "--output", help="JSONL output file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="Worker processes")
+    parser.add_argument("--threshold", type=float, default=MATCH_THRESHOLD,
+                        help="Maximum cosine distance for a match")
+    parser.add_argument("--detection-threshold", type=float, default=0.5, help="Minimum detector confidence")
+    parser.add_argument("--chunk-frames", type=int, default=VIDEO_CHUNK_FRAMES,
+                        help="Video frames per worker task")
+    args = parser.parse_args()
+
+    output = open(args.output, 'w') if args.output else sys.stdout
+    # Progress and status messages go to stderr so stdout carries only JSONL
+    sys.stdout = sys.stderr
+    try:
+        return run(args.inputs, output, args.workers, args.threshold, args.detection_threshold,
+                   args.chunk_frames)
+    finally:
+        if args.output:
+            output.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import argparse
+import time
+
+import numpy as np
+
+from embedding_cache import EmbeddingCache
+from gallery import EMBEDDING_DIM, MATCH_THRESHOLD, FaceGallery
+from person_profiles import ENCODINGS_DIR, MODEL_PATHS, models_available
+
+
+def load_cached_dataset():
+    """Enrollment embeddings and names from the embedding cache, or (None, None)"""
+    if not models_available():
+        return None, None
+    cache = EmbeddingCache(ENCODINGS_DIR, MODEL_PATHS)
+    manifest, embeddings = cache.load()
+    if manifest is None or manifest["rows"] == 0:
+        return None, None
+    return np.array(embeddings), np.array(cache._names(manifest["entries"], manifest["rows"]), dtype=object)
+
+
+def synthetic_dataset(people, images, outlier_rate, rng):
+    """Clustered embeddings: a few poses per person plus some misdetected crops"""
+    embeddings = []
+    names = []
+    for person in range(people):
+        poses = rng.standard_normal((3, EMBEDDING_DIM)) * 0.6 + rng.standard_normal(EMBEDDING_DIM)
+        for _ in range(images):
+            if rng.random() < outlier_rate:
+                embeddings.append(rng.standard_normal(EMBEDDING_DIM))
+            else:
+                embeddings.append(poses[rng.integers(len(poses))] + rng.standard_normal(EMBEDDING_DIM) * 0.6)
+            names.append(f"person_{person}")
+    return np.array(embeddings, dtype=np.float32), np.array(names, dtype=object)
+
+
+def split_queries(names, query_fraction, rng):
+    """Hold out a fraction of each person's images as queries"""
+    query = np.zeros(len(names), dtype=bool)
+    for name in np.unique(names.astype(str)):
+        rows = np.flatnonzero(names == name)
+        if len(rows) < 2:
+            continue
+        count = max(1, int(round(len(rows) * query_fraction)))
+        query[rng.choice(rows, size=min(count, len(rows) - 1), replace=False)] = True
+    return query
+
+
+def evaluate(gallery, queries, truth, threshold, repeats):
+    """Return (accuracy, wrong-match rate, unknown rate, ms per query)"""
+    predicted = np.array(gallery.identify(queries, threshold), dtype=object)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        gallery.identify(queries, threshold)
+        timings.append((time.perf_counter() - start) * 1000)
+    unknown = predicted == "Unknown"
+    correct = predicted == truth
+    return (correct.mean(), (~correct & ~unknown).mean(), unknown.mean(),
+            float(np.median(timings)) / len(queries))
+
+
+def run(prototype_counts, threshold, query_fraction, repeats, synthetic, people, images):
+    rng = np.random.default_rng(0)
+    embeddings, names = (None, None) if synthetic else load_cached_dataset()
+    if embeddings is None:
+        if not synthetic:
+            print("No embedding cache found (run the recognizer once to build it); using synthetic data.")
+        embeddings, names = synthetic_dataset(people, images, 0.1, rng)
+
+    query = split_queries(names, query_fraction, rng)
+    queries, truth = embeddings[query], names[query]
+    full = FaceGallery(embeddings[~query], names[~query])
+    print(f"{len(full)} enrollment embeddings for {len(full.people())} people, "
+          f"{len(queries)} held-out queries, threshold {threshold}")
+    print(f"{'gallery':>12} {'rows':>8} {'accuracy':>9} {'wrong':>7} {'unknown':>8} "
+          f"{'us/query':>9} {'speedup':>8}")
+
+    baseline_ms = None
+    for max_prototypes in [None] + list(prototype_counts):
+        gallery = full if max_prototypes is None else full.compact(max_prototypes)
+        accuracy, wrong, unknown, ms = evaluate(gallery, queries, truth, threshold, repeats)
+        if baseline_ms is None:
+            baseline_ms = ms
+        label = "all" if max_prototypes is None else f"{max_prototypes}/person"
+        print(f"{label:>12} {len(gallery):>8} {accuracy:>9.1%} {wrong:>7.1%} {unknown:>8.1%} "
+              f"{ms * 1000:>9.2f} {baseline_ms / ms:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accuracy and speed of prototype-compacted galleries")
+    parser.add_argument("--prototypes", type=int, nargs="+", default=[1, 3, 5, 10],
+                        help="Maximum prototypes per identity to test")
+    parser.add_argument("--threshold", type=float, default=MATCH_THRESHOLD, help="Match distance threshold")
+    parser.add_argument("--query-fraction", type=float, default=0.2,
+                        help="Fraction of each person's images held out as queries")
+    parser.add_argument("--repeats", type=int, default=20, help="Timed runs per gallery")
+    parser.add_argument("--synthetic", action="store_true", help="Use synthetic embeddings instead of the dataset")
+    parser.add_argument("--people", type=int, default=200, help="Synthetic identities")
+    parser.add_argument("--images", type=int, default=50, help="Synthetic images per identity")
+    args = parser.parse_args()
+
+    run(args.prototypes, args.threshold, args.query_fraction, args.repeats, args.synthetic,
+        args.people, args.images)
+
+
+if __name__ == "__main__":
+    main()
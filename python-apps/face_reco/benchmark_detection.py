@@ -0,0 +1,84 @@
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from detection import AdaptiveDetector, detect_full_frame
+from person_profiles import CAFFEMODEL_PATH, PROTOTXT_PATH, models_available
+
+# Faces narrower than this (in pixels) count as small in the report
+SMALL_FACE_WIDTH = 48
+
+
+def read_frames(source, count):
+    """Read up to count frames from a video file or camera index"""
+    video_capture = cv2.VideoCapture(int(source) if source.isdigit() else source)
+    video_capture.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
+    video_capture.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+    frames = []
+    while len(frames) < count:
+        ret, frame = video_capture.read()
+        if not ret:
+            break
+        frames.append(frame)
+    video_capture.release()
+    return frames
+
+
+def measure(frames, detect):
+    timings = []
+    faces = 0
+    small_faces = 0
+    for frame in frames:
+        start = time.perf_counter()
+        boxes = detect(frame)
+        timings.append((time.perf_counter() - start) * 1000)
+        faces += len(boxes)
+        small_faces += sum(1 for left, _, right, _ in boxes if right - left < SMALL_FACE_WIDTH)
+    return np.array(timings), faces, small_faces
+
+
+def run(source, count, full_scan_interval):
+    if not models_available():
+        print("Model files not found. Run main.py first to download the models.")
+        return
+
+    frames = read_frames(source, count)
+    if not frames:
+        print(f"Could not read frames from {source}")
+        return
+    h, w = frames[0].shape[:2]
+
+    face_detector_model = cv2.dnn.readNetFromCaffe(PROTOTXT_PATH, CAFFEMODEL_PATH)
+    # Warm up so network allocation is not timed
+    detect_full_frame(frames[0], face_detector_model)
+
+    detector = AdaptiveDetector(full_scan_interval=full_scan_interval)
+    modes = [
+        ("full frame", lambda frame: detect_full_frame(frame, face_detector_model)),
+        ("adaptive", lambda frame: detector.detect(frame, face_detector_model)),
+    ]
+
+    print(f"{len(frames)} frames at {w}x{h} from {source}")
+    print(f"{'mode':>10} {'p50 (ms)':>9} {'p95 (ms)':>9} {'fps':>7} {'faces':>7} {'small':>7}")
+    for name, detect in modes:
+        timings, faces, small_faces = measure(frames, detect)
+        print(f"{name:>10} {np.percentile(timings, 50):>9.2f} {np.percentile(timings, 95):>9.2f} "
+              f"{1000 / timings.mean():>7.1f} {faces:>7} {small_faces:>7}")
+    print(f"Adaptive: {detector.roi_scans} region passes, {detector.full_scans} full-frame scans")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare full-frame and ROI-guided face detection")
+    parser.add_argument("source", nargs="?", default="0", help="Video file or camera index (default: 0)")
+    parser.add_argument("--frames", type=int, default=300, help="Number of frames to test")
+    parser.add_argument("--full-scan-interval", type=int, default=10,
+                        help="Detection passes between full-frame scans in adaptive mode")
+    args = parser.parse_args()
+
+    run(args.source, args.frames, args.full_scan_interval)
+
+
+if __name__ == "__main__":
+    main()
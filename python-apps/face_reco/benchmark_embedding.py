@@ -0,0 +1,64 @@
+import argparse
+import os
+import time
+
+import cv2
+import numpy as np
+
+from person_profiles import OPENFACE_PATH, embed_faces
+
+
+def make_crops(count, rng):
+    """Random face-sized crops with varying shapes, like detector output"""
+    crops = []
+    for _ in range(count):
+        h, w = rng.integers(60, 220, size=2)
+        crops.append(rng.integers(0, 255, size=(h, w, 3), dtype=np.uint8))
+    return crops
+
+
+def run(batch_sizes, faces, repeats):
+    if not os.path.exists(OPENFACE_PATH):
+        print(f"Recognition model not found at {OPENFACE_PATH}. Run main.py first to download the models.")
+        return
+
+    face_recognizer_model = cv2.dnn.readNetFromTorch(OPENFACE_PATH)
+    face_recognizer_model.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+    face_recognizer_model.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+
+    crops = make_crops(faces, np.random.default_rng(0))
+
+    print(f"Embedding {faces} face crops on CPU, median of {repeats} runs")
+    print(f"{'batch':>6} {'total (ms)':>12} {'per face (ms)':>15} {'speedup':>9}")
+
+    baseline = None
+    for batch_size in batch_sizes:
+        # Warm up so layer allocation for this batch shape is not timed
+        embed_faces(crops[:batch_size], face_recognizer_model, batch_size)
+
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            embed_faces(crops, face_recognizer_model, batch_size)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        total_ms = float(np.median(timings))
+        per_face_ms = total_ms / faces
+        if baseline is None:
+            baseline = per_face_ms
+        print(f"{batch_size:>6} {total_ms:>12.2f} {per_face_ms:>15.3f} {baseline / per_face_ms:>8.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-face OpenFace latency against batch size")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32],
+                        help="Batch sizes to test (the first one is the baseline)")
+    parser.add_argument("--faces", type=int, default=64, help="Number of face crops embedded per run")
+    parser.add_argument("--repeats", type=int, default=10, help="Timed runs per batch size")
+    args = parser.parse_args()
+
+    run(args.batch_sizes, args.faces, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import time
+
+import numpy as np
+
+from gallery import EMBEDDING_DIM, GALLERY_DTYPES, FaceGallery
+
+
+def loop_face_distance(known_embeddings, face_embedding):
+    """The original per-identity matching loop, kept as the baseline"""
+    face_embedding = face_embedding / np.linalg.norm(face_embedding)
+    distances = []
+    for emb in known_embeddings:
+        emb = emb / np.linalg.norm(emb)
+        distances.append(1.0 - np.dot(face_embedding, emb))
+    return np.array(distances)
+
+
+def time_call(fn, repeats):
+    """Return the median wall time of fn() in milliseconds"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def run(sizes, faces_per_frame, top_k, repeats, dtypes):
+    rng = np.random.default_rng(0)
+    faces = rng.standard_normal((faces_per_frame, EMBEDDING_DIM)).astype(np.float32)
+
+    print(f"Matching {faces_per_frame} face(s) per frame, top-{top_k}, median of {repeats} runs")
+    print(f"{'gallery':>10} {'loop (ms)':>12} " + " ".join(f"{dtype + ' ms / MB':>20}" for dtype in dtypes)
+          + f" {'speedup':>9}")
+
+    for size in sizes:
+        known = list(rng.standard_normal((size, EMBEDDING_DIM)).astype(np.float32))
+        names = [f"person_{i % 1000}" for i in range(size)]
+
+        # The loop baseline is slow at large sizes, so time it fewer times
+        loop_repeats = max(1, repeats // 10) if size >= 100000 else repeats
+        loop_ms = time_call(lambda: [loop_face_distance(known, face) for face in faces], loop_repeats)
+
+        columns = []
+        best_ms = None
+        for dtype in dtypes:
+            gallery = FaceGallery(known, names, dtype=dtype)
+            matrix_ms = time_call(lambda: gallery.match(faces, k=top_k), repeats)
+            best_ms = matrix_ms if best_ms is None else min(best_ms, matrix_ms)
+            columns.append(f"{matrix_ms:>10.2f} / {gallery.nbytes / 1e6:<7.1f}")
+
+        print(f"{size:>10} {loop_ms:>12.2f} " + " ".join(columns) + f" {loop_ms / best_ms:>8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark gallery matching against the per-identity loop")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Number of enrolled embeddings to test")
+    parser.add_argument("--faces", type=int, default=4, help="Faces per frame")
+    parser.add_argument("--top-k", type=int, default=5, help="Number of matches returned per face")
+    parser.add_argument("--repeats", type=int, default=20, help="Timed runs per measurement")
+    parser.add_argument("--dtypes", nargs="+", default=list(GALLERY_DTYPES), choices=GALLERY_DTYPES,
+                        help="Gallery storage types to time")
+    args = parser.parse_args()
+
+    run(args.sizes, args.faces, args.top_k, args.repeats, args.dtypes)
+
+
+if __name__ == "__main__":
+    main()
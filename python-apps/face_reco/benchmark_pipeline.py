@@ -0,0 +1,213 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from gallery import EMBEDDING_DIM, GALLERY_DTYPES, FaceGallery
+from hud import HudRenderer
+from person_profiles import (SCRIPT_DIR, PersonProfile, detect_faces, draw_profile_box, embed_faces, load_models,
+                             models_available)
+
+STAGES = ("detect", "embed", "match", "hud")
+
+# Untimed frames at the start of every run
+WARMUP_FRAMES = 5
+
+# Side of the synthetic face crops, in pixels
+FACE_SIZE = 120
+
+# Default results file, kept out of the working directory and of git
+DEFAULT_OUTPUT = os.path.join(SCRIPT_DIR, "output", "pipeline_benchmark.json")
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unavailable"""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+        except (ImportError, AttributeError):
+            return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def load_frames(clip, count, width, height):
+    """Frames from a recorded clip (looped if short), or synthetic noise frames"""
+    if clip:
+        video_capture = cv2.VideoCapture(clip)
+        frames = []
+        while len(frames) < count:
+            ret, frame = video_capture.read()
+            if not ret:
+                break
+            frames.append(frame)
+        video_capture.release()
+        if not frames:
+            raise RuntimeError(f"Could not read frames from {clip}")
+        return [frames[i % len(frames)] for i in range(count)]
+
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, size=(height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def face_boxes(frame, faces):
+    """Fixed face-sized boxes spread over the frame, so the face count is controlled"""
+    h, w = frame.shape[:2]
+    columns = max(1, w // (FACE_SIZE + 20))
+    boxes = []
+    for i in range(faces):
+        left = 10 + (i % columns) * (FACE_SIZE + 20)
+        top = 10 + (i // columns) * (FACE_SIZE + 20)
+        boxes.append((left, min(top, h - FACE_SIZE - 1), left + FACE_SIZE, min(top, h - FACE_SIZE - 1) + FACE_SIZE))
+    return boxes
+
+
+def summarize(timings_ms):
+    timings_ms = np.asarray(timings_ms)
+    return {
+        "p50_ms": round(float(np.percentile(timings_ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(timings_ms, 95)), 3),
+        "mean_ms": round(float(timings_ms.mean()), 3),
+    }
+
+
+def run_config(gallery_size, faces, clip, frame_count, width, height, screen_size, gallery_dtype="float32"):
+    """Run one gallery size / face count combination; meant for a fresh process"""
+    face_detector_model, face_recognizer_model = load_models(use_cuda=False)
+    frames = load_frames(clip, frame_count + WARMUP_FRAMES, width, height)
+
+    rng = np.random.default_rng(1)
+    gallery = FaceGallery(rng.standard_normal((gallery_size, EMBEDDING_DIM)).astype(np.float32),
+                          [f"person_{i % 1000}" for i in range(gallery_size)], dtype=gallery_dtype)
+    hud = HudRenderer(*screen_size)
+    profile = PersonProfile("Benchmark", age=30, gender="Other", occupation="Tester", nationality="None")
+    boxes = face_boxes(frames[0], faces)
+
+    timings = {stage: [] for stage in STAGES}
+    totals = []
+    for index, frame in enumerate(frames):
+        times = {}
+
+        start = time.perf_counter()
+        detect_faces(frame, face_detector_model)
+        times["detect"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        crops = [frame[top:bottom, left:right] for left, top, right, bottom in boxes]
+        embeddings = embed_faces(crops, face_recognizer_model) if crops else np.empty((0, EMBEDDING_DIM))
+        times["embed"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        gallery.identify(embeddings)
+        times["match"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        background = hud.render_background(index)
+        cam_h, cam_w = min(frame.shape[0], screen_size[1] // 2), min(frame.shape[1], screen_size[0] // 2)
+        background[100:100 + cam_h, 30:30 + cam_w] = cv2.resize(frame, (cam_w, cam_h))
+        for left, top, right, bottom in boxes:
+            draw_profile_box(background, (left, top, right, bottom), profile, True, index)
+        times["hud"] = time.perf_counter() - start
+
+        if index < WARMUP_FRAMES:
+            continue
+        for stage in STAGES:
+            timings[stage].append(times[stage] * 1000)
+        totals.append(sum(times.values()) * 1000)
+
+    return {
+        "gallery_size": gallery_size,
+        "faces": faces,
+        "gallery_dtype": gallery_dtype,
+        "gallery_mb": round(gallery.nbytes / 1e6, 2),
+        "frames": len(totals),
+        "stages": {stage: summarize(timings[stage]) for stage in STAGES},
+        "frame": summarize(totals),
+        "throughput_fps": round(1000.0 * len(totals) / sum(totals), 2),
+        "peak_rss_mb": None if peak_rss_mb() is None else round(peak_rss_mb(), 1),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end face_reco pipeline benchmark with JSON output")
+    parser.add_argument("--clip", help="Recorded video to feed through the pipeline (default: synthetic frames)")
+    parser.add_argument("--gallery-sizes", type=int, nargs="+", default=[100, 1000, 10000],
+                        help="Number of enrolled embeddings to test")
+    parser.add_argument("--faces", type=int, nargs="+", default=[1, 4, 8], help="Faces per frame to test")
+    parser.add_argument("--frames", type=int, default=100, help="Timed frames per configuration")
+    parser.add_argument("--width", type=int, default=1280, help="Synthetic frame width")
+    parser.add_argument("--height", type=int, default=720, help="Synthetic frame height")
+    parser.add_argument("--screen", type=int, nargs=2, default=[1920, 1080], metavar=("W", "H"),
+                        help="HUD canvas size")
+    parser.add_argument("--gallery-dtype", default="float32", choices=GALLERY_DTYPES,
+                        help="Storage type of the gallery matrix")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON results file ('-' for stdout)")
+    args = parser.parse_args()
+
+    if not models_available():
+        print("Model files not found. Run main.py first to download the models.")
+        return 1
+
+    configs = [(g, f) for g in args.gallery_sizes for f in args.faces]
+    print(f"{len(configs)} configurations, {args.frames} frames each "
+          f"({'clip ' + args.clip if args.clip else f'synthetic {args.width}x{args.height}'})", file=sys.stderr)
+    print(f"{'gallery':>8} {'faces':>6} " + " ".join(f"{s + ' p50/p95':>17}" for s in STAGES)
+          + f" {'fps':>7} {'RSS MB':>8} {'gallery MB':>11}", file=sys.stderr)
+
+    results = []
+    for gallery_size, faces in configs:
+        # A fresh process per configuration keeps peak RSS measurements independent
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            result = executor.submit(run_config, gallery_size, faces, args.clip, args.frames,
+                                     args.width, args.height, tuple(args.screen), args.gallery_dtype).result()
+        results.append(result)
+        stages = " ".join(f"{result['stages'][s]['p50_ms']:>8.2f}/{result['stages'][s]['p95_ms']:<8.2f}"
+                          for s in STAGES)
+        print(f"{gallery_size:>8} {faces:>6} {stages} {result['throughput_fps']:>7.1f} "
+              f"{result['peak_rss_mb'] or 0:>8.1f} {result['gallery_mb']:>11.2f}", file=sys.stderr)
+
+    report = {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+        "numpy": np.__version__,
+        "input": args.clip or f"synthetic {args.width}x{args.height}",
+        "gallery_dtype": args.gallery_dtype,
+        "results": results,
+    }
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+import threading
+import time
+
+from embedding_cache import scan_dataset
+
+
+class DatasetWatcher(threading.Thread):
+    """Keeps the embedding cache in step with the dataset directory while the app runs.
+
+    The dataset tree is polled every `interval` seconds, which costs one stat
+    per image and no decoding. A change is synced once it has stayed the same
+    for one poll, so images that are still being copied in are not embedded
+    half-written. The sync only embeds added or modified images and drops the
+    rows of deleted images and people. A GalleryReloader polling the same
+    cache then swaps the affected identities into the live gallery.
+
+    model_loader() is called for (detector, recognizer) the first time images
+    need embedding. The watcher keeps these models to itself, since cv2.dnn
+    nets must not be shared with the thread running the live loop.
+    """
+
+    def __init__(self, dataset_dir, cache, model_loader, interval=2.0):
+        super().__init__(name="dataset-watcher", daemon=True)
+        self.dataset_dir = dataset_dir
+        self.cache = cache
+        self.model_loader = model_loader
+        self.interval = interval
+        self.syncs = 0
+        self._models = None
+        self._stop_event = threading.Event()
+
+    def _embed(self, image_paths):
+        # Imported here because person_profiles imports this module
+        from enrollment import print_error_report
+        from person_profiles import embed_images
+
+        if self._models is None:
+            self._models = self.model_loader()
+        results, errors = embed_images(image_paths, *self._models)
+        print_error_report(errors)
+        return results, errors
+
+    def run(self):
+        # The gallery was loaded from the dataset as it is now
+        synced = scan_dataset(self.dataset_dir)
+        pending = None
+        while not self._stop_event.wait(self.interval):
+            snapshot = scan_dataset(self.dataset_dir)
+            if snapshot == synced:
+                pending = None
+                continue
+            if snapshot != pending:
+                # Wait for the change to settle before embedding anything
+                pending = snapshot
+                continue
+
+            start = time.perf_counter()
+            try:
+                self.cache.sync(self.dataset_dir, self._embed)
+            except Exception as e:
+                print(f"Dataset sync failed: {e}")
+                continue
+            synced, pending = snapshot, None
+            self.syncs += 1
+            print(f"Dataset synced in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(timeout=2.0)
@@ -0,0 +1,171 @@
+import cv2
+import numpy as np
+
+# Mean pixel values subtracted by the res10 SSD face detector
+DETECTOR_MEAN = (104.0, 177.0, 123.0)
+
+# Input size of the full-frame detector pass
+FULL_FRAME_SIZE = 300
+
+# Every region around a known face is resized to this square, so all regions
+# go through the detector in one batch. Small faces are upsampled rather
+# than squashed with the rest of the frame.
+ROI_INPUT_SIZE = 160
+
+# Padding added on each side of a known face, relative to its size
+ROI_PADDING = 0.75
+
+# Detection passes between forced full-frame scans, so new faces are found
+FULL_SCAN_INTERVAL = 10
+
+# Overlapping regions can report the same face twice
+NMS_THRESHOLD = 0.4
+
+
+def accepts_batches(face_detector_model):
+    """Whether the detector takes several images in one blob.
+
+    cv2.dnn nets always do; ONNX exports only with a dynamic batch axis.
+    """
+    return getattr(face_detector_model, "dynamic_batch", True)
+
+
+def accepts_rois(face_detector_model):
+    """Whether the detector takes batches of ROI_INPUT_SIZE region blobs"""
+    return accepts_batches(face_detector_model) and getattr(face_detector_model, "dynamic_size", True)
+
+
+def decode_detections(detections, regions, confidence_threshold=0.5):
+    """Turn raw SSD output into pixel boxes using NumPy masking.
+
+    regions holds one (left, top, right, bottom) per image in the batch, in
+    frame coordinates; each detection is scaled into the region of the
+    image it came from and clipped to it. Returns (boxes, confidences, image
+    ids) with boxes as an (n, 4) int array of (left, top, right, bottom).
+    """
+    rows = detections.reshape(-1, 7)
+    rows = rows[rows[:, 2] > confidence_threshold]
+
+    regions = np.asarray(regions, dtype=np.int64).reshape(-1, 4)
+    image_ids = rows[:, 0].astype(np.int64)
+    origin = regions[image_ids, :2]
+    size = regions[image_ids, 2:] - origin
+
+    boxes = (rows[:, 3:7] * np.tile(size, 2)).astype(np.int64)
+    # Ensure bounding boxes are within their region
+    boxes[:, :2] = np.maximum(boxes[:, :2], 0)
+    boxes[:, 2:] = np.minimum(boxes[:, 2:], size - 1)
+    boxes += np.tile(origin, 2)
+
+    # Skip invalid boxes
+    valid = (boxes[:, 0] < boxes[:, 2]) & (boxes[:, 1] < boxes[:, 3])
+    return boxes[valid], rows[valid, 2], image_ids[valid]
+
+
+def detect_full_frame(frame, face_detector_model, confidence_threshold=0.5):
+    """Detect faces with one SSD pass over the whole frame resized to 300x300"""
+    (h, w) = frame.shape[:2]
+    blob = cv2.dnn.blobFromImage(
+        cv2.resize(frame, (FULL_FRAME_SIZE, FULL_FRAME_SIZE)), 1.0,
+        (FULL_FRAME_SIZE, FULL_FRAME_SIZE), DETECTOR_MEAN
+    )
+    face_detector_model.setInput(blob)
+    boxes, _, _ = decode_detections(face_detector_model.forward(), [(0, 0, w, h)], confidence_threshold)
+    # Format is (left, top, right, bottom) for OpenCV rectangle drawing
+    return [tuple(box) for box in boxes.tolist()]
+
+
+def detect_full_frames(frames, face_detector_model, confidence_threshold=0.5):
+    """Detect faces in several frames (of any sizes) with one batched SSD pass.
+
+    Returns one list of (left, top, right, bottom) boxes per frame. A
+    detector with a fixed batch size of 1 runs once per frame instead.
+    """
+    if not frames:
+        return []
+    if not accepts_batches(face_detector_model):
+        return [detect_full_frame(frame, face_detector_model, confidence_threshold) for frame in frames]
+    blob = cv2.dnn.blobFromImages(
+        [cv2.resize(frame, (FULL_FRAME_SIZE, FULL_FRAME_SIZE)) for frame in frames], 1.0,
+        (FULL_FRAME_SIZE, FULL_FRAME_SIZE), DETECTOR_MEAN
+    )
+    face_detector_model.setInput(blob)
+    regions = [(0, 0, frame.shape[1], frame.shape[0]) for frame in frames]
+    boxes, _, image_ids = decode_detections(face_detector_model.forward(), regions, confidence_threshold)
+    per_frame = [[] for _ in frames]
+    for box, image_id in zip(boxes.tolist(), image_ids.tolist()):
+        per_frame[image_id].append(tuple(box))
+    return per_frame
+
+
+def roi_around(box, width, height, padding=ROI_PADDING):
+    """Square region around a face box, padded on each side and clipped to the frame"""
+    left, top, right, bottom = box
+    half = max(right - left, bottom - top) * (0.5 + padding)
+    cx, cy = (left + right) / 2.0, (top + bottom) / 2.0
+    return (int(max(0, cx - half)), int(max(0, cy - half)),
+            int(min(width, cx + half)), int(min(height, cy + half)))
+
+
+def detect_in_rois(frame, face_detector_model, rois, confidence_threshold=0.5):
+    """Detect faces inside regions of the frame with one batched SSD pass.
+
+    Returns (boxes, confidences, roi ids) in frame coordinates, with
+    duplicates from overlapping regions suppressed.
+    """
+    crops = [frame[top:bottom, left:right] for left, top, right, bottom in rois]
+    blob = cv2.dnn.blobFromImages(crops, 1.0, (ROI_INPUT_SIZE, ROI_INPUT_SIZE), DETECTOR_MEAN)
+    face_detector_model.setInput(blob)
+    boxes, confidences, roi_ids = decode_detections(face_detector_model.forward(), rois, confidence_threshold)
+
+    if len(boxes) > 1:
+        xywh = np.column_stack([boxes[:, :2], boxes[:, 2:] - boxes[:, :2]])
+        keep = np.asarray(cv2.dnn.NMSBoxes(xywh.tolist(), confidences.tolist(),
+                                           confidence_threshold, NMS_THRESHOLD), dtype=np.int64).ravel()
+        boxes, confidences, roi_ids = boxes[keep], confidences[keep], roi_ids[keep]
+    return boxes, confidences, roi_ids
+
+
+class AdaptiveDetector:
+    """Detects faces near where they were last seen, scanning the full frame only when needed.
+
+    Known faces are re-detected in padded regions around their last boxes.
+    A full-frame scan runs every `full_scan_interval` passes to pick up new
+    faces, whenever there are no known faces, and when a region comes back
+    empty (the face was lost). A detector with a fixed input shape cannot
+    take region batches, so it always scans the full frame.
+    """
+
+    def __init__(self, full_scan_interval=FULL_SCAN_INTERVAL):
+        self.full_scan_interval = full_scan_interval
+        self.last_boxes = []
+        self.full_scans = 0
+        self.roi_scans = 0
+        self._since_full_scan = 0
+
+    def detect(self, frame, face_detector_model, known_boxes=None, confidence_threshold=0.5):
+        """Return face boxes for this frame.
+
+        known_boxes are the current face positions (e.g. from a tracker);
+        by default the boxes found in the previous call are used.
+        """
+        known_boxes = self.last_boxes if known_boxes is None else list(known_boxes)
+        self._since_full_scan += 1
+
+        if (known_boxes and self._since_full_scan < self.full_scan_interval
+                and accepts_rois(face_detector_model)):
+            (h, w) = frame.shape[:2]
+            rois = [roi_around(box, w, h) for box in known_boxes]
+            rois = [roi for roi in rois if roi[2] - roi[0] > 1 and roi[3] - roi[1] > 1]
+            if rois:
+                boxes, _, roi_ids = detect_in_rois(frame, face_detector_model, rois, confidence_threshold)
+                # Every region must still contain a face; otherwise fall back to a full scan
+                if len(np.unique(roi_ids)) == len(rois):
+                    self.roi_scans += 1
+                    self.last_boxes = [tuple(box) for box in boxes.tolist()]
+                    return self.last_boxes
+
+        self.full_scans += 1
+        self._since_full_scan = 0
+        self.last_boxes = detect_full_frame(frame, face_detector_model, confidence_threshold)
+        return self.last_boxes
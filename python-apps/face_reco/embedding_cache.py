@@ -0,0 +1,425 @@
+import contextlib
+import hashlib
+import io
+import json
+import os
+import time
+import uuid
+
+import numpy as np
+from numpy.lib import format as npy_format
+
+from gallery import EMBEDDING_DIM, FaceGallery, select_prototypes
+
+# Lock files use flock on POSIX and byte-range locks on Windows
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# Image types picked up from dataset/<person>/ for enrollment
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+EMBEDDINGS_FILE = "embeddings.npy"
+MANIFEST_FILE = "manifest.json"
+# Held while a process reads, changes and writes back the manifest and embeddings
+LOCK_FILE = ".lock"
+
+
+def model_checksum(model_paths):
+    """SHA-1 over the contents of all model files"""
+    sha = hashlib.sha1()
+    for path in model_paths:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+    return sha.hexdigest()
+
+
+def scan_dataset(dataset_dir):
+    """Return {relative_path: (person_name, mtime_ns, size)} for every enrollment image"""
+    images = {}
+    if not os.path.exists(dataset_dir):
+        return images
+
+    for person_entry in os.scandir(dataset_dir):
+        if not person_entry.is_dir():
+            continue
+        for image_entry in os.scandir(person_entry.path):
+            if image_entry.is_file() and image_entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                stat = image_entry.stat()
+                rel_path = f"{person_entry.name}/{image_entry.name}"
+                images[rel_path] = (person_entry.name, stat.st_mtime_ns, stat.st_size)
+    return images
+
+
+def lock_file(f):
+    """Take an exclusive lock on an open file, waiting as long as another process holds it"""
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        return
+    # msvcrt locks bytes from the current position; LK_LOCK gives up after
+    # about ten seconds, so keep retrying
+    f.seek(0)
+    while True:
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue
+
+
+def unlock_file(f):
+    """Release a lock taken with lock_file"""
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_UN)
+        return
+    f.seek(0)
+    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def write_json_atomic(path, data, indent=None):
+    """Write JSON to a temporary file and move it into place"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=indent)
+    os.replace(tmp_path, path)
+
+
+def save_npy_atomic(path, array):
+    """Save an array to .npy via a temporary file and move it into place"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def append_npy_rows(path, valid_rows, rows):
+    """Append rows to a 2-D .npy file in place, after its first valid_rows rows.
+
+    The new data is written before the header's shape is updated, so a reader
+    never sees rows that are not fully on disk. Returns False (leaving the
+    file untouched) if the file does not match rows or the header would have
+    to grow; the caller should rewrite the file instead.
+    """
+    with open(path, 'r+b') as f:
+        version = npy_format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = npy_format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = npy_format.read_array_header_2_0(f)
+        header_length = f.tell()
+        if (fortran_order or dtype != rows.dtype or len(shape) != 2
+                or shape[1] != rows.shape[1] or shape[0] < valid_rows):
+            return False
+
+        header = io.BytesIO()
+        header_data = {"descr": npy_format.dtype_to_descr(dtype), "fortran_order": False,
+                       "shape": (valid_rows + rows.shape[0], shape[1])}
+        if version == (1, 0):
+            npy_format.write_array_header_1_0(header, header_data)
+        else:
+            npy_format.write_array_header_2_0(header, header_data)
+        if len(header.getvalue()) != header_length:
+            return False
+
+        # Drop rows left behind by an append that never made it into the manifest
+        f.seek(header_length + valid_rows * rows.shape[1] * dtype.itemsize)
+        f.truncate()
+        f.write(np.ascontiguousarray(rows).tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+        f.seek(0)
+        f.write(header.getvalue())
+    return True
+
+
+class EmbeddingCache:
+    """On-disk cache of enrollment embeddings.
+
+    Embeddings live in one memory-mapped .npy file. The manifest maps each
+    image path (relative to the dataset) to its mtime, size and the rows it
+    owns, and records a checksum of the models that produced them. Only new
+    or changed images are re-embedded; rows of removed images are dropped.
+
+    Single images can also be appended in place (see append). Every full
+    rewrite gets a new manifest "generation", so readers can tell appended
+    rows apart from a rebuilt cache.
+
+    sync and append hold an exclusive lock on a file in the cache directory
+    while they update it, so a scanner appending crops and a process syncing
+    the dataset never build on each other's half-written state. Readers
+    (load) do not lock; writes are ordered so they always see a consistent
+    cache.
+    """
+
+    def __init__(self, cache_dir, model_paths):
+        self.cache_dir = cache_dir
+        self.model_paths = list(model_paths)
+        self.embeddings_path = os.path.join(cache_dir, EMBEDDINGS_FILE)
+        self.manifest_path = os.path.join(cache_dir, MANIFEST_FILE)
+        self.lock_path = os.path.join(cache_dir, LOCK_FILE)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Hold the cache's lock file exclusively, across processes"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self.lock_path, 'a+') as f:
+            lock_file(f)
+            try:
+                yield
+            finally:
+                unlock_file(f)
+
+    def _model_stat(self):
+        return [[os.path.basename(p), os.stat(p).st_size, os.stat(p).st_mtime_ns] for p in self.model_paths]
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _current_checksum(self, manifest):
+        """Model checksum, re-hashed only when the model files changed on disk"""
+        model_stat = self._model_stat()
+        if manifest and manifest.get("model_stat") == model_stat:
+            return manifest["model_checksum"], model_stat
+        return model_checksum(self.model_paths), model_stat
+
+    def load(self):
+        """Return (manifest, embeddings) with embeddings memory-mapped, or (None, None)"""
+        manifest = self._read_manifest()
+        if manifest is None or not os.path.exists(self.embeddings_path):
+            return None, None
+        embeddings = np.load(self.embeddings_path, mmap_mode='r')
+        rows = manifest.get("rows", -1)
+        # The file may be ahead of the manifest while an append is in progress
+        if rows < 0 or embeddings.shape[0] < rows:
+            return None, None
+        return manifest, embeddings[:rows]
+
+    def sync(self, dataset_dir, embed_images):
+        """Bring the cache up to date with dataset_dir and return (embeddings, names).
+
+        embed_images(paths) is only called with new or changed images. It must
+        return (results, errors): results maps each embedded path to a list of
+        face embeddings, errors maps each failed path to a message.
+        Appends from other processes wait until the sync is written.
+        """
+        with self._locked():
+            return self._sync(dataset_dir, embed_images)
+
+    def _sync(self, dataset_dir, embed_images):
+        manifest, cached = self.load()
+        checksum, model_stat = self._current_checksum(manifest)
+        if manifest is None or manifest.get("model_checksum") != checksum:
+            if manifest is not None:
+                print("Face models changed, rebuilding embedding cache...")
+            manifest, cached = None, None
+        old_entries = manifest["entries"] if manifest else {}
+
+        images = scan_dataset(dataset_dir)
+        unchanged = [p for p, (_, mtime_ns, size) in images.items()
+                     if p in old_entries
+                     and old_entries[p]["mtime_ns"] == mtime_ns and old_entries[p]["size"] == size]
+        unchanged_set = set(unchanged)
+        stale = [p for p in images if p not in unchanged_set]
+        removed = [p for p in old_entries if p not in images]
+
+        if manifest is not None and not stale and not removed:
+            return cached, self._names(old_entries, cached.shape[0])
+
+        print(f"Embedding cache: {len(unchanged)} cached, {len(stale)} to embed, {len(removed)} removed")
+
+        # Copy the rows worth keeping out of the memory map, then release it
+        # so the embeddings file can be replaced
+        blocks = {}
+        for rel_path in unchanged:
+            old = old_entries[rel_path]
+            blocks[rel_path] = np.array(cached[old["start"]:old["start"] + old["count"]], dtype=np.float32)
+        cached = None
+
+        # Deletion-only syncs skip embed_images, so they never load the models
+        if stale:
+            paths = {os.path.join(dataset_dir, *rel_path.split("/")): rel_path for rel_path in stale}
+            results, _ = embed_images(list(paths))
+            for path, embeddings in results.items():
+                blocks[paths[path]] = np.asarray(embeddings, dtype=np.float32).reshape(-1, EMBEDDING_DIM)
+            # Failed images stay out of the manifest so they are retried next time;
+            # embed_images is responsible for reporting them
+
+        return self._write(images, blocks, checksum, model_stat)
+
+    def _write(self, images, blocks, checksum, model_stat):
+        """Write the embeddings file and manifest from per-image row blocks"""
+        entries = {}
+        ordered = []
+        row = 0
+        for rel_path in sorted(blocks):
+            block = blocks[rel_path]
+            name, mtime_ns, size = images[rel_path]
+            entries[rel_path] = {"name": name, "mtime_ns": mtime_ns, "size": size,
+                                 "start": row, "count": int(block.shape[0])}
+            ordered.append(block)
+            row += block.shape[0]
+
+        embeddings = np.vstack(ordered) if ordered else np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+
+        save_npy_atomic(self.embeddings_path, embeddings)
+        write_json_atomic(self.manifest_path, {
+            "model_checksum": checksum,
+            "model_stat": model_stat,
+            "rows": int(embeddings.shape[0]),
+            "generation": uuid.uuid4().hex,
+            "entries": entries,
+        })
+        return embeddings, self._names(entries, embeddings.shape[0])
+
+    def append(self, dataset_dir, rel_path, embeddings):
+        """Add the embeddings of one newly written image without rescanning the dataset.
+
+        rel_path is relative to dataset_dir ("person/image.jpg") and the image
+        must already be on disk, since its mtime and size go into the manifest.
+        Returns False if there is no cache built with the current models or
+        the image is already in it; the next sync picks the image up instead.
+        """
+        manifest = self._read_manifest()
+        if manifest is None:
+            return False
+        # Hashing changed model files can be slow, so it happens before taking the lock
+        checksum, _ = self._current_checksum(manifest)
+        rows = np.asarray(embeddings, dtype=np.float32).reshape(-1, EMBEDDING_DIM)
+        stat = os.stat(os.path.join(dataset_dir, *rel_path.split("/")))
+
+        with self._locked():
+            # Re-read under the lock: a sync may have rewritten the cache (a new
+            # generation) or another writer appended rows since the first read
+            manifest = self._read_manifest()
+            if manifest is None or not os.path.exists(self.embeddings_path):
+                return False
+            if manifest.get("model_checksum") != checksum or rel_path in manifest["entries"]:
+                return False
+
+            start = manifest["rows"]
+            if not append_npy_rows(self.embeddings_path, start, rows):
+                return False
+
+            manifest["entries"][rel_path] = {"name": rel_path.split("/")[0], "mtime_ns": stat.st_mtime_ns,
+                                             "size": stat.st_size, "start": start, "count": int(rows.shape[0])}
+            manifest["rows"] = start + int(rows.shape[0])
+            write_json_atomic(self.manifest_path, manifest)
+        return True
+
+    @staticmethod
+    def _names(entries, rows, start=0):
+        """Per-row identity names from manifest entries, for rows start..rows"""
+        names = [None] * (rows - start)
+        for entry in entries.values():
+            first = max(entry["start"], start)
+            last = min(entry["start"] + entry["count"], rows)
+            if first < last:
+                names[first - start:last - start] = [entry["name"]] * (last - first)
+        return names
+
+
+def changed_identities(old_entries, new_entries):
+    """Names whose cached images (paths, mtimes or sizes) differ between two manifests"""
+    def images_by_name(entries):
+        images = {}
+        for rel_path, entry in entries.items():
+            images.setdefault(entry["name"], set()).add((rel_path, entry["mtime_ns"], entry["size"]))
+        return images
+
+    old, new = images_by_name(old_entries), images_by_name(new_entries)
+    return {name for name in old.keys() | new.keys() if old.get(name) != new.get(name)}
+
+
+class GalleryReloader:
+    """Keeps a FaceGallery in step with an EmbeddingCache updated by another process or thread.
+
+    poll() costs one stat of the manifest until it changes. Rows appended to
+    the cache are added to the gallery. If the cache was rewritten by a sync
+    with the same models, only identities whose images changed are rebuilt;
+    people whose images are all gone are removed. If the models changed, the
+    gallery is replaced. Updates are built on a copy and swapped in, so the
+    gallery attribute always holds a complete gallery. Call poll() from the
+    thread that uses the gallery.
+
+    With max_prototypes set, the gallery is kept compacted: an identity that
+    gains rows is re-compacted from all of its cached rows.
+    """
+
+    def __init__(self, cache, gallery, interval=2.0, max_prototypes=None):
+        self.cache = cache
+        self.gallery = gallery
+        self.interval = interval
+        self.max_prototypes = max_prototypes
+        self._next_check = 0.0
+        self._manifest_mtime = self._stat_manifest()
+        manifest = cache._read_manifest()
+        self._generation = manifest.get("generation") if manifest else None
+        self._checksum = manifest.get("model_checksum") if manifest else None
+        self._entries = manifest["entries"] if manifest else None
+        self._rows = manifest["rows"] if manifest else len(gallery)
+
+    def _stat_manifest(self):
+        try:
+            return os.stat(self.cache.manifest_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def poll(self):
+        """Pick up cache changes if the check interval has passed; True if the gallery changed"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + self.interval
+
+        mtime = self._stat_manifest()
+        if mtime is None or mtime == self._manifest_mtime:
+            return False
+        manifest, embeddings = self.cache.load()
+        if manifest is None:
+            return False
+        self._manifest_mtime = mtime
+
+        rows = manifest["rows"]
+        entries = manifest["entries"]
+        if manifest.get("generation") == self._generation and rows >= self._rows:
+            if rows == self._rows:
+                return False
+            # Only the new rows are read from the memory map
+            new_names = self.cache._names(entries, rows, self._rows)
+            gallery = self.gallery.copy()
+            if self.max_prototypes:
+                for name in set(new_names):
+                    self._rebuild_identity(gallery, name, entries, embeddings)
+            else:
+                gallery.add(embeddings[self._rows:rows], new_names)
+        elif self._entries is not None and manifest.get("model_checksum") == self._checksum:
+            # The dataset was resynced with the same models; rebuild only the people it touched
+            gallery = self.gallery.copy()
+            for name in changed_identities(self._entries, entries):
+                self._rebuild_identity(gallery, name, entries, embeddings)
+        else:
+            gallery = FaceGallery(embeddings, self.cache._names(entries, rows), dtype=self.gallery.dtype)
+            if self.max_prototypes:
+                gallery = gallery.compact(self.max_prototypes)
+        self.gallery = gallery
+        self._generation = manifest.get("generation")
+        self._checksum = manifest.get("model_checksum")
+        self._entries = entries
+        self._rows = rows
+        return True
+
+    def _rebuild_identity(self, gallery, name, entries, embeddings):
+        """Replace one identity with all of its cached rows (or their prototypes); drop it if it has none"""
+        blocks = [embeddings[e["start"]:e["start"] + e["count"]] for e in entries.values() if e["name"] == name]
+        rows = np.vstack(blocks) if blocks else np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+        if self.max_prototypes and len(rows):
+            prototypes, _ = select_prototypes(rows, self.max_prototypes)
+            rows = rows[prototypes]
+        gallery.replace_identity(name, rows)
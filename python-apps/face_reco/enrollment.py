@@ -0,0 +1,79 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+
+from person_profiles import embed_images, load_models
+
+# Images per task handed to a worker process
+SHARD_SIZE = 32
+
+# Below this many images the process pool start-up costs more than it saves
+PARALLEL_MIN_IMAGES = 64
+
+# Models loaded once per worker process by _init_worker
+_worker_models = None
+
+
+def _init_worker():
+    """Load the detector and recognizer once in each worker process"""
+    global _worker_models
+    # Every worker gets its own core; keep OpenCV from spawning threads on top
+    cv2.setNumThreads(1)
+    _worker_models = load_models(use_cuda=False)
+
+
+def _embed_shard(image_paths):
+    face_detector_model, face_recognizer_model = _worker_models
+    return embed_images(image_paths, face_detector_model, face_recognizer_model)
+
+
+def default_workers():
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+def enroll_parallel(image_paths, workers=None, shard_size=SHARD_SIZE):
+    """Detect and embed enrollment images across a pool of worker processes.
+
+    Returns (results, errors) in the same form as embed_images: results maps
+    each embedded path to its embeddings, errors maps failed paths to a
+    message. Progress is printed as shards complete.
+    """
+    workers = workers or default_workers()
+    shards = [image_paths[i:i + shard_size] for i in range(0, len(image_paths), shard_size)]
+    results = {}
+    errors = {}
+    done = 0
+    start = time.time()
+
+    print(f"Enrolling {len(image_paths)} images with {workers} worker processes...")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        futures = {executor.submit(_embed_shard, shard): shard for shard in shards}
+        for future in as_completed(futures):
+            shard = futures[future]
+            try:
+                shard_results, shard_errors = future.result()
+                results.update(shard_results)
+                errors.update(shard_errors)
+            except Exception as e:
+                # A crashed worker fails its whole shard
+                for img_path in shard:
+                    errors[img_path] = f"worker failed: {e}"
+            done += len(shard)
+            elapsed = time.time() - start
+            print(f"\r  {done}/{len(image_paths)} images, {len(errors)} errors, "
+                  f"{done / max(elapsed, 1e-6):.1f} images/s", end="", flush=True)
+    print()
+
+    print_error_report(errors)
+    return results, errors
+
+
+def print_error_report(errors):
+    """Print one line per image that could not be enrolled"""
+    if not errors:
+        return
+    print(f"{len(errors)} image(s) could not be enrolled:")
+    for img_path in sorted(errors):
+        print(f"  {img_path}: {errors[img_path]}")
@@ -6,9 +6,17 @@ import json
 from datetime import datetime
 import random
 import sys
+import queue
+import threading
 import tkinter as tk
 from tkinter import simpledialog, messagebox
 
+from detection import AdaptiveDetector
+from embedding_cache import EmbeddingCache
+from person_profiles import (DATASET_DIR, ENCODINGS_DIR, INFERENCE_BACKEND, MODEL_PATHS, OPENFACE_PATH,
+                             PROFILES_DB_PATH, embed_faces, enrollment_crops, load_models)
+from profile_store import ProfileStore
+
 # Use a global flag to track application state
 dialog_shown = False
 profile_data = {}
@@ -46,6 +54,76 @@ if has_cuda:
     face_detector_model.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
     face_detector_model.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
 
+# Detection runs around the faces of the previous frame between full-frame scans
+face_detector = AdaptiveDetector()
+
+# Load the face recognition model so captures can be enrolled right away
+face_recognizer_model = None
+# Detector used to find the face in a saved capture, as a cache rebuild does
+enroll_detector_model = face_detector_model
+if INFERENCE_BACKEND != "opencv":
+    # Captures must be embedded by the same models the recognizer runs
+    try:
+        enroll_detector_model, face_recognizer_model = load_models(backend=INFERENCE_BACKEND)
+    except RuntimeError as e:
+        print(e)
+elif os.path.exists(OPENFACE_PATH):
+    print("Loading face recognition model...")
+    face_recognizer_model = cv2.dnn.readNetFromTorch(OPENFACE_PATH)
+    if has_cuda:
+        face_recognizer_model.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
+        face_recognizer_model.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
+else:
+    print(f"Recognition model not found at {OPENFACE_PATH}.")
+    print("New images will be enrolled the next time face recognition starts.")
+
+class CropWriter(threading.Thread):
+    """Writes captured face crops to disk off the capture loop.
+    
+    Crops arrive already JPEG-encoded. Once a crop is on disk, its
+    embeddings are appended to the gallery cache so a running recognizer
+    picks the face up without rescanning the dataset.
+    """
+    
+    def __init__(self, dataset_dir, cache):
+        super().__init__(name="crop-writer", daemon=True)
+        self.dataset_dir = dataset_dir
+        self.cache = cache
+        self.jobs = queue.Queue()
+        self.enrolled = 0
+    
+    def save(self, image_path, encoded_img, embedding=None):
+        self.jobs.put((image_path, encoded_img, embedding))
+    
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            image_path, encoded_img, embedding = job
+            try:
+                with open(image_path, 'wb') as f:
+                    f.write(encoded_img.tobytes())
+            except OSError as e:
+                print(f"Could not write {image_path}: {e}")
+                continue
+            print(f"Saved {image_path}")
+            
+            if embedding is None:
+                continue
+            rel_path = os.path.relpath(image_path, self.dataset_dir).replace(os.sep, "/")
+            try:
+                if self.cache.append(self.dataset_dir, rel_path, embedding):
+                    self.enrolled += 1
+            except Exception as e:
+                # The image is on disk; the next full sync will embed it
+                print(f"Could not add {rel_path} to the gallery cache: {e}")
+    
+    def close(self):
+        """Wait for every queued crop to be written"""
+        self.jobs.put(None)
+        self.join()
+
 # Function to create a simple dialog
 def create_simple_dialog(title, fields, defaults=None):
     """Creates a simple dialog with the given fields and returns the input values"""
@@ -128,50 +206,26 @@ def create_simple_dialog(title, fields, defaults=None):
     return result
 
 def detect_faces(frame, confidence_threshold=0.5):
-    """Detect faces in a frame using DNN model"""
-    (h, w) = frame.shape[:2]
-    blob = cv2.dnn.blobFromImage(
-        cv2.resize(frame, (300, 300)), 1.0,
-        (300, 300), (104.0, 177.0, 123.0)
-    )
+    """Detect faces in a frame using DNN model.
     
-    face_detector_model.setInput(blob)
-    detections = face_detector_model.forward()
-    
-    face_boxes = []
-    
-    for i in range(0, detections.shape[2]):
-        confidence = detections[0, 0, i, 2]
-        
-        if confidence > confidence_threshold:
-            box = detections[0, 0, i, 3:7] * np.array([w, h, w, h])
-            (startX, startY, endX, endY) = box.astype("int")
-            
-            # Ensure bounding box is within frame
-            startX, startY = max(0, startX), max(0, startY)
-            endX, endY = min(w - 1, endX), min(h - 1, endY)
-            
-            # Skip invalid boxes
-            if startX >= endX or startY >= endY:
-                continue
-                
-            # Format is (left, top, right, bottom) for OpenCV rectangle drawing
-            face_boxes.append((startX, startY, endX, endY))
-            
-    return face_boxes
+    Faces found in the previous frame are re-detected in padded regions
+    around them; the full frame is scanned periodically and when one is lost.
+    """
+    return face_detector.detect(frame, face_detector_model, confidence_threshold=confidence_threshold)
 
 def save_profile_info(profile_info):
-    """Save profile information to the person's dataset directory"""
-    # Save profile file in the person's dataset directory
-    person_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
-                             "dataset", profile_info["name"])
+    """Save profile information to the profile database"""
+    # The person's dataset directory holds their images
+    person_dir = os.path.join(DATASET_DIR, profile_info["name"])
     os.makedirs(person_dir, exist_ok=True)
     
-    personal_profile_path = os.path.join(person_dir, "profile.json")
-    with open(personal_profile_path, 'w') as f:
-        json.dump(profile_info, f, indent=4)
+    store = ProfileStore(PROFILES_DB_PATH)
+    try:
+        store.save(profile_info)
+    finally:
+        store.close()
     
-    print(f"Profile saved to {personal_profile_path}")
+    print(f"Profile saved to {PROFILES_DB_PATH}")
 
 def main():
     """Main entry point with GUI support for use in CLEM"""
@@ -213,7 +267,7 @@ def main():
         save_profile_info(profile_info)
         
         # Create dataset directory if it doesn't exist
-        dataset_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dataset")
+        dataset_dir = DATASET_DIR
         os.makedirs(dataset_dir, exist_ok=True)
         
         # Create person's directory if it doesn't exist
@@ -287,6 +341,10 @@ def main():
         # Auto-capture variables
         last_auto_capture_time = time.time()
         
+        # Crops are written and enrolled in the background
+        crop_writer = CropWriter(dataset_dir, EmbeddingCache(ENCODINGS_DIR, MODEL_PATHS))
+        crop_writer.start()
+        
         # Set window properties for better UI
         cv2.namedWindow('Face Scanner', cv2.WINDOW_NORMAL)
         cv2.setWindowProperty('Face Scanner', cv2.WND_PROP_TOPMOST, 1)
@@ -347,11 +405,23 @@ def main():
                             max(0, left - margin_x):min(frame.shape[1], right + margin_x)
                         ]
                         
-                        # Save the face image
-                        image_path = os.path.join(person_dir, f"{person_name}_{start_index + capture_count}.jpg")
-                        cv2.imwrite(image_path, face_img)
-                        print(f"Saved {image_path}")
-                        capture_count += 1
+                        # Encode here and embed the image as it will read back from disk, with the
+                        # same detection and crops as embed_images, so a later cache rebuild of this
+                        # file gives the rows appended now
+                        encoded, encoded_img = cv2.imencode(".jpg", face_img)
+                        if not encoded:
+                            print("Could not encode the captured face")
+                        else:
+                            embedding = None
+                            if face_recognizer_model is not None:
+                                saved_img = cv2.imdecode(encoded_img, cv2.IMREAD_COLOR)
+                                embedding = embed_faces(enrollment_crops(saved_img, enroll_detector_model),
+                                                        face_recognizer_model)
+                            
+                            # Queue the face image for saving
+                            image_path = os.path.join(person_dir, f"{person_name}_{start_index + capture_count}.jpg")
+                            crop_writer.save(image_path, encoded_img, embedding)
+                            capture_count += 1
                         
                         # Update last auto-capture time
                         last_auto_capture_time = current_time
@@ -422,9 +492,12 @@ def main():
         # Release resources
         video_capture.release()
         cv2.destroyAllWindows()
+        crop_writer.close()
         
         completion_message = f"\nFace scanning complete. {capture_count} images saved to {person_dir}"
         print(completion_message)
+        if crop_writer.enrolled:
+            print(f"{crop_writer.enrolled} images added to the gallery cache; a running recognizer will pick them up.")
         print("The profile has been created and saved.")
         print("\nYou can now use Face Recognition to identify this person in the future.")
         
@@ -0,0 +1,170 @@
+import cv2
+import numpy as np
+
+
+def box_iou(boxes_a, boxes_b):
+    """IoU between every box in boxes_a (rows) and boxes_b (columns).
+
+    Boxes are (left, top, right, bottom).
+    """
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    left = np.maximum(a[:, None, 0], b[None, :, 0])
+    top = np.maximum(a[:, None, 1], b[None, :, 1])
+    right = np.minimum(a[:, None, 2], b[None, :, 2])
+    bottom = np.minimum(a[:, None, 3], b[None, :, 3])
+    intersection = np.clip(right - left, 0, None) * np.clip(bottom - top, 0, None)
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return intersection / np.maximum(union, 1e-6)
+
+
+class FaceTrack:
+    """A face followed across frames under a stable track ID"""
+
+    def __init__(self, track_id, box, frame_index):
+        self.track_id = track_id
+        self.box = tuple(int(v) for v in box)
+        self.name = None
+        self.last_recognized = None
+        self.first_seen = frame_index
+        self.missed = 0
+
+    @property
+    def centroid(self):
+        left, top, right, bottom = self.box
+        return (left + right) / 2.0, (top + bottom) / 2.0
+
+    @property
+    def size(self):
+        left, top, right, bottom = self.box
+        return max(right - left, bottom - top)
+
+
+class FaceTracker:
+    """IoU/centroid multi-face tracker.
+
+    Detections are associated with existing tracks by IoU, falling back to
+    centroid distance for fast movers. Between detections, boxes can be
+    carried forward with sparse Lucas-Kanade optical flow. Tracks report when
+    they need (re)recognition, so embedding only runs for new faces and at a
+    fixed re-verification interval.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_missed=3, reverify_interval=30, use_optical_flow=True):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.reverify_interval = reverify_interval
+        self.use_optical_flow = use_optical_flow
+        self.tracks = []
+        self.frame_index = 0
+        self._next_id = 1
+        self._prev_gray = None
+
+    def predict(self, frame):
+        """Advance to the next frame, moving track boxes by optical flow if enabled"""
+        self.frame_index += 1
+        if not self.use_optical_flow:
+            return
+
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self._prev_gray is not None and self._prev_gray.shape == gray.shape:
+            h, w = gray.shape
+            for track in self.tracks:
+                shift = self._flow_shift(self._prev_gray, gray, track.box)
+                if shift is None:
+                    continue
+                dx, dy = shift
+                left, top, right, bottom = track.box
+                track.box = (int(np.clip(left + dx, 0, w - 1)), int(np.clip(top + dy, 0, h - 1)),
+                             int(np.clip(right + dx, 0, w - 1)), int(np.clip(bottom + dy, 0, h - 1)))
+        self._prev_gray = gray
+
+    @staticmethod
+    def _flow_shift(prev_gray, gray, box):
+        """Median displacement of corner features inside box, or None"""
+        left, top, right, bottom = box
+        if right - left < 8 or bottom - top < 8:
+            return None
+        points = cv2.goodFeaturesToTrack(prev_gray[top:bottom, left:right], maxCorners=30,
+                                         qualityLevel=0.01, minDistance=5)
+        if points is None or len(points) < 3:
+            return None
+        points = points.astype(np.float32) + np.array([left, top], dtype=np.float32)
+        new_points, status, _ = cv2.calcOpticalFlowPyrLK(prev_gray, gray, points, None,
+                                                         winSize=(15, 15), maxLevel=2)
+        good = status.ravel() == 1
+        if good.sum() < 3:
+            return None
+        return np.median((new_points[good] - points[good]).reshape(-1, 2), axis=0)
+
+    def update(self, detections):
+        """Associate a fresh set of detected boxes with the current tracks"""
+        detections = [tuple(int(v) for v in box) for box in detections]
+        unmatched_tracks = set(range(len(self.tracks)))
+        unmatched_detections = set(range(len(detections)))
+
+        if self.tracks and detections:
+            iou = box_iou([t.box for t in self.tracks], detections)
+
+            # Greedy assignment, best overlap first
+            for t, d in zip(*np.unravel_index(np.argsort(-iou, axis=None), iou.shape)):
+                if iou[t, d] < self.iou_threshold:
+                    break
+                if t in unmatched_tracks and d in unmatched_detections:
+                    self._assign(t, detections[d])
+                    unmatched_tracks.discard(t)
+                    unmatched_detections.discard(d)
+
+            # Centroid fallback for faces that moved too far to overlap
+            for t in sorted(unmatched_tracks):
+                track = self.tracks[t]
+                best, best_distance = None, track.size * 0.75
+                for d in unmatched_detections:
+                    left, top, right, bottom = detections[d]
+                    distance = np.hypot((left + right) / 2.0 - track.centroid[0],
+                                        (top + bottom) / 2.0 - track.centroid[1])
+                    if distance < best_distance:
+                        best, best_distance = d, distance
+                if best is not None:
+                    self._assign(t, detections[best])
+                    unmatched_tracks.discard(t)
+                    unmatched_detections.discard(best)
+
+        for t in unmatched_tracks:
+            self.tracks[t].missed += 1
+        self.tracks = [t for t in self.tracks if t.missed <= self.max_missed]
+
+        for d in sorted(unmatched_detections):
+            self.tracks.append(FaceTrack(self._next_id, detections[d], self.frame_index))
+            self._next_id += 1
+
+    def _assign(self, index, box):
+        track = self.tracks[index]
+        track.box = box
+        track.missed = 0
+
+    def detection_due(self, interval):
+        """True if the detector should run on the current frame.
+
+        Detection runs on the first frame and every interval frames after it
+        (every frame for interval 1), and whenever there are no tracks.
+        """
+        return (self.frame_index - 1) % interval == 0 or not self.tracks
+
+    def needs_recognition(self, track):
+        """True if the track is new or due for re-verification"""
+        return (track.last_recognized is None
+                or self.frame_index - track.last_recognized >= self.reverify_interval)
+
+    def set_identity(self, track, name):
+        """Record the recognition result for a track"""
+        track.name = name
+        track.last_recognized = self.frame_index
+
+    def visible_tracks(self):
+        """Tracks matched by the most recent detection pass"""
+        return [t for t in self.tracks if t.missed == 0]
@@ -0,0 +1,239 @@
+import numpy as np
+
+# OpenFace nn4.small2 produces 128-dimensional embeddings
+EMBEDDING_DIM = 128
+
+# Cosine distance below which a face is considered a match
+MATCH_THRESHOLD = 0.6
+
+# Default cap on prototypes kept per identity when compacting a gallery
+MAX_PROTOTYPES = 5
+
+# Storage types for the gallery matrix. float16 halves the memory of
+# float32 and int8 (per-row scaled) quarters it
+GALLERY_DTYPES = ("float32", "float16", "int8")
+
+# Reduced-precision rows are widened to float32 this many at a time while
+# matching, so the scratch space stays in cache (4096 x 128 x 4 B = 2 MB)
+MATCH_BLOCK_ROWS = 4096
+
+# An embedding is an outlier when its median distance to the rest of its
+# identity exceeds the typical value by this many median absolute deviations
+OUTLIER_SCALE = 3.0
+
+
+def normalize_embeddings(embeddings):
+    """Return embeddings as a contiguous float32 matrix of unit-length rows"""
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    if matrix.size == 0:
+        return np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(matrix / norms, dtype=np.float32)
+
+
+def quantize_int8(rows):
+    """Symmetric per-row int8 quantization; returns (codes, scales) with rows ~= codes * scales[:, None]"""
+    peaks = np.abs(rows).max(axis=1) if len(rows) else np.empty(0, dtype=np.float32)
+    peaks[peaks == 0] = 1.0
+    scales = (peaks / 127.0).astype(np.float32)
+    codes = np.clip(np.rint(rows / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales
+
+
+def select_prototypes(embeddings, max_prototypes=MAX_PROTOTYPES, outlier_scale=OUTLIER_SCALE):
+    """Pick medoid prototypes from one identity's embeddings.
+
+    Outliers (blurry or misdetected crops) are dropped first: their median
+    distance to the other embeddings is far above the identity's typical
+    spread. The rest are clustered with k-medoids into at most
+    max_prototypes clusters. Returns (prototype indices, outlier indices)
+    into embeddings.
+    """
+    matrix = normalize_embeddings(embeddings)
+    n = matrix.shape[0]
+    if n <= 1:
+        return np.arange(n), np.empty(0, dtype=np.int64)
+    distances = np.clip(1.0 - matrix @ matrix.T, 0.0, 2.0)
+
+    outliers = np.empty(0, dtype=np.int64)
+    if n >= 3:
+        # Median distance to the others (the diagonal zero is excluded)
+        spread = np.nanmedian(np.where(np.eye(n, dtype=bool), np.nan, distances), axis=1)
+        center = np.median(spread)
+        mad = np.median(np.abs(spread - center))
+        outliers = np.flatnonzero(spread > center + outlier_scale * max(mad, 1e-3))
+    inliers = np.setdiff1d(np.arange(n), outliers)
+    distances = distances[np.ix_(inliers, inliers)]
+
+    k = min(max_prototypes, len(inliers))
+    # Deterministic farthest-point start: the overall medoid, then the
+    # embedding farthest from every medoid chosen so far
+    medoids = [int(np.argmin(distances.sum(axis=1)))]
+    while len(medoids) < k:
+        medoids.append(int(np.argmax(distances[:, medoids].min(axis=1))))
+    medoids = np.array(medoids)
+
+    for _ in range(20):
+        assignment = np.argmin(distances[:, medoids], axis=1)
+        updated = medoids.copy()
+        for cluster in range(k):
+            members = np.flatnonzero(assignment == cluster)
+            if len(members):
+                updated[cluster] = members[np.argmin(distances[np.ix_(members, members)].sum(axis=1))]
+        if np.array_equal(updated, medoids):
+            break
+        medoids = updated
+
+    return np.sort(inliers[medoids]), outliers
+
+
+class FaceGallery:
+    """All known face embeddings held as one pre-normalized matrix.
+
+    Matching every face in a frame against the whole gallery is a single
+    matrix multiply instead of one dot product per known embedding.
+    """
+
+    def __init__(self, embeddings=None, names=None, dtype="float32"):
+        if dtype not in GALLERY_DTYPES:
+            raise ValueError(f"Unknown gallery dtype {dtype!r}; expected one of {GALLERY_DTYPES}")
+        self.dtype = dtype
+        self.matrix = np.empty((0, EMBEDDING_DIM), dtype=dtype)
+        # Per-row dequantization scales, only used for int8 storage
+        self.scales = np.empty(0, dtype=np.float32) if dtype == "int8" else None
+        self.names = np.empty(0, dtype=object)
+        if embeddings is not None and len(embeddings) > 0:
+            self.add(embeddings, names)
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    @property
+    def nbytes(self):
+        """Memory held by the embedding matrix (and int8 scales)"""
+        return self.matrix.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def people(self):
+        """Return the set of unique identities in the gallery"""
+        return set(self.names.tolist())
+
+    def copy(self):
+        """Return a gallery sharing this one's arrays.
+
+        The arrays are never modified in place, so changes made to the copy
+        leave this gallery untouched; build updates on a copy and swap it in.
+        """
+        gallery = FaceGallery(dtype=self.dtype)
+        gallery.matrix = self.matrix
+        gallery.scales = self.scales
+        gallery.names = self.names
+        return gallery
+
+    def embeddings(self, indices=None):
+        """Stored rows as float32 unit vectors (approximate for reduced-precision galleries)"""
+        rows = self.matrix if indices is None else self.matrix[indices]
+        if self.scales is not None:
+            scales = self.scales if indices is None else self.scales[indices]
+            return rows.astype(np.float32) * scales[:, None]
+        return rows.astype(np.float32, copy=False)
+
+    def add(self, embeddings, names):
+        """Append embeddings (one row per name) to the gallery"""
+        rows = normalize_embeddings(embeddings)
+        if isinstance(names, str):
+            names = [names] * rows.shape[0]
+        if len(names) != rows.shape[0]:
+            raise ValueError(f"Got {rows.shape[0]} embeddings but {len(names)} names")
+
+        if self.dtype == "int8":
+            rows, scales = quantize_int8(rows)
+            self.scales = np.concatenate([self.scales, scales])
+        self.matrix = np.ascontiguousarray(np.vstack([self.matrix, rows.astype(self.dtype, copy=False)]))
+        self.names = np.concatenate([self.names, np.array(names, dtype=object)])
+
+    def replace_identity(self, name, embeddings):
+        """Replace every embedding of one identity with the given ones"""
+        keep = self.names != name
+        self.matrix = np.ascontiguousarray(self.matrix[keep])
+        if self.scales is not None:
+            self.scales = self.scales[keep]
+        self.names = self.names[keep]
+        if len(embeddings):
+            self.add(embeddings, name)
+
+    def compact(self, max_prototypes=MAX_PROTOTYPES, outlier_scale=OUTLIER_SCALE):
+        """Return a new gallery holding at most max_prototypes medoids per identity.
+
+        See select_prototypes. Matching cost then grows with the number of
+        people rather than the number of enrollment images.
+        """
+        compacted = FaceGallery(dtype=self.dtype)
+        if len(self) == 0:
+            return compacted
+        order = np.argsort(self.names.astype(str), kind="stable")
+        names = self.names[order]
+        starts = np.flatnonzero(np.r_[True, names[1:] != names[:-1]])
+        matrices = []
+        prototype_names = []
+        for start, stop in zip(starts, np.r_[starts[1:], len(names)]):
+            rows = self.embeddings(order[start:stop])
+            prototypes, _ = select_prototypes(rows, max_prototypes, outlier_scale)
+            matrices.append(rows[prototypes])
+            prototype_names.extend([names[start]] * len(prototypes))
+        compacted.add(np.vstack(matrices), prototype_names)
+        return compacted
+
+    def distances(self, face_embeddings):
+        """Cosine distance from each face (rows) to each known embedding (columns)"""
+        faces = normalize_embeddings(face_embeddings)
+        if len(self) == 0 or faces.shape[0] == 0:
+            return np.empty((faces.shape[0], len(self)), dtype=np.float32)
+        if self.dtype == "float32":
+            return 1.0 - faces @ self.matrix.T
+
+        # NumPy has no BLAS kernels for float16/int8 products, so stored rows
+        # are widened block by block. int8 codes are not rescaled first: the
+        # per-row scale is applied to the (faces x block) product instead.
+        similarities = np.empty((faces.shape[0], len(self)), dtype=np.float32)
+        for start in range(0, len(self), MATCH_BLOCK_ROWS):
+            block = self.matrix[start:start + MATCH_BLOCK_ROWS].astype(np.float32)
+            np.matmul(faces, block.T, out=similarities[:, start:start + block.shape[0]])
+        if self.scales is not None:
+            similarities *= self.scales
+        return 1.0 - similarities
+
+    def match(self, face_embeddings, k=1):
+        """Return the top-k names and distances for every face.
+
+        Both results have shape (n_faces, k), sorted from best to worst match.
+        """
+        distances = self.distances(face_embeddings)
+        n_faces = distances.shape[0]
+        k = min(k, len(self))
+        if k == 0:
+            return np.empty((n_faces, 0), dtype=object), np.empty((n_faces, 0), dtype=np.float32)
+
+        if k < len(self):
+            # Partial sort: only the k closest columns need ordering
+            candidates = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.broadcast_to(np.arange(len(self)), distances.shape)
+        candidate_distances = np.take_along_axis(distances, candidates, axis=1)
+        order = np.argsort(candidate_distances, axis=1)
+
+        top_indices = np.take_along_axis(candidates, order, axis=1)
+        top_distances = np.take_along_axis(candidate_distances, order, axis=1)
+        return self.names[top_indices], top_distances
+
+    def identify(self, face_embeddings, threshold=MATCH_THRESHOLD):
+        """Return the best matching name for every face, or "Unknown" """
+        if len(self) == 0:
+            return ["Unknown"] * normalize_embeddings(face_embeddings).shape[0]
+
+        names, distances = self.match(face_embeddings, k=1)
+        return [name if distance < threshold else "Unknown"
+                for name, distance in zip(names[:, 0], distances[:, 0])]
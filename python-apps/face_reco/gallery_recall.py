@@ -0,0 +1,68 @@
+import argparse
+
+import numpy as np
+
+from benchmark_compaction import load_cached_dataset, split_queries, synthetic_dataset
+from gallery import GALLERY_DTYPES, MATCH_THRESHOLD, FaceGallery
+
+
+def recall_at_k(reference_indices, indices):
+    """Fraction of the float32 top-k neighbours also found in the reduced-precision top-k"""
+    hits = [len(set(ref) & set(found)) for ref, found in zip(reference_indices, indices)]
+    return sum(hits) / reference_indices.size
+
+
+def top_k_indices(gallery, queries, k):
+    distances = gallery.distances(queries)
+    candidates = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    order = np.argsort(np.take_along_axis(distances, candidates, axis=1), axis=1)
+    return np.take_along_axis(candidates, order, axis=1), distances
+
+
+def run(dtypes, k, threshold, query_fraction, synthetic, people, images):
+    rng = np.random.default_rng(0)
+    embeddings, names = (None, None) if synthetic else load_cached_dataset()
+    if embeddings is None:
+        if not synthetic:
+            print("No embedding cache found (run the recognizer once to build it); using synthetic data.")
+        embeddings, names = synthetic_dataset(people, images, 0.1, rng)
+
+    query = split_queries(names, query_fraction, rng)
+    queries, truth = embeddings[query], names[query]
+    k = min(k, int((~query).sum()))
+    baseline = FaceGallery(embeddings[~query], names[~query])
+    reference_indices, reference_distances = top_k_indices(baseline, queries, k)
+    reference_names = np.array(baseline.identify(queries, threshold), dtype=object)
+    print(f"{len(baseline)} enrollment embeddings for {len(baseline.people())} people, "
+          f"{len(queries)} held-out queries, threshold {threshold}")
+    print(f"{'dtype':>8} {'MB':>8} {'memory':>7} {f'recall@{k}':>9} {'same id':>8} "
+          f"{'accuracy':>9} {'max |dd|':>9}")
+
+    for dtype in dtypes:
+        gallery = FaceGallery(embeddings[~query], names[~query], dtype=dtype)
+        indices, distances = top_k_indices(gallery, queries, k)
+        predicted = np.array(gallery.identify(queries, threshold), dtype=object)
+        print(f"{dtype:>8} {gallery.nbytes / 1e6:>8.2f} {gallery.nbytes / baseline.nbytes:>7.0%} "
+              f"{recall_at_k(reference_indices, indices):>9.2%} {(predicted == reference_names).mean():>8.2%} "
+              f"{(predicted == truth).mean():>9.1%} {np.abs(distances - reference_distances).max():>9.5f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Recall of float16 and int8 galleries against the float32 baseline")
+    parser.add_argument("--dtypes", nargs="+", default=list(GALLERY_DTYPES), choices=GALLERY_DTYPES,
+                        help="Gallery storage types to compare")
+    parser.add_argument("-k", type=int, default=10, help="Neighbours compared per query")
+    parser.add_argument("--threshold", type=float, default=MATCH_THRESHOLD, help="Match distance threshold")
+    parser.add_argument("--query-fraction", type=float, default=0.2,
+                        help="Fraction of each person's images held out as queries")
+    parser.add_argument("--synthetic", action="store_true", help="Use synthetic embeddings instead of the dataset")
+    parser.add_argument("--people", type=int, default=200, help="Synthetic identities")
+    parser.add_argument("--images", type=int, default=50, help="Synthetic images per identity")
+    args = parser.parse_args()
+
+    run(args.dtypes, args.k, args.threshold, args.query_fraction, args.synthetic, args.people, args.images)
+
+
+if __name__ == "__main__":
+    main()
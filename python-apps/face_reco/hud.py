@@ -0,0 +1,422 @@
+import cv2
+import numpy as np
+
+# Shared L1GHT REC0N palette
+BACKGROUND_COLOR = (40, 44, 52)   # Dark blue-gray
+GRID_COLOR = (50, 55, 65)         # Slightly lighter blue-gray
+ACCENT_COLOR = (66, 165, 245)     # Material design blue
+
+GRID_SPACING = 50
+HEADER_HEIGHT = 60
+
+# Profile panel layout
+PANEL_HEADER_HEIGHT = 55
+PANEL_ALPHA = 0.9
+# Extra pixels around the panel box that its drawing touches (border, title text)
+PANEL_MARGIN_X = 4
+PANEL_MARGIN_TOP = 30
+PANEL_MARGIN_BOTTOM = 4
+
+
+def threat_color(threat_level):
+    """Border color for a threat level"""
+    if threat_level == "LOW":
+        return (0, 230, 118)  # Green - Material design green
+    elif threat_level == "MODERATE":
+        return (255, 152, 0)  # Material design orange
+    elif threat_level == "HIGH":
+        return (244, 67, 54)  # Material design red
+    return (120, 144, 156)  # Material design blue grey
+
+
+class HudRenderer:
+    """Full-screen HUD background with static layers rendered once per resolution.
+
+    The scrolling grid is pre-drawn onto a tile one grid cell larger than the
+    screen, so each frame is a slice copy into a reused buffer instead of a
+    fresh allocation plus one cv2.line call per grid line. The header
+    gradient is cached as a strip and pasted on top.
+    """
+
+    def __init__(self, screen_w, screen_h):
+        self.screen_w = screen_w
+        self.screen_h = screen_h
+        self.buffer = np.empty((screen_h, screen_w, 3), dtype=np.uint8)
+
+        # Grid lines at every multiple of GRID_SPACING, one extra cell in each direction
+        tile_h, tile_w = screen_h + GRID_SPACING, screen_w + GRID_SPACING
+        self.grid_tile = np.empty((tile_h, tile_w, 3), dtype=np.uint8)
+        self.grid_tile[:, :] = BACKGROUND_COLOR
+        self.grid_tile[:, ::GRID_SPACING] = GRID_COLOR
+        self.grid_tile[::GRID_SPACING, :] = GRID_COLOR
+
+        # Header bar gradient, one color per row
+        alphas = 0.7 + 0.3 * (np.arange(HEADER_HEIGHT) / HEADER_HEIGHT)
+        row_colors = (np.array(BACKGROUND_COLOR)[None, :] * alphas[:, None]).astype(np.uint8)
+        self.header_strip = np.ascontiguousarray(np.broadcast_to(row_colors[:, None, :], (HEADER_HEIGHT, screen_w, 3)))
+
+    def render_background(self, frame_count):
+        """Return the reused background buffer with grid, data packets and header drawn"""
+        grid_offset = frame_count % GRID_SPACING
+        start = GRID_SPACING - grid_offset
+        np.copyto(self.buffer, self.grid_tile[start:start + self.screen_h, start:start + self.screen_w])
+
+        # "Data packets" flow along every third grid line when it lines up with the screen edge
+        # (grid lines stay drawn on top of the packets)
+        if grid_offset == 0:
+            packet_y = (frame_count * 5) % self.screen_h
+            for x in range(0, self.screen_w, GRID_SPACING * 3):
+                cv2.line(self.buffer, (x, packet_y - 5), (x, packet_y + 5), ACCENT_COLOR, 2)
+            self.buffer[:, ::GRID_SPACING * 3] = GRID_COLOR
+            self.buffer[::GRID_SPACING, :] = GRID_COLOR
+            packet_x = (frame_count * 5) % self.screen_w
+            for y in range(0, self.screen_h, GRID_SPACING * 3):
+                cv2.line(self.buffer, (packet_x - 5, y), (packet_x + 5, y), ACCENT_COLOR, 2)
+            self.buffer[::GRID_SPACING * 3, :] = GRID_COLOR
+
+        self.buffer[:HEADER_HEIGHT] = self.header_strip
+        return self.buffer
+
+
+def draw_stage_stats(image, stage_stats, origin):
+    """Draw one line per pipeline stage: throughput, p50 latency and dropped frames"""
+    x, y = origin
+    for stats in stage_stats:
+        summary = stats.summary()
+        cv2.putText(image, f"{stats.name}: {summary['fps']:.1f} fps  {summary['p50_ms']:.1f} ms  "
+                           f"dropped {summary['dropped']}",
+                    (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
+        y += 22
+
+
+class _PanelLayers:
+    """Static parts of one profile panel, rendered once per profile version.
+
+    Text and shapes that never animate are kept as the flat indices of the
+    pixels they cover, their premultiplied colors and their coverage, so
+    compositing them (including anti-aliased edges) only touches those pixels.
+    """
+
+    def __init__(self, base, static, coverage):
+        self.base = base  # Panel background and threat bar track
+        self.indices = np.flatnonzero(coverage)
+        self.colors = static.reshape(-1, 3)[self.indices].astype(np.uint16)
+        self.inverse_coverage = (255 - coverage.reshape(-1)[self.indices]).astype(np.uint16)[:, None]
+
+    def composite(self, overlay):
+        """Draw the static layer over overlay in place"""
+        pixels = overlay.reshape(-1, 3)
+        under = pixels[self.indices].astype(np.uint16)
+        pixels[self.indices] = (self.colors + (under * self.inverse_coverage + 127) // 255).astype(np.uint8)
+
+
+class ProfilePanelRenderer:
+    """Draws the profile box, re-rendering static text only when the profile changes.
+
+    Static layers are cached per profile version (the displayed fields that
+    are not counters) and panel size. Each frame only the animated elements
+    are drawn, vectorized with NumPy, into the panel region, and only that
+    region is alpha-blended onto the frame.
+    """
+
+    # Fields that change the static panel; sightings and last_seen are drawn live
+    STATIC_FIELDS = ("name", "age", "gender", "occupation", "nationality", "status", "threat_level", "notes")
+
+    def __init__(self, max_cached=16):
+        self.max_cached = max_cached
+        self._layers = {}
+
+    @staticmethod
+    def _geometry(frame_width, frame_height):
+        # Dynamic profile box dimensions - fill more of the left side
+        box_width = min(int(frame_width * 0.45), frame_width - 40)  # 45% of screen width
+        box_height = min(int(frame_height * 0.75), frame_height - 120)  # 75% of screen height
+        # Position on left side - centered vertically
+        box_left = 20
+        box_top = (frame_height - box_height) // 2
+        return box_left, box_top, box_width, box_height
+
+    def _get_layers(self, person_profile, geometry, show_details):
+        key = (tuple(getattr(person_profile, f) for f in self.STATIC_FIELDS), geometry, show_details)
+        layers = self._layers.get(key)
+        if layers is None:
+            if len(self._layers) >= self.max_cached:
+                self._layers.pop(next(iter(self._layers)))
+            layers = self._render_static(person_profile, geometry, show_details)
+            self._layers[key] = layers
+        return layers
+
+    def _render_static(self, person_profile, geometry, show_details):
+        box_left, box_top, box_width, box_height = geometry
+        roi_h = box_height + PANEL_MARGIN_TOP + PANEL_MARGIN_BOTTOM + 1
+        roi_w = box_width + 2 * PANEL_MARGIN_X + 1
+        # Panel-local coordinates: the box's top-left corner sits at (ox, oy)
+        ox, oy = PANEL_MARGIN_X, PANEL_MARGIN_TOP
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        border_color = threat_color(person_profile.threat_level)
+
+        base = np.zeros((roi_h, roi_w, 3), dtype=np.uint8)
+        base[oy:oy + box_height + 1, ox:ox + box_width + 1] = BACKGROUND_COLOR
+
+        # Threat bar track (gradient background)
+        bar_length = box_width - 230
+        bar_left = ox + 200
+        bar_top = oy + PANEL_HEADER_HEIGHT + 45 - 18
+        if bar_length > 0:
+            alpha = 0.3 + 0.2 * np.arange(bar_length) / bar_length
+            track = np.zeros((bar_length, 3), dtype=np.uint8)
+            track[:, 0] = 70
+            track[:, 1] = 70
+            track[:, 2] = 70 + (20 * alpha).astype(np.int32)
+            base[bar_top:bar_top + 15, bar_left:bar_left + bar_length] = track[None, :, :]
+
+        # Static elements are drawn onto black, which leaves premultiplied colors,
+        # and mirrored into a coverage map used to blend them over each frame
+        static = np.zeros((roi_h, roi_w, 3), dtype=np.uint8)
+        mask = np.zeros((roi_h, roi_w), dtype=np.uint8)
+
+        def text(s, org, scale, color, thickness=1, line_type=cv2.LINE_8):
+            cv2.putText(static, s, org, font, scale, color, thickness, line_type)
+            cv2.putText(mask, s, org, font, scale, 255, thickness, line_type)
+
+        def rect(pt1, pt2, color, thickness, line_type=cv2.LINE_8):
+            cv2.rectangle(static, pt1, pt2, color, thickness, line_type)
+            cv2.rectangle(mask, pt1, pt2, 255, thickness, line_type)
+
+        # Name in the header
+        text(person_profile.name, (ox + 25, oy + 38), 1.2, (255, 255, 255), 2)
+
+        # Status pill (the glow behind it animates)
+        status_text = f"{person_profile.status}"
+        status_size = cv2.getTextSize(status_text, font, 0.7, 1)[0]
+        pill = self._status_pill(ox, oy, box_width, status_size)
+        rect(pill[:2], pill[2:], border_color, -1, cv2.LINE_AA)
+        text_x = pill[0] + (pill[2] - pill[0] - status_size[0]) // 2
+        text_y = pill[1] + (pill[3] - pill[1] + status_size[1]) // 2
+        text(status_text, (text_x, text_y + 5), 0.7, (255, 255, 255), 1, cv2.LINE_AA)
+
+        threat_y = oy + PANEL_HEADER_HEIGHT + 45
+        text("THREAT LEVEL:", (ox + 25, threat_y), 0.75, (200, 200, 200))
+
+        y_offset = threat_y + 45
+        line_height = 32
+        text(f"#{hash(person_profile.name) % 100000:05d}", (ox + 55, y_offset), 0.75, (200, 200, 200))
+        y_offset += line_height
+        text(f"Age: {person_profile.age}", (ox + 55, y_offset), 0.75, (200, 200, 200))
+        y_offset += line_height
+        text(f"{person_profile.gender}", (ox + 55, y_offset), 0.75, (200, 200, 200))
+        y_offset += line_height * 2 + 30
+
+        if show_details:
+            col_width = (box_width - 60) // 2
+            text("Occupation:", (ox + 25, y_offset), 0.6, (150, 150, 150))
+            text(str(person_profile.occupation), (ox + 25, y_offset + 25), 0.75, (200, 200, 200))
+            text("Nationality:", (ox + 25 + col_width, y_offset), 0.6, (150, 150, 150))
+            text(str(person_profile.nationality), (ox + 25 + col_width, y_offset + 25), 0.75, (200, 200, 200))
+            y_offset += 60
+
+            # Clock face (its hands animate)
+            cv2.circle(static, (ox + 40, y_offset - 16), 10, (150, 150, 150), 1, cv2.LINE_AA)
+            cv2.circle(mask, (ox + 40, y_offset - 16), 10, 255, 1, cv2.LINE_AA)
+            text("Last Seen:", (ox + 65, y_offset), 0.6, (150, 150, 150))
+            y_offset += 60
+
+            notes_top = y_offset
+            notes_height = box_height - (notes_top - oy) - 25
+            rect((ox + 25, notes_top), (ox + box_width - 25, notes_top + notes_height), (80, 80, 90), 1, cv2.LINE_AA)
+
+            # Notes content with word wrapping
+            notes = person_profile.notes if person_profile.notes else "No additional information available."
+            max_chars = int((box_width - 100) / 11)  # Characters per line
+            line = ""
+            y_text = notes_top + 65
+            for word in notes.split():
+                test_line = line + word + " "
+                if len(test_line) <= max_chars:
+                    line = test_line
+                else:
+                    text(line, (ox + 45, y_text), 0.65, (180, 180, 180), 1, cv2.LINE_AA)
+                    y_text += line_height - 10  # Tighter spacing
+                    line = word + " "
+            if line:
+                text(line, (ox + 45, y_text), 0.65, (180, 180, 180), 1, cv2.LINE_AA)
+
+        return _PanelLayers(base, static, mask)
+
+    @staticmethod
+    def _status_pill(ox, oy, box_width, status_size):
+        return (ox + box_width - status_size[0] - 50, oy + 15, ox + box_width - 20, oy + 45)
+
+    def draw(self, frame, face_location, person_profile, show_details=True, frame_count=0):
+        """Draw the profile box next to a detected face; same look as draw_profile_box"""
+        left, top, right, bottom = face_location
+        frame_height, frame_width = frame.shape[:2]
+        geometry = self._geometry(frame_width, frame_height)
+        box_left, box_top, box_width, box_height = geometry
+        layers = self._get_layers(person_profile, geometry, show_details)
+
+        x0, y0 = box_left - PANEL_MARGIN_X, box_top - PANEL_MARGIN_TOP
+        roi_h, roi_w = layers.base.shape[:2]
+        if x0 < 0 or y0 < 0 or x0 + roi_w > frame_width or y0 + roi_h > frame_height:
+            return frame
+        roi = frame[y0:y0 + roi_h, x0:x0 + roi_w]
+        ox, oy = PANEL_MARGIN_X, PANEL_MARGIN_TOP
+        font = cv2.FONT_HERSHEY_SIMPLEX
+
+        # Panel content over a copy of what is underneath (only the box is replaced)
+        overlay = roi.copy()
+        overlay[oy:oy + box_height + 1, ox:ox + box_width + 1] = layers.base[oy:oy + box_height + 1, ox:ox + box_width + 1]
+
+        border_color = threat_color(person_profile.threat_level)
+        border_thickness = 2 + (frame_count % 10) // 5  # Border thickness changes from 2-3px
+        pulse_intensity = 0.7 + 0.3 * abs(np.sin(frame_count * 0.05))  # Pulsing effect
+        animated_color = tuple(int(c * pulse_intensity) for c in border_color)
+        cv2.rectangle(overlay, (ox, oy), (ox + box_width, oy + box_height), animated_color, border_thickness)
+
+        # Animated gradient header
+        if person_profile.status == "CIVILIAN":
+            header_color = ACCENT_COLOR
+        elif person_profile.status == "UNIDENTIFIED":
+            header_color = (120, 144, 156)  # Material design blue grey
+        else:
+            header_color = border_color
+        gradient_offset = frame_count % 20
+        alpha = 0.7 + 0.3 * np.abs(np.sin((np.arange(PANEL_HEADER_HEIGHT) + gradient_offset) * 0.1))
+        header_rows = (np.array(header_color)[None, :] * alpha[:, None]).astype(np.uint8)
+        overlay[oy:oy + PANEL_HEADER_HEIGHT, ox:ox + box_width + 1] = header_rows[:, None, :]
+
+        # Pulsing glow behind the status pill
+        status_size = cv2.getTextSize(f"{person_profile.status}", font, 0.7, 1)[0]
+        pill = self._status_pill(ox, oy, box_width, status_size)
+        pulse = abs(np.sin(frame_count * 0.1)) * 30
+        highlight_color = tuple(min(255, c + int(pulse)) for c in border_color)
+        cv2.rectangle(overlay, (pill[0] - 3, pill[1] - 3), (pill[2] + 3, pill[3] + 3), highlight_color, -1, cv2.LINE_AA)
+
+        # Threat level bar with a scanning highlight
+        threat_y = oy + PANEL_HEADER_HEIGHT + 45
+        bar_length = box_width - 230
+        bar_left = ox + 200
+        bar_top = threat_y - 18
+        if person_profile.threat_level == "LOW":
+            level_width = int(bar_length * 0.33)
+        elif person_profile.threat_level == "MODERATE":
+            level_width = int(bar_length * 0.66)
+        else:  # HIGH or UNKNOWN
+            level_width = bar_length
+        if level_width > 0:
+            scan_pos = (frame_count * 5) % bar_length
+            distance = np.minimum(np.abs(np.arange(level_width) - scan_pos), bar_length)
+            intensity = np.maximum(0, 1.0 - distance / 50.0) * 0.6 + 0.4
+            fill = (np.array(border_color)[None, :] * intensity[:, None]).astype(np.uint8)
+            overlay[bar_top:bar_top + 15, bar_left:bar_left + level_width] = fill[None, :, :]
+
+        # Moving separator above the info section
+        y_offset = threat_y + 45
+        line_height = 32
+        separator_width = box_width - 50
+        separator_phase = (frame_count * 2) % (separator_width * 2)
+        if separator_phase < separator_width:
+            start_x, end_x = ox + 25, ox + 25 + separator_phase
+        else:
+            start_x, end_x = ox + 25 + (separator_phase - separator_width), ox + 25 + separator_width
+        cv2.line(overlay, (start_x, y_offset - 15), (end_x, y_offset - 15), (100, 100, 100), 1)
+
+        # Animated icons
+        icon_pulse = 0.7 + 0.3 * abs(np.sin(frame_count * 0.08))
+        icon_color = tuple(int(200 * icon_pulse) for _ in range(3))
+        cv2.rectangle(overlay, (ox + 25, y_offset - 7), (ox + 45, y_offset + 8), icon_color, 1, cv2.LINE_AA)
+        y_offset += line_height
+        cv2.circle(overlay, (ox + 35, y_offset - 5), 8 + (frame_count % 6) // 3, icon_color, 1, cv2.LINE_AA)
+        y_offset += line_height
+        if f"{person_profile.gender}" == "Male":
+            cv2.circle(overlay, (ox + 35, y_offset - 5), 8, icon_color, 1, cv2.LINE_AA)
+            cv2.line(overlay, (ox + 41, y_offset - 11), (ox + 45, y_offset - 15), icon_color, 1, cv2.LINE_AA)
+        else:
+            cv2.circle(overlay, (ox + 35, y_offset - 10), 8, icon_color, 1, cv2.LINE_AA)
+            cv2.line(overlay, (ox + 35, y_offset - 2), (ox + 35, y_offset + 4), icon_color, 1, cv2.LINE_AA)
+        y_offset += line_height
+        eye_size = 7 + (frame_count % 6) // 3  # Eye size changes to simulate blinking
+        cv2.ellipse(overlay, (ox + 35, y_offset - 5), (eye_size, 5), 0, 0, 360, icon_color, 1, cv2.LINE_AA)
+        cv2.circle(overlay, (ox + 35, y_offset - 5), 2 + (frame_count % 20) // 10, icon_color, -1, cv2.LINE_AA)
+        sightings_y = y_offset
+        y_offset += line_height
+
+        # Wave separator fading into the background
+        wave_width = box_width - 50
+        if wave_width > 0:
+            i = np.arange(wave_width)
+            wave = (5 * np.sin(i * 0.05 + frame_count * 0.05)).astype(np.int32)
+            blend = (i / wave_width)[:, None]
+            colors = (np.array((100, 100, 100)) * (1 - blend) + np.array(BACKGROUND_COLOR) * blend).astype(np.uint8)
+            overlay[y_offset + wave, ox + 25 + i] = colors
+        y_offset += 30
+
+        last_seen_y = None
+        if show_details:
+            y_offset += 60
+            # Animated clock hands
+            clock_x, clock_y, clock_r = ox + 40, y_offset - 16, 10
+            hand_angle = np.radians((frame_count * 10) % 360)
+            cv2.line(overlay, (clock_x, clock_y),
+                     (clock_x + int(clock_r * 0.5 * np.sin(hand_angle)), clock_y - int(clock_r * 0.5 * np.cos(hand_angle))),
+                     (150, 150, 150), 1, cv2.LINE_AA)
+            minute_angle = np.radians((frame_count * 20) % 360)
+            cv2.line(overlay, (clock_x, clock_y),
+                     (clock_x + int(clock_r * 0.8 * np.sin(minute_angle)), clock_y - int(clock_r * 0.8 * np.cos(minute_angle))),
+                     (150, 150, 150), 1, cv2.LINE_AA)
+            last_seen_y = y_offset
+            y_offset += 60
+
+            # Notes card background with animated gradient
+            notes_top = y_offset
+            notes_height = box_height - (notes_top - oy) - 25
+            if notes_height > 0:
+                rows = np.arange(notes_height)
+                shade = 50 + (15 * np.abs(np.sin(rows * 0.02 + frame_count * 0.01))).astype(np.int32)
+                card = np.stack([shade, shade + 5, shade + 15], axis=1).astype(np.uint8)
+                overlay[notes_top:notes_top + notes_height, ox + 25:ox + box_width - 24] = card[:, None, :]
+
+            title_color = tuple(int(c * (0.7 + 0.3 * abs(np.sin(frame_count * 0.1)))) for c in ACCENT_COLOR)
+            cv2.putText(overlay, "NOTES", (ox + 45, notes_top + 30), font, 0.8, title_color, 1)
+
+        # Blend the cached static text over the animated layers
+        layers.composite(overlay)
+
+        # Counters change with every sighting, so they are drawn live
+        cv2.putText(overlay, f"Sightings: {person_profile.sightings}", (ox + 55, sightings_y),
+                    font, 0.75, (200, 200, 200), 1)
+        if last_seen_y is not None:
+            cv2.putText(overlay, str(person_profile.last_seen), (ox + 65, last_seen_y + 25),
+                        font, 0.75, (200, 200, 200), 1)
+
+        # System name above the box
+        cv2.putText(roi, "L1GHT REC0N", (ox, oy - 10), font, 0.7, (255, 255, 255), 1)
+
+        # Semi-transparent blend of the panel region only
+        frame[y0:y0 + roi_h, x0:x0 + roi_w] = cv2.addWeighted(overlay, PANEL_ALPHA, roi, 1 - PANEL_ALPHA, 0)
+
+        # Connect box to face with an animated line and dot
+        face_center_x = (left + right) // 2
+        face_center_y = (top + bottom) // 2
+        connection_x = box_left + box_width
+        connection_y = box_top + PANEL_HEADER_HEIGHT // 2
+
+        # Data flow effect (dots moving along the line)
+        for i in range(5):
+            t = ((frame_count * 2) + i * 20) % 100 / 100.0
+            dot_x = int(connection_x + (face_center_x - connection_x) * t)
+            dot_y = int(connection_y + (face_center_y - connection_y) * t)
+            cv2.circle(frame, (dot_x, dot_y), 2, animated_color, -1, cv2.LINE_AA)
+
+        cv2.line(frame, (face_center_x, face_center_y), (connection_x, connection_y), border_color, 1, cv2.LINE_AA)
+
+        # Pulsing dot at face end of connection
+        pulse_size = 3 + int(2 * abs(np.sin(frame_count * 0.1)))
+        cv2.circle(frame, (face_center_x, face_center_y), pulse_size, animated_color, -1, cv2.LINE_AA)
+
+        # Scanning effect over the detected face
+        scan_height = 5 + int(5 * abs(np.sin(frame_count * 0.2)))
+        scan_y = top + ((frame_count * 3) % max(1, bottom - top - scan_height))
+        cv2.rectangle(frame, (left, scan_y), (right, scan_y + scan_height), animated_color, 1, cv2.LINE_AA)
+
+        return frame
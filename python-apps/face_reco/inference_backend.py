@@ -0,0 +1,80 @@
+import os
+
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# "opencv" runs the original Caffe/Torch models through cv2.dnn; the others
+# run ONNX exports of them on the ONNX Runtime CPU provider
+BACKENDS = ("opencv", "onnxruntime", "onnxruntime-int8")
+
+# ONNX exports of the detector and recognizer. They must keep the original
+# layouts: the detector takes an Nx3xHxW blob and returns [1, 1, K, 7]
+# detections, the recognizer takes Nx3x96x96 (dynamic batch) and returns
+# [N, 128] embeddings. A detector exported with a fixed 1x3x300x300 input
+# also works; detection.py then runs it on one full frame at a time.
+DETECTOR_ONNX_PATH = os.path.join(SCRIPT_DIR, "res10_300x300_ssd.onnx")
+OPENFACE_ONNX_PATH = os.path.join(SCRIPT_DIR, "openface_nn4.small2.v1.onnx")
+
+# int8 variants written by quantize_models.py
+DETECTOR_INT8_PATH = os.path.join(SCRIPT_DIR, "res10_300x300_ssd.int8.onnx")
+OPENFACE_INT8_PATH = os.path.join(SCRIPT_DIR, "openface_nn4.small2.v1.int8.onnx")
+
+
+def onnx_model_paths(backend):
+    """(detector, recognizer) ONNX files used by an ONNX Runtime backend"""
+    if backend == "onnxruntime":
+        return DETECTOR_ONNX_PATH, OPENFACE_ONNX_PATH
+    if backend == "onnxruntime-int8":
+        return DETECTOR_INT8_PATH, OPENFACE_INT8_PATH
+    raise ValueError(f"Unknown ONNX backend {backend!r}; expected one of {BACKENDS[1:]}")
+
+
+class OnnxRuntimeNet:
+    """An ONNX model run by ONNX Runtime behind the cv2.dnn.Net calls face_reco uses.
+
+    Only setInput() and forward() are provided, so the detector and embedder
+    code works unchanged with either backend. dynamic_batch and dynamic_size
+    tell whether the model was exported to accept more than one image per
+    blob and inputs of any size.
+    """
+
+    def __init__(self, model_path, threads=None):
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # Fixed dimensions are ints; dynamic ones are names or None
+        self.dynamic_batch = not isinstance(model_input.shape[0], int)
+        self.dynamic_size = not all(isinstance(dim, int) for dim in model_input.shape[2:])
+        self._blob = None
+
+    def setInput(self, blob, name=""):
+        self._blob = blob
+
+    def forward(self):
+        return self.session.run(None, {self.input_name: self._blob})[0]
+
+
+def load_onnx_models(backend, threads=None):
+    """Load the detector and recognizer for an ONNX Runtime backend"""
+    if not ONNXRUNTIME_AVAILABLE:
+        raise RuntimeError(f"The {backend} backend needs ONNX Runtime: pip install onnxruntime")
+    detector_path, recognizer_path = onnx_model_paths(backend)
+    for path in (detector_path, recognizer_path):
+        if not os.path.exists(path):
+            hint = "run quantize_models.py" if backend == "onnxruntime-int8" else "export the model to ONNX"
+            raise RuntimeError(f"{path} not found; {hint} first")
+
+    print(f"Loading face detection model ({backend})...")
+    face_detector_model = OnnxRuntimeNet(detector_path, threads)
+    print(f"Loading face recognition model ({backend})...")
+    face_recognizer_model = OnnxRuntimeNet(recognizer_path, threads)
+    return face_detector_model, face_recognizer_model
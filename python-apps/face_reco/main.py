@@ -37,11 +37,12 @@ def download_models():
             openface_path
         )
 
-# First, download the required models
-print("Checking for required model files...")
-download_models()
-
 # Launch the advanced interface from person_profiles.py
 if __name__ == "__main__":
+    # First, download the required models. This stays under the main guard so
+    # enrollment worker processes that re-import this module skip it.
+    print("Checking for required model files...")
+    download_models()
+    
     print("Launching L1GHT REC0N Advanced Face Recognition System...")
     launch_advanced_interface()
\ No newline at end of file
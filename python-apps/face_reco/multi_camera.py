@@ -0,0 +1,217 @@
+import argparse
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from dataset_watcher import DatasetWatcher
+from detection import detect_full_frames
+from embedding_cache import EmbeddingCache, GalleryReloader
+from face_tracker import FaceTracker
+from pipeline import FrameGrabber, StageStats
+from person_profiles import (DATASET_DIR, DATASET_WATCH_INTERVAL, DETECTION_INTERVAL, ENCODINGS_DIR,
+                             GALLERY_PROTOTYPES, GALLERY_RELOAD_INTERVAL, MODEL_PATHS, PROFILE_FLUSH_INTERVAL,
+                             REVERIFY_INTERVAL, ProfileManager, embed_faces, load_gallery, load_models,
+                             models_available)
+
+# Seconds between per-stream statistics reports on the console
+REPORT_INTERVAL = 5.0
+
+# Size of one stream's tile in the --show preview grid
+TILE_SIZE = (640, 360)
+
+# Faces smaller than this (in pixels) are not embedded
+MIN_FACE_SIZE = 20
+
+
+class CameraStream:
+    """One camera, RTSP stream or video file with its reader thread, tracker and stats"""
+
+    def __init__(self, index, source):
+        self.name = f"CAM{index}"
+        self.source = source
+        # Plain digits select a local camera; anything else is a URL or file path
+        self.video_capture = cv2.VideoCapture(int(source) if source.isdigit() else source)
+        if not self.video_capture.isOpened():
+            raise RuntimeError(f"Could not open {source}")
+        self.capture_stats = StageStats(f"{self.name} CAPTURE")
+        # Time from a frame leaving the camera to its faces being identified
+        self.latency_stats = StageStats(f"{self.name} LATENCY")
+        self.grabber = FrameGrabber(self.video_capture, self.capture_stats)
+        self.tracker = FaceTracker(reverify_interval=REVERIFY_INTERVAL)
+        self.frame = None
+        self.faces = []
+
+    def stop(self):
+        self.grabber.stop()
+        self.video_capture.release()
+
+
+def process_batch(batch, face_detector_model, face_recognizer_model, gallery):
+    """Detect, track and identify faces for one new frame from each stream in batch.
+
+    Detection for every stream due for it runs as one batched detector pass,
+    and the new or stale tracks of all streams are embedded in one recognizer
+    pass and matched against the gallery together. Returns the names that
+    were identified in this batch.
+    """
+    for stream, frame in batch:
+        stream.tracker.predict(frame)
+
+    due = [(stream, frame) for stream, frame in batch
+           if stream.tracker.detection_due(DETECTION_INTERVAL)]
+    detections = detect_full_frames([frame for _, frame in due], face_detector_model)
+    for (stream, _), boxes in zip(due, detections):
+        stream.tracker.update(boxes)
+
+    face_images = []
+    pending_tracks = []
+    for stream, frame in batch:
+        for track in stream.tracker.visible_tracks():
+            if not stream.tracker.needs_recognition(track):
+                continue
+            left, top, right, bottom = track.box
+            face_image = frame[top:bottom, left:right]
+            if face_image.shape[0] < MIN_FACE_SIZE or face_image.shape[1] < MIN_FACE_SIZE:
+                stream.tracker.set_identity(track, "Unknown")
+                continue
+            face_images.append(face_image)
+            pending_tracks.append((stream.tracker, track))
+
+    names = []
+    if face_images:
+        names = gallery.identify(embed_faces(face_images, face_recognizer_model, batch_size=len(face_images)))
+        for (tracker, track), name in zip(pending_tracks, names):
+            tracker.set_identity(track, name)
+
+    for stream, frame in batch:
+        stream.frame = frame
+        stream.faces = [(t.track_id, t.box, t.name) for t in stream.tracker.visible_tracks() if t.name is not None]
+    return names
+
+
+def report(streams):
+    print(f"{'stream':>8} {'capture fps':>12} {'processed fps':>14} {'latency p50/p95 ms':>19} "
+          f"{'dropped':>8} {'faces':>6}  source")
+    for stream in streams:
+        capture = stream.capture_stats.summary()
+        latency = stream.latency_stats.summary()
+        print(f"{stream.name:>8} {capture['fps']:>12.1f} {latency['fps']:>14.1f} "
+              f"{latency['p50_ms']:>9.1f}/{latency['p95_ms']:<9.1f} {capture['dropped']:>8} "
+              f"{len(stream.faces):>6}  {stream.source}")
+
+
+def render_grid(streams):
+    """Tile the latest processed frame of every stream with its boxes, names and fps"""
+    columns = int(np.ceil(np.sqrt(len(streams))))
+    rows = int(np.ceil(len(streams) / columns))
+    tile_w, tile_h = TILE_SIZE
+    grid = np.zeros((rows * tile_h, columns * tile_w, 3), dtype=np.uint8)
+    for i, stream in enumerate(streams):
+        if stream.frame is None:
+            continue
+        scale_x = tile_w / stream.frame.shape[1]
+        scale_y = tile_h / stream.frame.shape[0]
+        tile = cv2.resize(stream.frame, TILE_SIZE)
+        for track_id, (left, top, right, bottom), name in stream.faces:
+            color = (0, 230, 118) if name != "Unknown" else (66, 165, 245)
+            cv2.rectangle(tile, (int(left * scale_x), int(top * scale_y)),
+                          (int(right * scale_x), int(bottom * scale_y)), color, 2)
+            cv2.putText(tile, f"{name} #{track_id}", (int(left * scale_x), int(top * scale_y) - 6),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+        latency = stream.latency_stats.summary()
+        cv2.putText(tile, f"{stream.name} {latency['fps']:.1f} FPS {latency['p50_ms']:.0f} MS", (10, 24),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 2)
+        row, column = divmod(i, columns)
+        grid[row * tile_h:(row + 1) * tile_h, column * tile_w:(column + 1) * tile_w] = tile
+    return grid
+
+
+def run(sources, show, report_interval):
+    if not models_available():
+        print("Model files not found. Please run main.py first to download the models.")
+        return 1
+
+    # One set of models and one gallery serve every stream
+    models = load_models(use_cuda=cv2.cuda.getCudaEnabledDeviceCount() > 0)
+    face_detector_model, face_recognizer_model = models
+    cache = EmbeddingCache(ENCODINGS_DIR, MODEL_PATHS)
+    gallery_reloader = GalleryReloader(cache, load_gallery(DATASET_DIR, lambda: models),
+                                       interval=GALLERY_RELOAD_INTERVAL, max_prototypes=GALLERY_PROTOTYPES)
+    dataset_watcher = DatasetWatcher(DATASET_DIR, cache, lambda: load_models(use_cuda=False),
+                                     interval=DATASET_WATCH_INTERVAL)
+    profile_manager = ProfileManager(flush_interval=PROFILE_FLUSH_INTERVAL)
+
+    streams = []
+    try:
+        for i, source in enumerate(sources):
+            streams.append(CameraStream(i, source))
+    except RuntimeError as e:
+        print(e)
+        for stream in streams:
+            stream.stop()
+        return 1
+
+    for stream in streams:
+        stream.grabber.start()
+    dataset_watcher.start()
+    if show:
+        cv2.namedWindow("L1GHT REC0N - Multi-Camera", cv2.WINDOW_NORMAL)
+    print(f"Processing {len(streams)} streams; press Ctrl+C{' or Q' if show else ''} to stop")
+
+    next_report = time.monotonic() + report_interval
+    try:
+        while not all(stream.grabber.finished for stream in streams):
+            # Take whatever new frames the readers have; slow streams do not hold up fast ones
+            polled = [(stream, stream.grabber.poll()) for stream in streams]
+            polled = [(stream, item) for stream, item in polled if item is not None]
+            if not polled:
+                time.sleep(0.002)
+                continue
+
+            if gallery_reloader.poll():
+                print(f"Gallery updated: {len(gallery_reloader.gallery)} faces")
+            names = process_batch([(stream, frame) for stream, (frame, _) in polled],
+                                  face_detector_model, face_recognizer_model, gallery_reloader.gallery)
+            done = time.perf_counter()
+            for stream, (_, captured_at) in polled:
+                stream.latency_stats.record(done - captured_at)
+            # A sighting is counted each time a track is (re-)identified
+            for name in names:
+                profile_manager.record_sighting(name)
+
+            if show:
+                cv2.imshow("L1GHT REC0N - Multi-Camera", render_grid(streams))
+                key = cv2.waitKey(1) & 0xFF
+                if key == 27 or key == ord('q'):
+                    break
+            if time.monotonic() >= next_report:
+                next_report = time.monotonic() + report_interval
+                report(streams)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        report(streams)
+        dataset_watcher.stop()
+        for stream in streams:
+            stream.stop()
+        profile_manager.close()
+        if show:
+            cv2.destroyAllWindows()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Recognize faces on several cameras, RTSP streams or video files in one process")
+    parser.add_argument("sources", nargs="+", help="Camera indices (0, 1, ...), RTSP URLs or video files")
+    parser.add_argument("--show", action="store_true", help="Show all streams in a preview grid")
+    parser.add_argument("--report-interval", type=float, default=REPORT_INTERVAL,
+                        help="Seconds between per-stream statistics reports")
+    args = parser.parse_args()
+    return run(args.sources, args.show, args.report_interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
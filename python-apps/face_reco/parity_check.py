@@ -0,0 +1,197 @@
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from detection import accepts_batches, accepts_rois, detect_full_frames, detect_in_rois, roi_around
+from embedding_cache import scan_dataset
+from face_tracker import box_iou
+from gallery import normalize_embeddings
+from inference_backend import BACKENDS
+from person_profiles import DATASET_DIR, detect_faces, embed_faces, load_models, models_available
+
+# Lowest acceptable cosine similarity to the cv2.dnn embeddings, per backend
+MIN_COSINE = {"onnxruntime": 0.999, "onnxruntime-int8": 0.98}
+
+# A detection matches the cv2.dnn one if their boxes overlap at least this much
+MIN_IOU = 0.9
+
+# Frames per blob when checking batched full-frame detection
+DETECT_BATCH = 4
+
+# Detector input shapes the pipeline uses: one 300x300 frame (detect_faces),
+# batched 300x300 frames (multi_camera) and batched ROI_INPUT_SIZE regions
+# around known faces (AdaptiveDetector)
+DETECT_SHAPES = ("single", "batched", "rois")
+
+
+def load_images(image_dir, samples):
+    paths = [os.path.join(image_dir, *rel_path.split("/")) for rel_path in sorted(scan_dataset(image_dir))]
+    images = []
+    for path in paths:
+        image = cv2.imread(path)
+        if image is not None:
+            images.append(image)
+        if len(images) >= samples:
+            break
+    return images
+
+
+def percentiles(timings_ms):
+    return float(np.percentile(timings_ms, 50)), float(np.percentile(timings_ms, 95))
+
+
+def latency(models, images, crops, repeats):
+    """p50/p95 of one detection pass and per-face embedding time at batch 1 and 8"""
+    face_detector_model, face_recognizer_model = models
+    detect_ms = []
+    for _ in range(repeats):
+        for image in images:
+            start = time.perf_counter()
+            detect_faces(image, face_detector_model)
+            detect_ms.append((time.perf_counter() - start) * 1000)
+
+    embed_ms = {}
+    for batch_size in (1, 8):
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            embed_faces(crops, face_recognizer_model, batch_size)
+            timings.append((time.perf_counter() - start) * 1000 / len(crops))
+        embed_ms[batch_size] = percentiles(timings)
+    return percentiles(detect_ms), embed_ms
+
+
+def match_boxes(ref_boxes, boxes, counts):
+    """Add the matched, missed and extra boxes against the reference to counts"""
+    if len(ref_boxes) and len(boxes):
+        iou = box_iou(ref_boxes, boxes)
+        best = iou.max(axis=1)
+        counts["ious"].extend(best.tolist())
+        counts["matched"] += int((best >= MIN_IOU).sum())
+        counts["missed"] += int((best < MIN_IOU).sum())
+        counts["extra"] += max(0, len(boxes) - int((iou.max(axis=0) >= MIN_IOU).sum()))
+    else:
+        counts["missed"] += len(ref_boxes)
+        counts["extra"] += len(boxes)
+
+
+def compare(reference, candidate, images):
+    """Detection agreement per input shape and embedding similarity of candidate against reference.
+
+    Shapes the candidate detector was not exported for are None; the
+    pipeline does not send them to it.
+    """
+    detection = {shape: {"matched": 0, "missed": 0, "extra": 0, "ious": []} for shape in DETECT_SHAPES}
+    if not accepts_batches(candidate[0]):
+        detection["batched"] = None
+    if not accepts_rois(candidate[0]):
+        detection["rois"] = None
+    similarities = []
+    all_ref_boxes = []
+    for image in images:
+        ref_boxes = detect_faces(image, reference[0])
+        all_ref_boxes.append(ref_boxes)
+        match_boxes(ref_boxes, detect_faces(image, candidate[0]), detection["single"])
+
+        if detection["rois"] is not None and ref_boxes:
+            (h, w) = image.shape[:2]
+            rois = [roi_around(box, w, h) for box in ref_boxes]
+            ref_roi_boxes, _, _ = detect_in_rois(image, reference[0], rois)
+            roi_boxes, _, _ = detect_in_rois(image, candidate[0], rois)
+            match_boxes(ref_roi_boxes.tolist(), roi_boxes.tolist(), detection["rois"])
+
+        # Embeddings are compared on the same crops, so detection differences do not leak in
+        crops = [image[top:bottom, left:right] for left, top, right, bottom in ref_boxes
+                 if bottom - top >= 20 and right - left >= 20]
+        if crops:
+            ref = normalize_embeddings(embed_faces(crops, reference[1]))
+            emb = normalize_embeddings(embed_faces(crops, candidate[1]))
+            similarities.extend(np.sum(ref * emb, axis=1).tolist())
+
+    if detection["batched"] is not None:
+        for start in range(0, len(images), DETECT_BATCH):
+            per_frame = detect_full_frames(images[start:start + DETECT_BATCH], candidate[0])
+            for ref_boxes, boxes in zip(all_ref_boxes[start:start + DETECT_BATCH], per_frame):
+                match_boxes(ref_boxes, boxes, detection["batched"])
+
+    for counts in detection.values():
+        if counts is not None:
+            ious = counts.pop("ious")
+            counts["mean_iou"] = float(np.mean(ious)) if ious else None
+    return {"detection": detection,
+            "min_cosine": float(np.min(similarities)) if similarities else None,
+            "mean_cosine": float(np.mean(similarities)) if similarities else None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ONNX Runtime backends against cv2.dnn: parity and latency")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS[1:]), choices=BACKENDS[1:],
+                        help="Backends to check against opencv")
+    parser.add_argument("--images", default=DATASET_DIR, help="Directory of <person>/<image> files to test on")
+    parser.add_argument("--samples", type=int, default=50, help="Maximum number of images")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed passes over the images")
+    args = parser.parse_args()
+
+    if not models_available("opencv"):
+        print("Original models not found. Run main.py first to download them.")
+        return 1
+    images = load_images(args.images, args.samples)
+    if not images:
+        print(f"No images found in {args.images}")
+        return 1
+
+    reference = load_models(use_cuda=False, backend="opencv")
+    crops = []
+    for image in images:
+        crops.extend(image[top:bottom, left:right] for left, top, right, bottom in detect_faces(image, reference[0])
+                     if bottom - top >= 20 and right - left >= 20)
+    if not crops:
+        print("No faces detected in the test images")
+        return 1
+    print(f"{len(images)} images, {len(crops)} faces")
+
+    results = {"opencv": (None, latency(reference, images, crops, args.repeats))}
+    for backend in args.backends:
+        try:
+            models = load_models(use_cuda=False, backend=backend)
+        except RuntimeError as e:
+            print(f"Skipping {backend}: {e}")
+            continue
+        results[backend] = (compare(reference, models, images), latency(models, images, crops, args.repeats))
+
+    print(f"\n{'backend':>18} {'detect p50/p95 ms':>18} {'embed/face b1 ms':>17} {'embed/face b8 ms':>17}")
+    for backend, (_, (detect, embed)) in results.items():
+        print(f"{backend:>18} {detect[0]:>8.2f}/{detect[1]:<9.2f} {embed[1][0]:>8.3f}/{embed[1][1]:<8.3f} "
+              f"{embed[8][0]:>8.3f}/{embed[8][1]:<8.3f}")
+
+    failed = False
+    print(f"\n{'backend':>18} {'shape':>8} {'matched':>8} {'missed':>7} {'extra':>6} {'mean IoU':>9}")
+    for backend, (parity, _) in results.items():
+        if parity is None:
+            continue
+        for shape, counts in parity["detection"].items():
+            if counts is None:
+                print(f"{backend:>18} {shape:>8}   fixed-shape export, full frames run one at a time")
+                continue
+            print(f"{backend:>18} {shape:>8} {counts['matched']:>8} {counts['missed']:>7} {counts['extra']:>6} "
+                  f"{counts['mean_iou'] or 0:>9.3f}")
+
+    print(f"\n{'backend':>18} {'min cos':>8} {'mean cos':>9} {'result':>7}")
+    for backend, (parity, _) in results.items():
+        if parity is None:
+            continue
+        ok = (all(counts is None or (counts["missed"] == 0 and counts["extra"] == 0)
+                  for counts in parity["detection"].values())
+              and parity["min_cosine"] is not None and parity["min_cosine"] >= MIN_COSINE[backend])
+        failed = failed or not ok
+        print(f"{backend:>18} {parity['min_cosine'] or 0:>8.4f} {parity['mean_cosine'] or 0:>9.4f} "
+              f"{'PASS' if ok else 'FAIL':>7}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
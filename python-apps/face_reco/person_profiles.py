@@ -6,23 +6,103 @@ from datetime import datetime
 import random
 from pathlib import Path
 import time
+import threading
+from gallery import EMBEDDING_DIM, MAX_PROTOTYPES, FaceGallery
+from face_tracker import FaceTracker
+from detection import AdaptiveDetector, detect_full_frame
+from hud import HEADER_HEIGHT, HudRenderer, ProfilePanelRenderer, draw_stage_stats
+from pipeline import BackgroundTask, FrameGrabber, InferenceWorker, StageStats
+from embedding_cache import EmbeddingCache, GalleryReloader, IMAGE_EXTENSIONS, write_json_atomic
+from profile_store import ProfileStore
+from dataset_watcher import DatasetWatcher
+from inference_backend import load_onnx_models, onnx_model_paths
+
+# Model and data locations, relative to this script
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROTOTXT_PATH = os.path.join(SCRIPT_DIR, "deploy.prototxt")
+CAFFEMODEL_PATH = os.path.join(SCRIPT_DIR, "res10_300x300_ssd_iter_140000.caffemodel")
+OPENFACE_PATH = os.path.join(SCRIPT_DIR, "openface_nn4.small2.v1.t7")
+DATASET_DIR = os.path.join(SCRIPT_DIR, "dataset")
+ENCODINGS_DIR = os.path.join(SCRIPT_DIR, "encodings")
+PROFILES_DB_PATH = os.path.join(SCRIPT_DIR, "profiles.db")
+
+# Inference backend for both models: "opencv" runs the Caffe/Torch files
+# through cv2.dnn, "onnxruntime" and "onnxruntime-int8" run their ONNX
+# exports (see inference_backend.py)
+INFERENCE_BACKEND = "opencv"
+
+def model_paths(backend=None):
+    """Model files used by a backend"""
+    backend = backend or INFERENCE_BACKEND
+    if backend == "opencv":
+        return [PROTOTXT_PATH, CAFFEMODEL_PATH, OPENFACE_PATH]
+    return list(onnx_model_paths(backend))
+
+# Every model that shapes the cached embeddings; a change invalidates the cache
+MODEL_PATHS = model_paths()
+
+# Run the face detector every N frames; tracks are carried by optical flow in between
+DETECTION_INTERVAL = 3
+
+# Frames after which a tracked face is re-identified
+REVERIFY_INTERVAL = 30
+
+# Maximum number of face crops per recognizer forward pass
+EMBED_BATCH_SIZE = 32
+
+# Seconds between background writes of updated profiles
+PROFILE_FLUSH_INTERVAL = 2.0
+
+# Seconds between checks for faces enrolled by the scanner while running
+GALLERY_RELOAD_INTERVAL = 2.0
+
+# Storage type of the gallery matrix: "float32", or "float16" / "int8" to
+# cut the memory of large galleries (see gallery_recall.py for the accuracy cost)
+GALLERY_DTYPE = "float32"
+
+# Seconds between polls of the dataset directory for added or removed images
+DATASET_WATCH_INTERVAL = 2.0
+
+# Medoid prototypes kept per person for live matching; None matches against
+# every enrollment embedding
+GALLERY_PROTOTYPES = MAX_PROTOTYPES
 
 class ProfileManager:
-    def __init__(self):
+    """In-memory profile cache backed by the SQLite profile store.
+    
+    All profiles are read with one query at startup. Sightings only touch the
+    cached profile and are queued; queued sightings are written to the store
+    as one batch by a background flusher every flush_interval seconds, and
+    once more on close(). With flush_interval=None nothing is written until
+    flush() or close() is called.
+    
+    The first time the store is opened, existing profile.json files are
+    migrated into it. Later, a person without a stored profile is read from
+    their profile.json if there is one, or gets a generated profile.
+    """
+    def __init__(self, flush_interval=None, store=None):
         self.profiles = {}
-        # Load all existing profiles from the dataset directory
+        self.flush_interval = flush_interval
+        self.store = store if store is not None else ProfileStore(PROFILES_DB_PATH)
+        self._pending = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._profiles_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._flusher = None
+        migrated = self.store.migrate_json(DATASET_DIR)
+        if migrated:
+            print(f"Migrated {migrated} profile.json files into {self.store.db_path}")
+        # Load all existing profiles from the store
         self.load_all_profiles()
+        if flush_interval:
+            self._flusher = threading.Thread(target=self._flush_loop, name="profile-flusher", daemon=True)
+            self._flusher.start()
         
     def load_all_profiles(self):
-        """Load all profiles from the dataset directory"""
-        dataset_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dataset")
-        if os.path.exists(dataset_dir):
-            for person_name in os.listdir(dataset_dir):
-                person_dir = os.path.join(dataset_dir, person_name)
-                if os.path.isdir(person_dir):
-                    profile = self.get_profile(person_name)
-                    if profile:
-                        self.profiles[person_name] = profile
+        """Load all stored profiles with a single query"""
+        for name, data in self.store.load_all().items():
+            self.profiles[name] = PersonProfile.from_dict(data)
     
     def get_profile(self, name):
         """Get a person's profile, from cache or create if needed"""
@@ -30,32 +110,76 @@ class ProfileManager:
         if name in self.profiles:
             return self.profiles[name]
         
-        # Otherwise get from file system or create new
-        profile = get_profile(name)
-        self.profiles[name] = profile
+        # The render and inference threads both look up profiles; create each one once
+        with self._profiles_lock:
+            if name in self.profiles:
+                return self.profiles[name]
+            if name.lower() == "unknown":
+                profile = load_profile(name)
+            else:
+                data = self.store.get(name)
+                if data is not None:
+                    profile = PersonProfile.from_dict(data)
+                else:
+                    # Not stored yet: import a profile.json or generate a new profile
+                    profile = read_profile_json(name) or create_profile(name)
+                    if os.path.isdir(os.path.join(DATASET_DIR, name)):
+                        self.store.save(profile.to_dict())
+            self.profiles[name] = profile
+        return profile
+    
+    def record_sighting(self, name):
+        """Count a sighting in memory; it is written to the store on the next flush"""
+        profile = self.get_profile(name)
+        if name.lower() == "unknown":
+            return profile
+        with self._lock:
+            profile.update_sighting(save=False)
+            self._pending.append((name, profile.last_seen))
         return profile
         
     def update_profile(self, name, **kwargs):
         """Update a person's profile with new information"""
         profile = self.get_profile(name)
-        for key, value in kwargs.items():
-            if hasattr(profile, key):
-                setattr(profile, key, value)
-        
-        # Save updates to file
-        dataset_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dataset")
-        person_dir = os.path.join(dataset_dir, name)
-        if not os.path.exists(person_dir):
-            os.makedirs(person_dir)
-        
-        profile_path = os.path.join(person_dir, "profile.json")
-        try:
-            with open(profile_path, 'w') as f:
-                json.dump(profile.to_dict(), f, indent=4)
-        except Exception as e:
-            print(f"Error saving profile for {name}: {e}")
+        with self._write_lock:
+            with self._lock:
+                for key, value in kwargs.items():
+                    if hasattr(profile, key):
+                        setattr(profile, key, value)
+                pending, self._pending = self._pending, []
+                data = profile.to_dict()
+            
+            # Queued sightings go in first; the saved profile already counts them
+            try:
+                self.store.record_sightings(pending)
+                self.store.save(data)
+            except Exception as e:
+                print(f"Error saving profile for {name}: {e}")
             
         return profile
+    
+    def flush(self):
+        """Write every queued sighting to the store in one transaction"""
+        with self._write_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            try:
+                self.store.record_sightings(pending)
+            except Exception as e:
+                print(f"Error recording sightings: {e}")
+    
+    def _flush_loop(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+    
+    def close(self):
+        """Stop the background flusher, write any pending updates and close the store"""
+        self._stop_event.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+        self.store.close()
 
 class PersonProfile:
     def __init__(self, name, age=None, gender=None, occupation=None, nationality=None, 
@@ -99,25 +223,57 @@ class PersonProfile:
         profile.sightings = data.get("sightings", 1)
         return profile
     
-    def update_sighting(self):
+    def update_sighting(self, save=True):
         """Update the last seen timestamp and increment sighting count"""
         self.sightings += 1
         self.last_seen = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if not save:
+            return
         # Save the updated profile
-        dataset_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dataset")
-        person_dir = os.path.join(dataset_dir, self.name)
+        person_dir = os.path.join(DATASET_DIR, self.name)
         if os.path.exists(person_dir):
             profile_path = os.path.join(person_dir, "profile.json")
             if os.path.exists(profile_path):
                 try:
-                    with open(profile_path, 'w') as f:
-                        json.dump(self.to_dict(), f, indent=4)
+                    save_profile_file(self.name, self.to_dict())
                 except Exception as e:
                     print(f"Error updating profile: {e}")
 
 
-def get_profile(name):
-    """Get a person's profile from their individual profile.json file"""
+def save_profile_file(name, data):
+    """Atomically write a profile to dataset/<name>/profile.json"""
+    write_json_atomic(os.path.join(DATASET_DIR, name, "profile.json"), data, indent=4)
+
+
+def read_profile_json(name):
+    """Read dataset/<name>/profile.json into a PersonProfile, or return None"""
+    profile_path = os.path.join(DATASET_DIR, name, "profile.json")
+    if os.path.exists(profile_path):
+        try:
+            with open(profile_path, 'r') as f:
+                profile_data = json.load(f)
+            return PersonProfile.from_dict(profile_data)
+        except Exception as e:
+            print(f"Error loading profile for {name}: {e}")
+    return None
+
+
+def create_profile(name):
+    """Generate a new profile with default/random values"""
+    return PersonProfile(
+        name=name,
+        age=random.randint(20, 65),
+        gender=random.choice(["Male", "Female"]),
+        occupation=random.choice(["Student", "Engineer", "Teacher", "Doctor", "Artist", "Programmer"]),
+        nationality=random.choice(["USA", "Canada", "UK", "Germany", "Japan", "Brazil", "India"]),
+        status="NEW SUBJECT",
+        threat_level=random.choice(["LOW", "MODERATE", "HIGH"]),
+        notes="New subject detected. Profile autogenerated."
+    )
+
+
+def load_profile(name):
+    """Load a person's profile from their profile.json file without recording a sighting"""
     # If name is Unknown, return a generic unknown profile
     if name.lower() == "unknown":
         return PersonProfile("Unknown", 
@@ -130,450 +286,53 @@ def get_profile(name):
                            notes="Subject not in database.")
     
     # Look for the profile in the person's directory
-    dataset_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dataset")
-    person_dir = os.path.join(dataset_dir, name)
-    
-    if os.path.exists(person_dir):
-        profile_path = os.path.join(person_dir, "profile.json")
-        if os.path.exists(profile_path):
-            try:
-                with open(profile_path, 'r') as f:
-                    profile_data = json.load(f)
-                profile = PersonProfile.from_dict(profile_data)
-                profile.update_sighting()  # Update last seen and increment sightings
-                return profile
-            except Exception as e:
-                print(f"Error loading profile for {name}: {e}")
+    profile = read_profile_json(name)
+    if profile is not None:
+        return profile
     
     # If no profile exists, create a new one with default/random values
-    new_profile = PersonProfile(
-        name=name,
-        age=random.randint(20, 65),
-        gender=random.choice(["Male", "Female"]),
-        occupation=random.choice(["Student", "Engineer", "Teacher", "Doctor", "Artist", "Programmer"]),
-        nationality=random.choice(["USA", "Canada", "UK", "Germany", "Japan", "Brazil", "India"]),
-        status="NEW SUBJECT",
-        threat_level=random.choice(["LOW", "MODERATE", "HIGH"]),
-        notes="New subject detected. Profile autogenerated."
-    )
+    new_profile = create_profile(name)
     
     # Save the new profile
-    if os.path.exists(person_dir):
-        profile_path = os.path.join(person_dir, "profile.json")
+    if os.path.exists(os.path.join(DATASET_DIR, name)):
         try:
-            with open(profile_path, 'w') as f:
-                json.dump(new_profile.to_dict(), f, indent=4)
+            save_profile_file(name, new_profile.to_dict())
         except Exception as e:
             print(f"Error saving new profile: {e}")
     
     return new_profile
 
 
+# Profile panels keep their static layers between frames
+_profile_panels = ProfilePanelRenderer()
+
 def draw_profile_box(frame, face_location, person_profile, show_details=True, frame_count=0):
     """Draw a modern profile box next to a detected face with dynamic effects"""
-    left, top, right, bottom = face_location
-    frame_height, frame_width = frame.shape[:2]
-    
-    # Dynamic profile box dimensions - fill more of the left side
-    box_width = min(int(frame_width * 0.45), frame_width - 40)  # 45% of screen width
-    box_height = min(int(frame_height * 0.75), frame_height - 120)  # 75% of screen height
-    
-    # Position on left side - centered vertically
-    box_left = 20
-    box_top = (frame_height - box_height) // 2
-    
-    # Modern dark theme background with alpha for semi-transparency
-    overlay = frame.copy()
-    
-    # Main background - dark with blue tint
-    background_color = (40, 44, 52)
-    cv2.rectangle(overlay, 
-                 (box_left, box_top), 
-                 (box_left + box_width, box_top + box_height), 
-                 background_color, -1)
-    
-    # Draw border based on threat level - modernized colors
-    if person_profile.threat_level == "LOW":
-        border_color = (0, 230, 118)  # Green - Material design green
-    elif person_profile.threat_level == "MODERATE":
-        border_color = (255, 152, 0)  # Material design orange
-    elif person_profile.threat_level == "HIGH":
-        border_color = (244, 67, 54)  # Material design red
-    else:
-        border_color = (120, 144, 156)  # Material design blue grey
-    
-    # Create a dynamic border effect
-    border_thickness = 2 + (frame_count % 10) // 5  # Border thickness changes from 2-3px
-    
-    # Draw pulsing border 
-    pulse_intensity = 0.7 + 0.3 * abs(np.sin(frame_count * 0.05))  # Pulsing effect
-    animated_color = tuple(int(c * pulse_intensity) for c in border_color)
-    cv2.rectangle(overlay, 
-                 (box_left, box_top), 
-                 (box_left + box_width, box_top + box_height), 
-                 animated_color, border_thickness)
-    
-    # Modern header with accent color
-    header_height = 55
-    accent_color = (66, 165, 245)  # Material design blue
-    
-    if person_profile.status == "CIVILIAN":
-        header_color = accent_color
-    elif person_profile.status == "UNIDENTIFIED":
-        header_color = (120, 144, 156)  # Material design blue grey
-    else:
-        header_color = border_color
-    
-    # Animated gradient header (simulated)
-    gradient_offset = frame_count % 20
-    for i in range(header_height):
-        alpha = 0.7 + 0.3 * abs(np.sin((i + gradient_offset) * 0.1))
-        color = tuple(int(header_color[j] * alpha) for j in range(3))
-        cv2.line(overlay, 
-                (box_left, box_top + i), 
-                (box_left + box_width, box_top + i), 
-                color, 1)
-    
-    # Add system name with modern font
-    cv2.putText(frame, "L1GHT REC0N", 
-                (box_left, box_top - 10), 
-                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 1)
-    
-    # Modern typography for name - larger, bold
-    font = cv2.FONT_HERSHEY_SIMPLEX
-    cv2.putText(overlay, person_profile.name, 
-                (box_left + 25, box_top + 38), 
-                font, 1.2, (255, 255, 255), 2)  # White text
-    
-    # Status with animated pill-shaped background
-    status_text = f"{person_profile.status}"
-    status_size = cv2.getTextSize(status_text, font, 0.7, 1)[0]
-    status_bg_left = box_left + box_width - status_size[0] - 50
-    status_bg_right = box_left + box_width - 20
-    status_bg_top = box_top + 15
-    status_bg_bottom = box_top + 45
-    
-    # Animated pill background (pulsing effect)
-    pulse = abs(np.sin(frame_count * 0.1)) * 30
-    highlight_color = tuple(min(255, c + int(pulse)) for c in border_color)
-    
-    # Draw the pill with a glow effect
-    cv2.rectangle(overlay, 
-                 (status_bg_left-3, status_bg_top-3), 
-                 (status_bg_right+3, status_bg_bottom+3), 
-                 highlight_color, -1, cv2.LINE_AA)
-    
-    cv2.rectangle(overlay, 
-                 (status_bg_left, status_bg_top), 
-                 (status_bg_right, status_bg_bottom), 
-                 border_color, -1, cv2.LINE_AA)
-    
-    # Status text (centered in pill)
-    text_x = status_bg_left + (status_bg_right - status_bg_left - status_size[0]) // 2
-    text_y = status_bg_top + (status_bg_bottom - status_bg_top + status_size[1]) // 2
-    cv2.putText(overlay, status_text, 
-                (text_x, text_y + 5), 
-                font, 0.7, (255, 255, 255), 1, cv2.LINE_AA)
-    
-    # Draw threat level with modern animated indicator
-    threat_y = box_top + header_height + 45
-    threat_text = f"THREAT LEVEL:"
-    cv2.putText(overlay, threat_text, 
-                (box_left + 25, threat_y), 
-                font, 0.75, (200, 200, 200), 1)
-    
-    # Draw the threat level indicator - horizontal bar with animation
-    bar_length = box_width - 230
-    bar_height = 14
-    bar_left = box_left + 200
-    bar_top = threat_y - 18
-    
-    # Background bar (gradient)
-    for i in range(bar_length):
-        alpha = 0.3 + (0.2 * i / bar_length)
-        color = (70, 70, 70 + int(20 * alpha))
-        cv2.line(overlay, 
-                (bar_left + i, bar_top), 
-                (bar_left + i, bar_top + bar_height), 
-                color, 1)
-    
-    # Threat level indicator with scanning animation effect
-    if person_profile.threat_level == "LOW":
-        level_width = bar_length * 0.33
-    elif person_profile.threat_level == "MODERATE":
-        level_width = bar_length * 0.66
-    else:  # HIGH or UNKNOWN
-        level_width = bar_length
-        
-    # Create a scanning effect that moves across the threat bar
-    scan_pos = (frame_count * 5) % bar_length
-    
-    # Draw the filled threat level bar
-    for i in range(int(level_width)):
-        # Create an intensity gradient - brighter near the scan position
-        distance = min(abs(i - scan_pos), bar_length) 
-        intensity = max(0, 1.0 - distance / 50.0) * 0.6 + 0.4
-        
-        color = tuple(int(c * intensity) for c in border_color)
-        cv2.line(overlay, 
-                (bar_left + i, bar_top), 
-                (bar_left + i, bar_top + bar_height), 
-                color, 1, cv2.LINE_AA)
-    
-    # Start drawing basic info with modern typography and layout
-    y_offset = threat_y + 45
-    line_height = 32  # Increased for better readability
-    
-    # Info section with animated separator
-    separator_width = box_width - 50
-    separator_phase = (frame_count * 2) % (separator_width * 2)
-    
-    if separator_phase < separator_width:
-        # Moving left to right
-        start_x = box_left + 25
-        end_x = start_x + separator_phase
-    else:
-        # Moving right to left
-        start_x = box_left + 25 + (separator_phase - separator_width)
-        end_x = box_left + 25 + separator_width
-    
-    cv2.line(overlay, 
-            (start_x, y_offset - 15), 
-            (end_x, y_offset - 15), 
-            (100, 100, 100), 1)
-    
-    # ID with modern icon simulation (square) and subtle animation
-    icon_pulse = 0.7 + 0.3 * abs(np.sin(frame_count * 0.08))
-    id_text = f"#{hash(person_profile.name) % 100000:05d}"
-    
-    # Animated ID icon
-    cv2.rectangle(overlay, 
-                 (box_left + 25, y_offset - 7), 
-                 (box_left + 45, y_offset + 8), 
-                 tuple(int(200 * icon_pulse) for _ in range(3)), 1, cv2.LINE_AA)
-    
-    cv2.putText(overlay, id_text, 
-                (box_left + 55, y_offset), 
-                font, 0.75, (200, 200, 200), 1)
-    y_offset += line_height
-    
-    # Age with animated icon simulation (circle)
-    age_text = f"{person_profile.age}"
-    cv2.circle(overlay, 
-              (box_left + 35, y_offset - 5), 
-              8 + (frame_count % 6) // 3, 
-              tuple(int(200 * icon_pulse) for _ in range(3)), 
-              1, cv2.LINE_AA)
-    
-    cv2.putText(overlay, f"Age: {age_text}", 
-                (box_left + 55, y_offset), 
-                font, 0.75, (200, 200, 200), 1)
-    y_offset += line_height
-    
-    # Gender with animated icon
-    gender_text = f"{person_profile.gender}"
-    if gender_text == "Male":
-        # Male symbol (circle with arrow)
-        cv2.circle(overlay, 
-                  (box_left + 35, y_offset - 5), 
-                  8, tuple(int(200 * icon_pulse) for _ in range(3)), 1, cv2.LINE_AA)
-        cv2.line(overlay,
-                (box_left + 41, y_offset - 11),
-                (box_left + 45, y_offset - 15),
-                tuple(int(200 * icon_pulse) for _ in range(3)), 1, cv2.LINE_AA)
-    else:
-        # Female symbol (circle with cross below)
-        cv2.circle(overlay, 
-                  (box_left + 35, y_offset - 10), 
-                  8, tuple(int(200 * icon_pulse) for _ in range(3)), 1, cv2.LINE_AA)
-        cv2.line(overlay,
-                (box_left + 35, y_offset - 2),
-                (box_left + 35, y_offset + 4),
-                tuple(int(200 * icon_pulse) for _ in range(3)), 1, cv2.LINE_AA)
-    
-    cv2.putText(overlay, gender_text, 
-                (box_left + 55, y_offset), 
-                font, 0.75, (200, 200, 200), 1)
-    y_offset += line_height
-    
-    # Sightings with animated eye icon simulation
-    eye_size = 7 + (frame_count % 6) // 3  # Eye size changes to simulate blinking
-    cv2.ellipse(overlay, 
-               (box_left + 35, y_offset - 5), 
-               (eye_size, 5), 0, 0, 360, 
-               tuple(int(200 * icon_pulse) for _ in range(3)), 1, cv2.LINE_AA)
-    
-    pupil_size = 2 + (frame_count % 20) // 10
-    cv2.circle(overlay, 
-              (box_left + 35, y_offset - 5), 
-              pupil_size, tuple(int(200 * icon_pulse) for _ in range(3)), -1, cv2.LINE_AA)
-    
-    cv2.putText(overlay, f"Sightings: {person_profile.sightings}", 
-                (box_left + 55, y_offset), 
-                font, 0.75, (200, 200, 200), 1)
-    y_offset += line_height
-    
-    # Draw animated separator line
-    gradient_color1 = (100, 100, 100)
-    gradient_color2 = (40, 44, 52)  # Fades to background
-    progress = abs(np.sin(frame_count * 0.03))
-    
-    for i in range(box_width - 50):
-        # Create animated wave effect in the separator
-        offset = int(5 * np.sin(i * 0.05 + frame_count * 0.05))
-        blend_factor = i / (box_width - 50)
-        color = tuple(int(gradient_color1[j] * (1 - blend_factor) + gradient_color2[j] * blend_factor) for j in range(3))
-        cv2.line(overlay, 
-                (box_left + 25 + i, y_offset + offset), 
-                (box_left + 25 + i, y_offset + offset), 
-                color, 1)
-    y_offset += 30
-    
-    # Draw additional information with better organization
-    if show_details:
-        # Two-column layout that uses more horizontal space
-        col_width = (box_width - 60) // 2
-        
-        # Row 1: Occupation and Nationality
-        cv2.putText(overlay, "Occupation:", 
-                   (box_left + 25, y_offset), 
-                   font, 0.6, (150, 150, 150), 1)
-        cv2.putText(overlay, str(person_profile.occupation), 
-                   (box_left + 25, y_offset + 25), 
-                   font, 0.75, (200, 200, 200), 1)
-        
-        cv2.putText(overlay, "Nationality:", 
-                   (box_left + 25 + col_width, y_offset), 
-                   font, 0.6, (150, 150, 150), 1)
-        cv2.putText(overlay, str(person_profile.nationality), 
-                   (box_left + 25 + col_width, y_offset + 25), 
-                   font, 0.75, (200, 200, 200), 1)
-        
-        y_offset += 60
-        
-        # Row 2: Last seen with animated clock icon
-        clock_x, clock_y = box_left + 40, y_offset - 16
-        clock_r = 10
-        
-        # Draw clock face
-        cv2.circle(overlay, (clock_x, clock_y), clock_r, (150, 150, 150), 1, cv2.LINE_AA)
-        
-        # Draw animated clock hands
-        hand_angle = (frame_count * 10) % 360
-        hour_x = clock_x + int(clock_r * 0.5 * np.sin(np.radians(hand_angle)))
-        hour_y = clock_y - int(clock_r * 0.5 * np.cos(np.radians(hand_angle)))
-        cv2.line(overlay, (clock_x, clock_y), (hour_x, hour_y), (150, 150, 150), 1, cv2.LINE_AA)
-        
-        minute_angle = (frame_count * 20) % 360
-        minute_x = clock_x + int(clock_r * 0.8 * np.sin(np.radians(minute_angle)))
-        minute_y = clock_y - int(clock_r * 0.8 * np.cos(np.radians(minute_angle)))
-        cv2.line(overlay, (clock_x, clock_y), (minute_x, minute_y), (150, 150, 150), 1, cv2.LINE_AA)
-        
-        cv2.putText(overlay, "Last Seen:", 
-                   (box_left + 65, y_offset), 
-                   font, 0.6, (150, 150, 150), 1)
-        cv2.putText(overlay, str(person_profile.last_seen), 
-                   (box_left + 65, y_offset + 25), 
-                   font, 0.75, (200, 200, 200), 1)
-        
-        y_offset += 60
-        
-        # Notes section with modern card-like appearance and dynamic effects
-        notes_top = y_offset
-        notes_height = box_height - (notes_top - box_top) - 25
-        
-        # Notes card background with animated gradient
-        for i in range(notes_height):
-            # Create subtle wave effect
-            wave = int(5 * np.sin((i + frame_count) * 0.05))
-            color_intensity = 50 + int(15 * abs(np.sin(i * 0.02 + frame_count * 0.01)))
-            cv2.line(overlay,
-                    (box_left + 25, notes_top + i),
-                    (box_left + box_width - 25, notes_top + i),
-                    (color_intensity, color_intensity + 5, color_intensity + 15), 1)
-        
-        # Notes card border 
-        cv2.rectangle(overlay,
-                     (box_left + 25, notes_top),
-                     (box_left + box_width - 25, notes_top + notes_height),
-                     (80, 80, 90), 1, cv2.LINE_AA)
-        
-        # Animated notes title with accent
-        title_color = tuple(int(c * (0.7 + 0.3 * abs(np.sin(frame_count * 0.1)))) for c in accent_color)
-        cv2.putText(overlay, "NOTES", 
-                   (box_left + 45, notes_top + 30), 
-                   font, 0.8, title_color, 1)
-        
-        # Notes content with word wrapping and better typography
-        notes = person_profile.notes if person_profile.notes else "No additional information available."
-        max_chars = int((box_width - 100) / 11)  # Characters per line
-        words = notes.split()
-        line = ""
-        y_text = notes_top + 65
-        
-        for word in words:
-            test_line = line + word + " "
-            if len(test_line) <= max_chars:
-                line = test_line
-            else:
-                cv2.putText(overlay, line, 
-                           (box_left + 45, y_text), 
-                           font, 0.65, (180, 180, 180), 1, cv2.LINE_AA)
-                y_text += line_height - 10  # Tighter spacing
-                line = word + " "
-        
-        # Print the last line
-        if line:
-            cv2.putText(overlay, line, 
-                       (box_left + 45, y_text), 
-                       font, 0.65, (180, 180, 180), 1, cv2.LINE_AA)
-    
-    # Semi-transparent overlay with dynamic opacity
-    # Fade in effect when a new face is detected
-    alpha = 0.9
-    cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0, frame)
-    
-    # Connect box to face with an animated line and dot
-    face_center_x = (left + right) // 2
-    face_center_y = (top + bottom) // 2
-    
-    # Calculate connection point on profile box
-    connection_x = box_left + box_width
-    connection_y = box_top + header_height // 2
-    
-    # Animate line with data flow effect (dots moving along the line)
-    for i in range(5):
-        # Create 5 flowing dots along the line path
-        t = ((frame_count * 2) + i * 20) % 100 / 100.0
-        dot_x = int(connection_x + (face_center_x - connection_x) * t)
-        dot_y = int(connection_y + (face_center_y - connection_y) * t)
-        
-        # Draw flowing dots
-        cv2.circle(frame, 
-                  (dot_x, dot_y), 
-                  2, animated_color, -1, cv2.LINE_AA)
+    return _profile_panels.draw(frame, face_location, person_profile, show_details, frame_count)
+
+def models_available(backend=None):
+    """Check that the detector and recognizer model files exist"""
+    return all(os.path.exists(path) for path in model_paths(backend))
+
+def load_models(use_cuda=False, backend=None):
+    """Load the SSD face detector and the OpenFace recognizer"""
+    backend = backend or INFERENCE_BACKEND
+    if backend != "opencv":
+        # ONNX Runtime backends are CPU-only
+        return load_onnx_models(backend)
     
-    # Draw main connection line
-    cv2.line(frame, 
-             (face_center_x, face_center_y), 
-             (connection_x, connection_y), 
-             border_color, 1, cv2.LINE_AA)
+    print("Loading face detection model...")
+    face_detector_model = cv2.dnn.readNetFromCaffe(PROTOTXT_PATH, CAFFEMODEL_PATH)
     
-    # Add pulsing dot at face end of connection
-    pulse_size = 3 + int(2 * abs(np.sin(frame_count * 0.1)))
-    cv2.circle(frame, 
-              (face_center_x, face_center_y), 
-              pulse_size, animated_color, -1, cv2.LINE_AA)
+    print("Loading face recognition model...")
+    face_recognizer_model = cv2.dnn.readNetFromTorch(OPENFACE_PATH)
     
-    # Add scanning effect over the detected face
-    scan_height = 5 + int(5 * abs(np.sin(frame_count * 0.2)))
-    scan_y = top + ((frame_count * 3) % (bottom - top - scan_height))
-    cv2.rectangle(frame,
-                 (left, scan_y),
-                 (right, scan_y + scan_height),
-                 animated_color, 1, cv2.LINE_AA)
+    if use_cuda:
+        for model in (face_detector_model, face_recognizer_model):
+            model.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
+            model.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
     
-    return frame
+    return face_detector_model, face_recognizer_model
 
 def get_monitor_size():
     """Get the size of the primary monitor"""
@@ -588,39 +347,85 @@ def get_monitor_size():
 
 def detect_faces(frame, face_detector_model, confidence_threshold=0.5):
     """Detect faces in a frame using DNN model"""
-    (h, w) = frame.shape[:2]
-    blob = cv2.dnn.blobFromImage(
-        cv2.resize(frame, (300, 300)), 1.0,
-        (300, 300), (104.0, 177.0, 123.0)
-    )
-    
-    face_detector_model.setInput(blob)
-    detections = face_detector_model.forward()
-    
-    face_boxes = []
-    
-    for i in range(0, detections.shape[2]):
-        confidence = detections[0, 0, i, 2]
+    return detect_full_frame(frame, face_detector_model, confidence_threshold)
+
+def embed_faces(face_images, face_recognizer_model, batch_size=EMBED_BATCH_SIZE):
+    """Embed face crops with one recognizer forward pass per batch of crops"""
+    embeddings = []
+    for start in range(0, len(face_images), batch_size):
+        # blobFromImages resizes every crop to 96x96 and stacks them into one NCHW blob
+        face_blob = cv2.dnn.blobFromImages(
+            face_images[start:start + batch_size], 1.0/255, (96, 96),
+            (0, 0, 0), swapRB=True, crop=False
+        )
+        face_recognizer_model.setInput(face_blob)
+        embeddings.append(face_recognizer_model.forward().reshape(len(face_blob), -1))
+    
+    if not embeddings:
+        return np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+    return np.vstack(embeddings)
+
+def enrollment_crops(image, face_detector_model):
+    """Face crops of an enrollment image, as they are cropped for the embedding cache"""
+    return [image[top:bottom, left:right]
+            for (left, top, right, bottom) in detect_faces(image, face_detector_model, confidence_threshold=0.5)]
+
+def embed_images(image_paths, face_detector_model, face_recognizer_model, batch_size=EMBED_BATCH_SIZE):
+    """Detect and embed the faces in enrollment images.
+    
+    Images are processed in chunks; the face crops of a whole chunk go through
+    the recognizer together. Returns (results, errors): results maps each
+    successful path to its list of embeddings, errors maps failed paths to a
+    message.
+    """
+    results = {}
+    errors = {}
+    for start in range(0, len(image_paths), batch_size):
+        crops = []
+        owners = []
+        chunk = []
+        for img_path in image_paths[start:start + batch_size]:
+            try:
+                image = cv2.imread(img_path)
+                if image is None:
+                    raise ValueError("could not read image")
+                for crop in enrollment_crops(image, face_detector_model):
+                    crops.append(crop)
+                    owners.append(img_path)
+                chunk.append(img_path)
+            except Exception as e:
+                errors[img_path] = str(e)
         
-        if confidence > confidence_threshold:
-            box = detections[0, 0, i, 3:7] * np.array([w, h, w, h])
-            (startX, startY, endX, endY) = box.astype("int")
-            
-            # Ensure bounding box is within frame
-            startX, startY = max(0, startX), max(0, startY)
-            endX, endY = min(w - 1, endX), min(h - 1, endY)
-            
-            # Skip invalid boxes
-            if startX >= endX or startY >= endY:
-                continue
-                
-            # Format is (left, top, right, bottom) for OpenCV rectangle drawing
-            face_boxes.append((startX, startY, endX, endY))
-            
-    return face_boxes
+        try:
+            embeddings = embed_faces(crops, face_recognizer_model, batch_size)
+        except Exception as e:
+            for img_path in chunk:
+                errors[img_path] = str(e)
+            continue
+        
+        for img_path in chunk:
+            results[img_path] = []
+        for img_path, embedding in zip(owners, embeddings):
+            results[img_path].append(embedding)
+    
+    return results, errors
 
-def load_known_faces(dataset_dir, face_detector_model, face_recognizer_model):
-    """Load known faces from dataset directory"""
+def load_known_faces(dataset_dir, face_detector_model, face_recognizer_model, cache_dir=ENCODINGS_DIR, workers=None,
+                     model_loader=None):
+    """Load known faces from dataset directory.
+    
+    With a cache_dir, embeddings are kept in an on-disk cache and only new or
+    changed images are embedded. Pass cache_dir=None to embed every image.
+    Large sets of images are sharded across `workers` processes (default: one
+    per spare core); workers=1 keeps enrollment in this process.
+    
+    With a model_loader, the models are passed as None and model_loader() is
+    only called for (detector, recognizer) when images need embedding, so a
+    warm cache loads without waiting for the models.
+    """
+    # Imported here because enrollment imports this module for its workers
+    from enrollment import PARALLEL_MIN_IMAGES, default_workers, enroll_parallel, print_error_report
+    
     known_face_encodings = []
     known_face_names = []
     
@@ -628,121 +433,197 @@ def load_known_faces(dataset_dir, face_detector_model, face_recognizer_model):
     if not os.path.exists(dataset_dir):
         print(f"Dataset directory {dataset_dir} does not exist.")
         return known_face_encodings, known_face_names
-        
-    # Walk through all directories in the dataset folder
+    
+    workers = workers or default_workers()
+    
+    def embed(image_paths):
+        if workers > 1 and len(image_paths) >= PARALLEL_MIN_IMAGES:
+            return enroll_parallel(image_paths, workers)
+        detector, recognizer = (face_detector_model, face_recognizer_model) if model_loader is None else model_loader()
+        results, errors = embed_images(image_paths, detector, recognizer)
+        print_error_report(errors)
+        return results, errors
+    
+    if cache_dir is not None:
+        cache = EmbeddingCache(cache_dir, MODEL_PATHS)
+        return cache.sync(dataset_dir, embed)
+    
+    # Collect every image in the dataset folder
+    image_paths = []
     for person_name in os.listdir(dataset_dir):
         person_dir = os.path.join(dataset_dir, person_name)
         if os.path.isdir(person_dir):
-            print(f"Loading images for {person_name}...")
-            # Load each image file in the person's directory
-            image_files = [f for f in os.listdir(person_dir) if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
-            
-            for img_file in image_files:
-                img_path = os.path.join(person_dir, img_file)
-                try:
-                    # Load image
-                    image = cv2.imread(img_path)
-                    if image is None:
-                        continue
-                        
-                    # Detect faces
-                    face_locations = detect_faces(image, face_detector_model, confidence_threshold=0.5)
-                    
-                    if face_locations:
-                        # For each face detected in the image
-                        for face_loc in face_locations:
-                            left, top, right, bottom = face_loc
-                            face_image = image[top:bottom, left:right]
-                            
-                            # Get face embedding
-                            try:
-                                # Resize to required size
-                                face_blob = cv2.dnn.blobFromImage(
-                                    face_image, 1.0/255, (96, 96),
-                                    (0, 0, 0), swapRB=True, crop=False
-                                )
-                                face_recognizer_model.setInput(face_blob)
-                                face_encoding = face_recognizer_model.forward()[0]
-                                
-                                known_face_encodings.append(face_encoding)
-                                known_face_names.append(person_name)
-                            except Exception as e:
-                                pass
-                except Exception as e:
-                    pass
+            image_files = [f for f in os.listdir(person_dir) if f.lower().endswith(IMAGE_EXTENSIONS)]
+            image_paths.extend(os.path.join(person_dir, f) for f in image_files)
+    
+    results, _ = embed(image_paths)
+    for img_path in image_paths:
+        person_name = os.path.basename(os.path.dirname(img_path))
+        for face_encoding in results.get(img_path, []):
+            known_face_encodings.append(face_encoding)
+            known_face_names.append(person_name)
     
     return known_face_encodings, known_face_names
 
-def face_distance(known_embeddings, face_embedding):
-    """Compute cosine similarity between face embeddings"""
-    if len(known_embeddings) == 0:
-        return np.empty(0)
-        
-    # Normalize embeddings
-    face_embedding = face_embedding / np.linalg.norm(face_embedding)
-    distances = []
+def recognize_frame(frame, tracker, face_detector_model, face_recognizer_model, gallery, detector=None):
+    """Detect, track and identify faces in one frame.
+    
+    With an AdaptiveDetector, detection runs around the tracked faces and
+    only scans the full frame when needed. Returns (track_id, box, name) for
+    every visible, identified track; with gallery=None faces are only
+    tracked and every visible track is returned with name None.
+    """
+    # Carry existing tracks forward; run the detector only every few frames
+    tracker.predict(frame)
+    if tracker.detection_due(DETECTION_INTERVAL):
+        if detector is None:
+            tracker.update(detect_faces(frame, face_detector_model))
+        else:
+            tracker.update(detector.detect(frame, face_detector_model,
+                                           [t.box for t in tracker.visible_tracks()]))
+    
+    # Until the gallery is loaded, faces are tracked but not identified
+    if gallery is None:
+        return [(t.track_id, t.box, t.name) for t in tracker.visible_tracks()]
+    
+    # Embed only faces whose track is new or due for re-verification
+    face_images = []
+    pending_tracks = []
+    for track in tracker.visible_tracks():
+        if not tracker.needs_recognition(track):
+            continue
+        left, top, right, bottom = track.box
+        # Extract the face region
+        face_image = frame[top:bottom, left:right]
+    
+        # Skip if face image is empty or too small
+        if face_image.size == 0 or face_image.shape[0] < 20 or face_image.shape[1] < 20:
+            tracker.set_identity(track, "Unknown")
+            continue
+    
+        face_images.append(face_image)
+        pending_tracks.append(track)
+    
+    # Embed all pending faces in one forward pass and match them against the gallery together
+    if face_images:
+        try:
+            names = gallery.identify(embed_faces(face_images, face_recognizer_model))
+        except:
+            names = ["Unknown"] * len(pending_tracks)
+        for track, name in zip(pending_tracks, names):
+            tracker.set_identity(track, name)
     
-    for emb in known_embeddings:
-        emb = emb / np.linalg.norm(emb)
-        # Compute cosine similarity (higher values = more similar)
-        similarity = np.dot(face_embedding, emb)
-        # Convert to a distance (lower values = more similar)
-        distance = 1.0 - similarity
-        distances.append(distance)
-        
-    return np.array(distances)
+    return [(t.track_id, t.box, t.name) for t in tracker.visible_tracks() if t.name is not None]
+
+def open_camera(index=0, width=1280, height=720):
+    """Open the webcam at HD resolution; raises if it cannot be opened"""
+    video_capture = cv2.VideoCapture(index)
+    if not video_capture.isOpened():
+        raise RuntimeError(f"Could not open camera {index}")
+    video_capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    video_capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    return video_capture
+
+def load_gallery(dataset_dir, model_loader):
+    """Load and compact the gallery; model_loader() is only called if images need embedding"""
+    print(f"Loading faces from dataset: {dataset_dir}")
+    load_start = time.time()
+    known_face_encodings, known_face_names = load_known_faces(dataset_dir, None, None, model_loader=model_loader)
+    gallery = FaceGallery(known_face_encodings, known_face_names, dtype=GALLERY_DTYPE)
+    # The gallery holds its own normalized copy; drop the memory-mapped cache
+    del known_face_encodings
+    if GALLERY_PROTOTYPES:
+        enrolled = len(gallery)
+        gallery = gallery.compact(GALLERY_PROTOTYPES)
+        print(f"Compacted {enrolled} enrollment embeddings to {len(gallery)} prototypes")
+    print(f"Gallery ready in {(time.time() - load_start) * 1000:.0f} ms")
+    
+    unique_people = gallery.people()
+    print(f"Loaded {len(gallery)} faces for {len(unique_people)} unique people "
+          f"({gallery.dtype}, {gallery.nbytes / 1e6:.1f} MB)")
+    if unique_people:
+        print(f"People in database: {', '.join(unique_people)}")
+    return gallery
+
+def draw_splash(splash, tasks, step):
+    """Splash screen frame with a progress bar and the state of each start-up task"""
+    screen_h, screen_w = splash.shape[:2]
+    splash_copy = splash.copy()
+    
+    # Draw animated loading text
+    loading_dots = "." * (step % 4)
+    cv2.putText(splash_copy, f"L1GHT REC0N", 
+                (screen_w//2 - 250, screen_h//2 - 50), 
+                cv2.FONT_HERSHEY_SIMPLEX, 2.0, (66, 165, 245), 3)
+                
+    cv2.putText(splash_copy, f"ADVANCED RECOGNITION SYSTEM INITIALIZING{loading_dots}", 
+                (screen_w//2 - 350, screen_h//2 + 50), 
+                cv2.FONT_HERSHEY_SIMPLEX, 1.0, (200, 200, 200), 2)
+    
+    # Loading bar fills as tasks finish
+    bar_width = 600
+    bar_height = 10
+    bar_progress = int(sum(task.done for task in tasks) / len(tasks) * bar_width)
+    
+    # Bar background
+    cv2.rectangle(splash_copy, 
+                (screen_w//2 - bar_width//2, screen_h//2 + 100),
+                (screen_w//2 + bar_width//2, screen_h//2 + 100 + bar_height),
+                (70, 70, 70), -1)
+    
+    # Progress fill
+    cv2.rectangle(splash_copy, 
+                (screen_w//2 - bar_width//2, screen_h//2 + 100),
+                (screen_w//2 - bar_width//2 + bar_progress, screen_h//2 + 100 + bar_height),
+                (66, 165, 245), -1)
+    
+    # One status line per task
+    for i, task in enumerate(tasks):
+        if not task.done:
+            status, color = "LOADING", (200, 200, 200)
+        elif task.error is not None:
+            status, color = "FAILED", (244, 67, 54)
+        else:
+            status, color = f"READY {task.seconds * 1000:.0f} MS", (0, 230, 118)
+        cv2.putText(splash_copy, f"{task.name.upper():<10} {status}",
+                    (screen_w//2 - bar_width//2, screen_h//2 + 150 + i * 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 1)
+    return splash_copy
 
 def main():
     """Run the L1GHT REC0N interface with live camera feed"""
     print("L1GHT REC0N - Live Camera Mode")
     print("----------------------------------------------")
     print("This program demonstrates the L1GHT REC0N profile interface with a live camera feed.")
-    print("Profile data is loaded from individual profile.json files in each person's dataset folder.")
+    print(f"Profile data is loaded from {os.path.basename(PROFILES_DB_PATH)} (profile.json files are imported once).")
     print("")
     print("Controls:")
     print("  F: Toggle fullscreen mode")
     print("  ESC or Q: Quit")
     print("")
     
-    # Initialize face detection model
-    print("Loading face detection model...")
-    face_detector_model = None
-    
-    # Make sure model files exist
-    prototxt_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "deploy.prototxt")
-    caffemodel_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "res10_300x300_ssd_iter_140000.caffemodel")
-    openface_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "openface_nn4.small2.v1.t7")
-    
-    if not os.path.exists(prototxt_path) or not os.path.exists(caffemodel_path) or not os.path.exists(openface_path):
+    if not models_available():
         print("Model files not found. Please run main_gpu.py first to download the models.")
         return
     
-    face_detector_model = cv2.dnn.readNetFromCaffe(prototxt_path, caffemodel_path)
-    
     # Check for GPU support
     has_cuda = cv2.cuda.getCudaEnabledDeviceCount() > 0
     if has_cuda:
         print(f"CUDA-enabled GPU detected. Using GPU acceleration.")
-        face_detector_model.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
-        face_detector_model.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
-    
-    # Load face recognition model
-    print("Loading face recognition model...")
-    face_recognizer_model = cv2.dnn.readNetFromTorch(openface_path)
-    
-    if has_cuda:
-        face_recognizer_model.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
-        face_recognizer_model.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
     
-    # Load known faces
-    dataset_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dataset")
-    print(f"Loading faces from dataset: {dataset_dir}")
-    known_face_encodings, known_face_names = load_known_faces(dataset_dir, face_detector_model, face_recognizer_model)
-    
-    unique_people = set(known_face_names)
-    print(f"Loaded {len(known_face_encodings)} faces for {len(unique_people)} unique people")
-    if unique_people:
-        print(f"People in database: {', '.join(unique_people)}")
+    # Models, camera, profiles and the gallery load concurrently behind the
+    # splash screen; the live view starts once the models and camera are up
+    startup_start = time.perf_counter()
+    models_task = BackgroundTask("models", load_models, use_cuda=has_cuda)
+    camera_task = BackgroundTask("camera", open_camera)
+    profiles_task = BackgroundTask("profiles", ProfileManager, flush_interval=PROFILE_FLUSH_INTERVAL)
+    # Cached embeddings load without any model. Images that need embedding get
+    # their own model instances, since cv2.dnn nets are not safe to share with
+    # the live detector
+    gallery_task = BackgroundTask("gallery", load_gallery, DATASET_DIR, lambda: load_models(use_cuda=has_cuda))
+    startup_tasks = [models_task, camera_task, profiles_task, gallery_task]
+    for task in startup_tasks:
+        task.start()
     
     # Initialize window
     window_name = "L1GHT REC0N - Advanced Face Recognition System"
@@ -754,64 +635,95 @@ def main():
     # Get monitor dimensions
     screen_w, screen_h = get_monitor_size()
     
-    # Initialize webcam
-    video_capture = cv2.VideoCapture(0)
-    video_capture.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)  # HD resolution
-    video_capture.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-    
     # Variables
     fullscreen = True
-    process_this_frame = True
+    tracker = FaceTracker(reverify_interval=REVERIFY_INTERVAL)
+    detector = AdaptiveDetector()
     show_detailed_profiles = True
     fps = 0
     prev_time = time.time()
     frame_count = 0
     
+    # Static HUD layers are rendered once for this resolution
+    hud = HudRenderer(screen_w, screen_h)
+    
     # Create a modern splash screen
     splash = np.zeros((screen_h, screen_w, 3), dtype=np.uint8)
     splash[:, :] = (40, 44, 52)  # Dark blue-gray background
-
-    # Create animated loading sequence
-    for i in range(10):
-        splash_copy = splash.copy()
-        
-        # Draw animated loading text
-        loading_dots = "." * (i % 4)
-        cv2.putText(splash_copy, f"L1GHT REC0N", 
-                    (screen_w//2 - 250, screen_h//2 - 50), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 2.0, (66, 165, 245), 3)
-                    
-        cv2.putText(splash_copy, f"ADVANCED RECOGNITION SYSTEM INITIALIZING{loading_dots}", 
-                    (screen_w//2 - 350, screen_h//2 + 50), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 1.0, (200, 200, 200), 2)
-        
-        # Draw animated loading bar
-        bar_width = 600
-        bar_height = 10
-        bar_progress = int((i / 9) * bar_width)
-        
-        # Bar background
-        cv2.rectangle(splash_copy, 
-                    (screen_w//2 - bar_width//2, screen_h//2 + 100),
-                    (screen_w//2 + bar_width//2, screen_h//2 + 100 + bar_height),
-                    (70, 70, 70), -1)
-        
-        # Progress fill
-        cv2.rectangle(splash_copy, 
-                    (screen_w//2 - bar_width//2, screen_h//2 + 100),
-                    (screen_w//2 - bar_width//2 + bar_progress, screen_h//2 + 100 + bar_height),
-                    (66, 165, 245), -1)
-                    
-        # Show the splash screen frame
-        cv2.imshow(window_name, splash_copy)
-        cv2.waitKey(100)  # Delay between frames
+    
+    # Animate the splash with real progress until the live view can start
+    step = 0
+    while not (models_task.done and camera_task.done):
+        cv2.imshow(window_name, draw_splash(splash, startup_tasks, step))
+        step += 1
+        key = cv2.waitKey(30) & 0xFF
+        if key == 27 or key == ord('q'):
+            if camera_task.ok:
+                camera_task.result.release()
+            cv2.destroyAllWindows()
+            return
+    
+    try:
+        face_detector_model, face_recognizer_model = models_task.wait()
+        video_capture = camera_task.wait()
+    except Exception as e:
+        print(f"Startup failed: {e}")
+        cv2.destroyAllWindows()
+        return
+    
+    # Capture and inference run on their own threads; this loop only renders
+    capture_stats = StageStats("CAPTURE")
+    inference_stats = StageStats("INFERENCE")
+    render_stats = StageStats("RENDER")
+    grabber = FrameGrabber(video_capture, capture_stats)
+    gallery_reloader = None
+    dataset_watcher = None
+    
+    def process_frame(frame):
+        nonlocal gallery_reloader, dataset_watcher
+        # Recognition switches on once the gallery has loaded; faces are only tracked until then
+        if gallery_reloader is None and gallery_task.ok:
+            gallery = gallery_task.result
+            # Faces enrolled by face_scanner while this runs are appended to the cache
+            # and picked up from there without a rescan
+            cache = EmbeddingCache(ENCODINGS_DIR, MODEL_PATHS)
+            gallery_reloader = GalleryReloader(cache, gallery, interval=GALLERY_RELOAD_INTERVAL,
+                                               max_prototypes=GALLERY_PROTOTYPES)
+            # Images added to or deleted from the dataset are synced into the cache
+            # in the background and reach the gallery through the reloader
+            dataset_watcher = DatasetWatcher(DATASET_DIR, cache, lambda: load_models(use_cuda=has_cuda),
+                                             interval=DATASET_WATCH_INTERVAL)
+            dataset_watcher.start()
+            print(f"Recognition enabled {(time.perf_counter() - startup_start) * 1000:.0f} ms after start")
+        # The gallery only changes between frames, on the inference thread
+        if gallery_reloader is not None and gallery_reloader.poll():
+            print(f"Gallery updated: {len(gallery_reloader.gallery)} faces")
+        faces = recognize_frame(frame, tracker, face_detector_model, face_recognizer_model,
+                                gallery_reloader.gallery if gallery_reloader else None, detector)
+        # A sighting is counted each time a track is (re-)identified, not on every rendered frame
+        if profiles_task.ok:
+            for track in tracker.visible_tracks():
+                if track.name is not None and track.last_recognized == tracker.frame_index:
+                    profiles_task.result.record_sighting(track.name)
+        return faces
+    
+    worker = InferenceWorker(process_frame, inference_stats)
+    grabber.start()
+    worker.start()
+    face_results = []
+    first_frame_shown = False
     
     while True:
-        # Capture frame from camera
-        ret, frame = video_capture.read()
-        if not ret:
+        # Newest frame from the capture thread
+        frame = grabber.get()
+        if frame is None:
             print("Failed to grab frame from camera")
             break
+        render_start = time.perf_counter()
+        
+        # Hand the frame to inference without waiting; draw the latest finished result
+        worker.submit(frame)
+        face_results = worker.latest_result(face_results)
         
         # Calculate FPS
         frame_count += 1
@@ -821,43 +733,9 @@ def main():
             prev_time = current_time
             frame_count = 0
         
-        # Create modern dark background
-        background = np.zeros((screen_h, screen_w, 3), dtype=np.uint8)
-        background[:, :] = (40, 44, 52)  # Dark blue-gray background
-        
-        # Draw modern tech grid lines
-        grid_spacing = 50
-        grid_color = (50, 55, 65)  # Slightly lighter blue-gray
-        
-        # Draw animated grid lines
-        grid_offset = frame_count % grid_spacing
-        
-        # Draw vertical grid lines with data flow effect
-        for x in range(grid_offset, screen_w, grid_spacing):
-            # Create "data packets" flowing down some lines
-            if x % (grid_spacing * 3) == 0:  # Every 3rd line
-                packet_y = (frame_count * 5) % screen_h
-                # Draw brighter point to represent data
-                cv2.line(background, (x, packet_y-5), (x, packet_y+5), (66, 165, 245), 2)
-            
-            cv2.line(background, (x, 0), (x, screen_h), grid_color, 1)
-        
-        # Draw horizontal grid lines with similar effect
-        for y in range(grid_offset, screen_h, grid_spacing):
-            # Create "data packets" flowing across some lines
-            if y % (grid_spacing * 3) == 0:  # Every 3rd line
-                packet_x = (frame_count * 5) % screen_w
-                # Draw brighter point to represent data
-                cv2.line(background, (packet_x-5, y), (packet_x+5, y), (66, 165, 245), 2)
-                
-            cv2.line(background, (0, y), (screen_w, y), grid_color, 1)
-        
-        # Draw header bar with gradient effect
-        header_height = 60
-        for i in range(header_height):
-            alpha = 0.7 + 0.3 * (i / header_height)
-            color = tuple(int(c * alpha) for c in (40, 44, 52))
-            cv2.line(background, (0, i), (screen_w, i), color, 1)
+        # Grid and header come from cached layers; only animated parts are drawn per frame
+        background = hud.render_background(frame_count)
+        header_height = HEADER_HEIGHT
         
         # Draw the header text with glow effect
         # Add subtle animation to the header
@@ -904,6 +782,9 @@ def main():
                         (200, 90), 
                         cv2.FONT_HERSHEY_SIMPLEX, 0.7, gpu_color, 2)
         
+        # Per-stage latency and drop counters
+        draw_stage_stats(background, [capture_stats, inference_stats, render_stats], (20, 120))
+        
         # Set up camera view on right side with modern border
         cam_width = min(screen_w // 2, frame.shape[1])
         cam_height = min(screen_h - header_height - 60, frame.shape[0])
@@ -931,63 +812,18 @@ def main():
         if frame.shape[1] != cam_width or frame.shape[0] != cam_height:
             display_frame = cv2.resize(frame, (cam_width, cam_height))
         else:
-            display_frame = frame.copy()
+            display_frame = frame
         
         # Place camera feed on the background
         background[cam_y:cam_y+cam_height, cam_x:cam_x+cam_width] = display_frame
         
-        # Process every other frame for face detection (for better performance)
-        if process_this_frame:
-            # Detect faces in the frame
-            face_locations = detect_faces(frame, face_detector_model)
-            
-            face_names = []
-            
-            # Process each face
-            for (left, top, right, bottom) in face_locations:
-                # Extract the face region
-                face_image = frame[top:bottom, left:right]
-                
-                # Skip if face image is empty or too small
-                if face_image.size == 0 or face_image.shape[0] < 20 or face_image.shape[1] < 20:
-                    face_names.append("Unknown")
-                    continue
-                
-                # Get face embedding
-                try:
-                    # Resize to required size
-                    face_blob = cv2.dnn.blobFromImage(
-                        face_image, 1.0/255, (96, 96),
-                        (0, 0, 0), swapRB=True, crop=False
-                    )
-                    face_recognizer_model.setInput(face_blob)
-                    face_encoding = face_recognizer_model.forward()[0]
-                    
-                    # Calculate distances to known faces
-                    if len(known_face_encodings) > 0:
-                        distances = face_distance(known_face_encodings, face_encoding)
-                        best_match_index = np.argmin(distances)
-                        
-                        # Check if it's a close match
-                        if distances[best_match_index] < 0.6:  # Threshold for face match
-                            name = known_face_names[best_match_index]
-                        else:
-                            name = "Unknown"
-                    else:
-                        name = "Unknown"
-                except:
-                    name = "Unknown"
-                    
-                face_names.append(name)
-        
-        process_this_frame = not process_this_frame
         
         # Calculate scale for displaying face boxes on the camera view
         scale_x = cam_width / frame.shape[1]
         scale_y = cam_height / frame.shape[0]
         
         # Draw rectangles around faces and display profiles
-        for i, ((left, top, right, bottom), name) in enumerate(zip(face_locations, face_names)):
+        for i, (track_id, (left, top, right, bottom), name) in enumerate(face_results):
             # Scale coordinates to fit the display frame
             disp_left = int(left * scale_x) + cam_x
             disp_top = int(top * scale_y) + cam_y
@@ -1025,8 +861,17 @@ def main():
             cv2.line(background, (disp_right, disp_bottom), (disp_right - corner_length, disp_bottom), animated_color, 2)
             cv2.line(background, (disp_right, disp_bottom), (disp_right, disp_bottom - corner_length), animated_color, 2)
             
-            # Get profile for this person
-            profile = get_profile(name)
+            # Stable track ID above the box
+            cv2.putText(background, f"ID {track_id}", 
+                        (disp_left, disp_top - 8), 
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, animated_color, 1)
+            
+            # Unidentified until the gallery and profiles have loaded
+            if name is None or not profiles_task.ok:
+                continue
+            
+            # Get profile for this person; sightings are counted on the inference thread
+            profile = profiles_task.result.get_profile(name)
             
             # Only show profile for the first detected face to avoid clutter
             if i == 0:
@@ -1034,6 +879,11 @@ def main():
                 face_location = (disp_left, disp_top, disp_right, disp_bottom)
                 background = draw_profile_box(background, face_location, profile, show_details=True, frame_count=frame_count)
         
+        if gallery_reloader is None:
+            status = "GALLERY FAILED" if gallery_task.error else "GALLERY LOADING..."
+            cv2.putText(background, status, (cam_x, cam_y + cam_height + 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 152, 0), 2)
+        
         # Display help text at bottom of screen with subtle pulse
         help_y = screen_h - 30
         help_color = tuple(int((0.7 + 0.3 * abs(np.sin(frame_count * 0.05))) * c) for c in (200, 200, 200))
@@ -1044,6 +894,11 @@ def main():
         
         # Show the final display
         cv2.imshow(window_name, background)
+        render_stats.record(time.perf_counter() - render_start)
+        if not first_frame_shown:
+            first_frame_shown = True
+            print(f"Time to first frame: {(time.perf_counter() - startup_start) * 1000:.0f} ms "
+                  f"({', '.join(f'{t.name} {t.seconds * 1000:.0f} ms' for t in startup_tasks if t.done)})")
         
         # Handle key events
         key = cv2.waitKey(1) & 0xFF
@@ -1060,6 +915,13 @@ def main():
                 cv2.setWindowProperty(window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_NORMAL)
     
     # Release resources
+    worker.stop()
+    if dataset_watcher is not None:
+        dataset_watcher.stop()
+    grabber.stop()
+    profiles_task.join()
+    if profiles_task.ok:
+        profiles_task.result.close()
     video_capture.release()
     cv2.destroyAllWindows()
     print("Program terminated")
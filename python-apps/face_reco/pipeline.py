@@ -0,0 +1,209 @@
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class StageStats:
+    """Rolling latency, throughput and drop counters for one pipeline stage"""
+
+    def __init__(self, name, window=60):
+        self.name = name
+        self.processed = 0
+        self.dropped = 0
+        self._latencies = deque(maxlen=window)
+        self._timestamps = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self.processed += 1
+            self._latencies.append(seconds)
+            self._timestamps.append(time.perf_counter())
+
+    def drop(self, count=1):
+        with self._lock:
+            self.dropped += count
+
+    def summary(self):
+        """Return fps, p50/p95 latency in ms and drop count over the recent window"""
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000
+            timestamps = list(self._timestamps)
+            dropped = self.dropped
+        fps = 0.0
+        if len(timestamps) > 1 and timestamps[-1] > timestamps[0]:
+            fps = (len(timestamps) - 1) / (timestamps[-1] - timestamps[0])
+        return {
+            "fps": fps,
+            "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+            "p95_ms": float(np.percentile(latencies, 95)) if len(latencies) else 0.0,
+            "dropped": dropped,
+        }
+
+
+def put_latest(bounded_queue, item, stats):
+    """Put item on a bounded queue, dropping the oldest entry when it is full"""
+    while True:
+        try:
+            bounded_queue.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                bounded_queue.get_nowait()
+                stats.drop()
+            except queue.Empty:
+                pass
+
+
+class FrameGrabber(threading.Thread):
+    """Capture stage: reads the camera continuously with latest-frame semantics.
+
+    Frames go into a bounded queue; if the consumer has not taken the previous
+    frame yet it is dropped, so readers always get the newest frame.
+    """
+
+    def __init__(self, video_capture, stats, queue_size=1):
+        super().__init__(name="capture", daemon=True)
+        self.video_capture = video_capture
+        self.stats = stats
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.failed = False
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            start = time.perf_counter()
+            ret, frame = self.video_capture.read()
+            if not ret:
+                self.failed = True
+                break
+            # Frames carry their capture time so consumers can measure end-to-end latency
+            put_latest(self.frames, (frame, time.perf_counter()), self.stats)
+            self.stats.record(time.perf_counter() - start)
+
+    def get(self, timeout=1.0):
+        """Return the newest frame, or None if the camera stopped delivering"""
+        while True:
+            try:
+                return self.frames.get(timeout=timeout)[0]
+            except queue.Empty:
+                if self.failed or not self.is_alive():
+                    return None
+
+    def poll(self):
+        """Return (frame, capture time) for a frame not taken yet, or None without waiting"""
+        try:
+            return self.frames.get_nowait()
+        except queue.Empty:
+            return None
+
+    @property
+    def finished(self):
+        """True once the source has stopped delivering and every frame was taken"""
+        return (self.failed or not self.is_alive()) and self.frames.empty()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(timeout=2.0)
+
+
+class InferenceWorker(threading.Thread):
+    """Inference stage: runs process_frame on the newest submitted frame.
+
+    Submitting never blocks the render loop; frames arriving while the worker
+    is busy replace the queued one and count as drops. Results are published
+    through a bounded queue of their own.
+    """
+
+    def __init__(self, process_frame, stats, queue_size=1):
+        super().__init__(name="inference", daemon=True)
+        self.process_frame = process_frame
+        self.stats = stats
+        self.inbox = queue.Queue(maxsize=queue_size)
+        self.outbox = queue.Queue(maxsize=queue_size)
+        self._stop_event = threading.Event()
+
+    def submit(self, frame):
+        put_latest(self.inbox, frame, self.stats)
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                frame = self.inbox.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            start = time.perf_counter()
+            try:
+                result = self.process_frame(frame)
+            except Exception as e:
+                print(f"Inference error: {e}")
+                continue
+            self.stats.record(time.perf_counter() - start)
+            # Stale results are simply replaced; they do not count as dropped frames
+            while True:
+                try:
+                    self.outbox.put_nowait(result)
+                    break
+                except queue.Full:
+                    try:
+                        self.outbox.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def latest_result(self, default=None):
+        """Return the newest finished result, or default if none arrived since the last call"""
+        result = default
+        while True:
+            try:
+                result = self.outbox.get_nowait()
+            except queue.Empty:
+                return result
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(timeout=2.0)
+
+
+class BackgroundTask(threading.Thread):
+    """Runs one start-up job on its own thread and keeps its result and duration.
+
+    wait() returns the result, or re-raises the job's exception.
+    """
+
+    def __init__(self, name, job, *args, **kwargs):
+        super().__init__(name=name, daemon=True)
+        self.job = job
+        self.args = args
+        self.kwargs = kwargs
+        self.result = None
+        self.error = None
+        self.seconds = None
+        self._finished = threading.Event()
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            self.result = self.job(*self.args, **self.kwargs)
+        except Exception as e:
+            self.error = e
+            print(f"{self.name} failed: {e}")
+        finally:
+            self.seconds = time.perf_counter() - start
+            self._finished.set()
+
+    @property
+    def done(self):
+        return self._finished.is_set()
+
+    @property
+    def ok(self):
+        return self._finished.is_set() and self.error is None
+
+    def wait(self, timeout=None):
+        self._finished.wait(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.result
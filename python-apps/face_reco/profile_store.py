@@ -0,0 +1,149 @@
+import json
+import os
+import sqlite3
+import threading
+
+# Columns of the profiles table, in PersonProfile.to_dict() order
+PROFILE_FIELDS = ("name", "age", "gender", "occupation", "nationality", "status",
+                  "threat_level", "last_seen", "notes", "sightings")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    name TEXT PRIMARY KEY,
+    age,
+    gender TEXT,
+    occupation TEXT,
+    nationality TEXT,
+    status TEXT,
+    threat_level TEXT,
+    last_seen TEXT,
+    notes TEXT,
+    sightings INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS sightings (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    seen_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sightings_by_name ON sightings (name, seen_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _profile_row(data):
+    row = [data.get(field) for field in PROFILE_FIELDS]
+    if row[-1] is None:
+        row[-1] = 1
+    return row
+
+
+def _profile_dict(row):
+    # Missing values are left out so PersonProfile.from_dict fills in its defaults
+    return {field: value for field, value in zip(PROFILE_FIELDS, row) if value is not None}
+
+
+class ProfileStore:
+    """Profiles and sighting history in one SQLite database.
+
+    The database runs in WAL mode, so the recognizer can keep writing while
+    the scanner or another reader has it open. Sightings are append-only
+    rows; the sightings count and last_seen on each profile are updated in
+    the same transaction as the batch that adds them.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=5.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL keeps the database consistent without syncing on every commit
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def load_all(self):
+        """Return {name: profile dict} for every stored profile"""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {', '.join(PROFILE_FIELDS)} FROM profiles").fetchall()
+        return {row[0]: _profile_dict(row) for row in rows}
+
+    def get(self, name):
+        """Return one profile dict, or None"""
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(PROFILE_FIELDS)} FROM profiles WHERE name = ?",
+                                     (name,)).fetchone()
+        return _profile_dict(row) if row else None
+
+    def save(self, data):
+        """Insert or replace a whole profile"""
+        values = _profile_row(data)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO profiles ({', '.join(PROFILE_FIELDS)}) "
+                f"VALUES ({', '.join('?' * len(PROFILE_FIELDS))})", values)
+
+    def record_sightings(self, sightings):
+        """Append a batch of (name, seen_at) sightings in one transaction.
+
+        Profiles of the sighted people get their count and last_seen bumped;
+        names without a profile only get sighting rows.
+        """
+        if not sightings:
+            return
+        totals = {}
+        for name, seen_at in sightings:
+            count, latest = totals.get(name, (0, seen_at))
+            totals[name] = (count + 1, max(latest, seen_at))
+
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT INTO sightings (name, seen_at) VALUES (?, ?)", sightings)
+            self._conn.executemany(
+                "UPDATE profiles SET sightings = sightings + ?, last_seen = MAX(COALESCE(last_seen, ''), ?) "
+                "WHERE name = ?",
+                [(count, latest, name) for name, (count, latest) in totals.items()])
+
+    def sighting_history(self, name, limit=100):
+        """Most recent sighting timestamps for one person, newest first"""
+        with self._lock:
+            rows = self._conn.execute("SELECT seen_at FROM sightings WHERE name = ? "
+                                      "ORDER BY seen_at DESC LIMIT ?", (name, limit)).fetchall()
+        return [row[0] for row in rows]
+
+    def migrate_json(self, dataset_dir):
+        """Import dataset/<person>/profile.json files once; returns the number imported.
+
+        Profiles already in the database are left alone. The migration is
+        recorded in the meta table so later starts skip the directory scan.
+        """
+        with self._lock:
+            done = self._conn.execute("SELECT value FROM meta WHERE key = 'json_migrated'").fetchone()
+        if done:
+            return 0
+
+        imported = []
+        if os.path.isdir(dataset_dir):
+            for person_entry in os.scandir(dataset_dir):
+                profile_path = os.path.join(person_entry.path, "profile.json")
+                if not person_entry.is_dir() or not os.path.exists(profile_path):
+                    continue
+                try:
+                    with open(profile_path, 'r') as f:
+                        data = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"Skipping {profile_path}: {e}")
+                    continue
+                data["name"] = person_entry.name
+                imported.append(_profile_row(data))
+
+        with self._lock, self._conn:
+            cursor = self._conn.executemany(
+                f"INSERT OR IGNORE INTO profiles ({', '.join(PROFILE_FIELDS)}) "
+                f"VALUES ({', '.join('?' * len(PROFILE_FIELDS))})", imported)
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', '1')")
+        return max(cursor.rowcount, 0)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
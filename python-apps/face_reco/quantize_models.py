@@ -0,0 +1,98 @@
+import argparse
+import os
+import sys
+
+import cv2
+import numpy as np
+
+from detection import DETECTOR_MEAN, FULL_FRAME_SIZE
+from embedding_cache import scan_dataset
+from inference_backend import (DETECTOR_INT8_PATH, DETECTOR_ONNX_PATH, ONNXRUNTIME_AVAILABLE, OPENFACE_INT8_PATH,
+                               OPENFACE_ONNX_PATH)
+from person_profiles import DATASET_DIR, detect_faces, load_models, models_available
+
+# Calibration samples fed to each model during static quantization
+CALIBRATION_SAMPLES = 200
+
+
+def calibration_blobs(dataset_dir, samples):
+    """Detector and recognizer input blobs built from enrollment images.
+
+    Faces are located with the original cv2.dnn detector so the recognizer is
+    calibrated on the same kind of crops it sees at run time.
+    """
+    image_paths = [os.path.join(dataset_dir, *rel_path.split("/")) for rel_path in sorted(scan_dataset(dataset_dir))]
+    if not image_paths:
+        return [], []
+
+    face_detector_model, _ = load_models(use_cuda=False, backend="opencv")
+    detector_blobs = []
+    recognizer_blobs = []
+    for img_path in image_paths:
+        if len(detector_blobs) >= samples and len(recognizer_blobs) >= samples:
+            break
+        image = cv2.imread(img_path)
+        if image is None:
+            continue
+        detector_blobs.append(cv2.dnn.blobFromImage(
+            cv2.resize(image, (FULL_FRAME_SIZE, FULL_FRAME_SIZE)), 1.0,
+            (FULL_FRAME_SIZE, FULL_FRAME_SIZE), DETECTOR_MEAN))
+        for left, top, right, bottom in detect_faces(image, face_detector_model):
+            face = image[top:bottom, left:right]
+            if face.shape[0] >= 20 and face.shape[1] >= 20:
+                recognizer_blobs.append(cv2.dnn.blobFromImage(face, 1.0/255, (96, 96), (0, 0, 0),
+                                                              swapRB=True, crop=False))
+    return detector_blobs[:samples], recognizer_blobs[:samples]
+
+
+def quantize(model_path, output_path, blobs):
+    """Statically quantize an ONNX model to int8 (QDQ, per-channel weights)"""
+    import onnxruntime as ort
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+    input_name = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+
+    class BlobReader(CalibrationDataReader):
+        def __init__(self):
+            self._blobs = iter(blobs)
+
+        def get_next(self):
+            blob = next(self._blobs, None)
+            return None if blob is None else {input_name: blob}
+
+    quantize_static(model_path, output_path, BlobReader(), quant_format=QuantFormat.QDQ, per_channel=True,
+                    activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+    print(f"Wrote {output_path} ({os.path.getsize(model_path) / 1e6:.1f} MB -> "
+          f"{os.path.getsize(output_path) / 1e6:.1f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build int8 ONNX models for the onnxruntime-int8 backend")
+    parser.add_argument("--dataset", default=DATASET_DIR, help="Images used for calibration")
+    parser.add_argument("--samples", type=int, default=CALIBRATION_SAMPLES, help="Calibration inputs per model")
+    args = parser.parse_args()
+
+    if not ONNXRUNTIME_AVAILABLE:
+        print("ONNX Runtime is not installed: pip install onnxruntime")
+        return 1
+    missing = [p for p in (DETECTOR_ONNX_PATH, OPENFACE_ONNX_PATH) if not os.path.exists(p)]
+    if missing or not models_available("opencv"):
+        print("Need the original models (run main.py) and their ONNX exports:")
+        for path in missing:
+            print(f"  missing {path}")
+        return 1
+
+    detector_blobs, recognizer_blobs = calibration_blobs(args.dataset, args.samples)
+    if not detector_blobs or not recognizer_blobs:
+        print(f"No usable calibration images with faces found in {args.dataset}")
+        return 1
+    print(f"Calibrating with {len(detector_blobs)} frames and {len(recognizer_blobs)} face crops")
+
+    quantize(DETECTOR_ONNX_PATH, DETECTOR_INT8_PATH, detector_blobs)
+    quantize(OPENFACE_ONNX_PATH, OPENFACE_INT8_PATH, recognizer_blobs)
+    print("Check the result with: python parity_check.py")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
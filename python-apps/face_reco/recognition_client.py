@@ -0,0 +1,136 @@
+import argparse
+import base64
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from embedding_cache import scan_dataset
+from person_profiles import DATASET_DIR
+from recognition_service import DEFAULT_HOST, DEFAULT_PORT
+
+
+class RecognitionClient:
+    """Minimal client for recognition_service.py over one keep-alive connection.
+
+    Not thread-safe; give every thread its own client.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=10.0):
+        self.connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _request(self, method, path, payload=None):
+        body = None if payload is None else json.dumps(payload)
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        self.connection.request(method, path, body=body, headers=headers)
+        response = self.connection.getresponse()
+        data = json.loads(response.read())
+        if response.status != 200:
+            raise RuntimeError(f"{method} {path} failed ({response.status}): {data.get('error')}")
+        return data
+
+    def recognize(self, face_images):
+        """Identify BGR face crops; returns one {name, distance, profile} dict per crop"""
+        faces = []
+        for face_image in face_images:
+            ok, encoded = cv2.imencode(".jpg", face_image)
+            if not ok:
+                raise ValueError("could not encode face image")
+            faces.append(base64.b64encode(encoded.tobytes()).decode("ascii"))
+        return self._request("POST", "/recognize", {"faces": faces})["results"]
+
+    def health(self):
+        return self._request("GET", "/health")
+
+    def close(self):
+        self.connection.close()
+
+
+def load_faces(image_dir, count):
+    """Enrollment images to send as face crops, or random crops if there are none"""
+    faces = []
+    if image_dir and os.path.isdir(image_dir):
+        for rel_path in sorted(scan_dataset(image_dir))[:count]:
+            image = cv2.imread(os.path.join(image_dir, *rel_path.split("/")))
+            if image is not None:
+                faces.append(image)
+    if not faces:
+        rng = np.random.default_rng(0)
+        faces = [rng.integers(0, 255, size=(96, 96, 3), dtype=np.uint8) for _ in range(count)]
+    return faces
+
+
+def run_client(host, port, faces, requests, faces_per_request, latencies, errors):
+    client = RecognitionClient(host, port)
+    try:
+        for i in range(requests):
+            batch = [faces[(i * faces_per_request + j) % len(faces)] for j in range(faces_per_request)]
+            start = time.perf_counter()
+            try:
+                client.recognize(batch)
+            except (OSError, RuntimeError) as e:
+                errors.append(str(e))
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the recognition service")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Service host")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Service port")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent client threads")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per client")
+    parser.add_argument("--faces", type=int, default=1, help="Face crops per request")
+    parser.add_argument("--images", default=DATASET_DIR,
+                        help="Directory of <person>/<image> crops to send (default: the dataset)")
+    args = parser.parse_args()
+
+    faces = load_faces(args.images, 64)
+    try:
+        client = RecognitionClient(args.host, args.port)
+        before = client.health()
+        print(f"Service at {args.host}:{args.port}: {before['gallery_faces']} faces for {before['people']} people")
+        # One request shows what a reply looks like
+        print(json.dumps(client.recognize(faces[:1])[0], indent=2))
+    except OSError as e:
+        print(f"Could not reach the service at {args.host}:{args.port}: {e}")
+        return 1
+
+    latencies = []
+    errors = []
+    threads = [threading.Thread(target=run_client, args=(args.host, args.port, faces, args.requests,
+                                                         args.faces, latencies, errors))
+               for _ in range(args.clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    after = client.health()
+    client.close()
+    # Leave out the sample request sent before the run
+    batches = after["batches"] - before["batches"] - 1
+    served = after["requests"] - before["requests"] - 1
+    print(f"\n{args.clients} clients x {args.requests} requests x {args.faces} faces in {elapsed:.2f} s")
+    if latencies:
+        print(f"  {len(latencies) / elapsed:.1f} requests/s, {len(latencies) * args.faces / elapsed:.1f} faces/s")
+        print(f"  latency p50 {np.percentile(latencies, 50):.2f} ms, p95 {np.percentile(latencies, 95):.2f} ms")
+    if batches > 0:
+        print(f"  {served} requests served in {batches} forward passes "
+              f"({served / batches:.2f} requests per pass)")
+    if errors:
+        print(f"  {len(errors)} failed requests, first: {errors[0]}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
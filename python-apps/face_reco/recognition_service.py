@@ -0,0 +1,253 @@
+import argparse
+import base64
+import json
+import queue
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+from dataset_watcher import DatasetWatcher
+from embedding_cache import EmbeddingCache, GalleryReloader
+from gallery import MATCH_THRESHOLD
+from profile_store import ProfileStore
+from person_profiles import (DATASET_DIR, DATASET_WATCH_INTERVAL, EMBED_BATCH_SIZE, ENCODINGS_DIR, GALLERY_PROTOTYPES,
+                             GALLERY_RELOAD_INTERVAL, MODEL_PATHS, PROFILES_DB_PATH, embed_faces, load_gallery,
+                             load_models, models_available)
+
+# The service only listens on the loopback interface
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Longest a request waits for others to share its forward pass
+MAX_BATCH_DELAY_MS = 5.0
+
+# Most face crops embedded in one forward pass
+MAX_BATCH_FACES = EMBED_BATCH_SIZE
+
+
+class _Request:
+    def __init__(self, faces):
+        self.faces = faces
+        self.results = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class RecognitionBatcher(threading.Thread):
+    """Embeds and matches face crops from concurrent requests in shared batches.
+
+    The first waiting request opens a batch; requests arriving within
+    max_delay_ms join it until max_faces crops are collected. The whole batch
+    is embedded in one recognizer forward pass and matched in one gallery
+    product, and every caller gets its own slice of the results back.
+    """
+
+    def __init__(self, face_recognizer_model, gallery_reloader, threshold=MATCH_THRESHOLD,
+                 max_delay_ms=MAX_BATCH_DELAY_MS, max_faces=MAX_BATCH_FACES):
+        super().__init__(daemon=True)
+        self.face_recognizer_model = face_recognizer_model
+        self.gallery_reloader = gallery_reloader
+        self.threshold = threshold
+        self.max_delay = max_delay_ms / 1000.0
+        self.max_faces = max_faces
+        self.batches = 0
+        self.faces = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        self._stop_event = threading.Event()
+
+    def recognize(self, faces):
+        """Return [(name, distance)] for a list of face crops; blocks until its batch is done"""
+        if not faces:
+            return []
+        request = _Request(faces)
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.results
+
+    def _collect(self):
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        faces = len(batch[0].faces)
+        deadline = time.perf_counter() + self.max_delay
+        while faces < self.max_faces:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            faces += len(request.faces)
+        return batch
+
+    def _process(self, batch):
+        # The gallery only changes between batches, on this thread
+        if self.gallery_reloader.poll():
+            print(f"Gallery updated: {len(self.gallery_reloader.gallery)} faces")
+        gallery = self.gallery_reloader.gallery
+
+        crops = [face for request in batch for face in request.faces]
+        # One forward pass for the whole batch, even past EMBED_BATCH_SIZE
+        embeddings = embed_faces(crops, self.face_recognizer_model, batch_size=len(crops))
+        if len(gallery):
+            names, distances = gallery.match(embeddings, k=1)
+            matches = [(str(name) if distance < self.threshold else "Unknown", float(distance))
+                       for name, distance in zip(names[:, 0], distances[:, 0])]
+        else:
+            matches = [("Unknown", None)] * len(crops)
+
+        start = 0
+        for request in batch:
+            request.results = matches[start:start + len(request.faces)]
+            start += len(request.faces)
+        self.batches += 1
+        self.faces += len(crops)
+        self.requests += len(batch)
+
+    def run(self):
+        while not self._stop_event.is_set():
+            batch = self._collect()
+            if not batch:
+                continue
+            try:
+                self._process(batch)
+            except Exception as e:
+                for request in batch:
+                    request.error = e
+            for request in batch:
+                request.done.set()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(timeout=2.0)
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "faces": self.faces,
+            "mean_batch_faces": round(self.faces / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+def decode_face(encoded):
+    """Decode one base64-encoded JPEG/PNG face crop"""
+    image = cv2.imdecode(np.frombuffer(base64.b64decode(encoded), dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("face is not a decodable image")
+    return image
+
+
+class RecognitionHandler(BaseHTTPRequestHandler):
+    """POST /recognize with {"faces": [base64 image, ...]}; GET /health for gallery and batching stats"""
+
+    # Keep connections open so load-testing clients do not pay a handshake per request
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+            return
+        gallery = self.server.batcher.gallery_reloader.gallery
+        self._send_json(200, {"status": "ok", "gallery_faces": len(gallery), "people": len(gallery.people()),
+                              **self.server.batcher.stats()})
+
+    def do_POST(self):
+        if self.path != "/recognize":
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            faces = [decode_face(face) for face in json.loads(self.rfile.read(length))["faces"]]
+        except (KeyError, TypeError, ValueError) as e:
+            self._send_json(400, {"error": f"bad request: {e}"})
+            return
+
+        try:
+            matches = self.server.batcher.recognize(faces)
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+            return
+
+        results = []
+        for name, distance in matches:
+            profile = self.server.profiles.get(name) if name != "Unknown" else None
+            results.append({"name": name, "distance": distance, "profile": profile})
+        self._send_json(200, {"results": results})
+
+    def log_message(self, format, *args):
+        # Per-request access logs would flood the console under load
+        pass
+
+
+def serve(host, port, threshold, max_delay_ms, max_faces):
+    if not models_available():
+        print("Model files not found. Please run main.py first to download the models.")
+        return 1
+
+    # The models and gallery are loaded once and shared by every client
+    models = load_models(use_cuda=False)
+    _, face_recognizer_model = models
+    gallery = load_gallery(DATASET_DIR, lambda: models)
+    # Faces enrolled by face_scanner or added to the dataset are picked up from the cache while serving
+    cache = EmbeddingCache(ENCODINGS_DIR, MODEL_PATHS)
+    gallery_reloader = GalleryReloader(cache, gallery, interval=GALLERY_RELOAD_INTERVAL,
+                                       max_prototypes=GALLERY_PROTOTYPES)
+    dataset_watcher = DatasetWatcher(DATASET_DIR, cache, lambda: load_models(use_cuda=False),
+                                     interval=DATASET_WATCH_INTERVAL)
+
+    batcher = RecognitionBatcher(face_recognizer_model, gallery_reloader, threshold, max_delay_ms, max_faces)
+    server = ThreadingHTTPServer((host, port), RecognitionHandler)
+    server.daemon_threads = True
+    server.batcher = batcher
+    server.profiles = ProfileStore(PROFILES_DB_PATH)
+    batcher.start()
+    dataset_watcher.start()
+    print(f"Recognition service listening on http://{host}:{port} "
+          f"(batches of up to {max_faces} faces, {max_delay_ms:g} ms batching delay)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        dataset_watcher.stop()
+        batcher.stop()
+        server.profiles.close()
+        print(f"Stopped: {batcher.stats()}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve face identification over localhost HTTP")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on")
+    parser.add_argument("--threshold", type=float, default=MATCH_THRESHOLD,
+                        help="Maximum cosine distance for a match")
+    parser.add_argument("--max-delay-ms", type=float, default=MAX_BATCH_DELAY_MS,
+                        help="Longest a request waits for others to join its batch")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH_FACES, help="Most faces per forward pass")
+    args = parser.parse_args()
+    return serve(args.host, args.port, args.threshold, args.max_delay_ms, args.max_batch)
+
+
+if __name__ == "__main__":
+    sys.exit(main())